@@ -1,5 +1,14 @@
 #!/bin/bash
 cd /var/app/current
 source /var/app/venv/*/bin/activate
-pip install -r requirements.txt
 
+# Reinstall only when requirements.txt changed since the last successful install
+STAMP=/var/app/venv/.requirements.sha256
+if ! sha256sum --status -c "$STAMP" 2>/dev/null; then
+    pip install -r requirements.txt && sha256sum requirements.txt > "$STAMP"
+fi
+
+# NLTK stopwords/WordNet for bundles without nlp_resources.nva and for tokens missing from its
+# lemma table; fetched here, at deploy time, never while serving
+python -c "from nltk.corpus import stopwords, wordnet; stopwords.words('english'); wordnet.synsets('news')" 2>/dev/null \
+    || python -m nltk.downloader -q -d /usr/share/nltk_data stopwords wordnet
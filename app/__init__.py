@@ -5,6 +5,7 @@ Flask Application for Fake News Detection
 from flask import Flask
 from flask.json.provider import DefaultJSONProvider
 import logging
+import os
 import boto3
 from botocore.exceptions import ClientError
 import numpy as np
@@ -12,22 +13,20 @@ import numpy as np
 class NumpyJSONProvider(DefaultJSONProvider):
     """Custom JSON provider to handle numpy types"""
     def default(self, obj):
-        if isinstance(obj, (np.integer, np.int64, np.int32, np.int_)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float64, np.float32, np.float_)):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
+        # np.generic covers every numpy scalar (integers, floats, bools, strings)
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, np.ndarray):
             return obj.tolist()
-        elif isinstance(obj, (np.bool_, bool)):
-            return bool(obj)
-        elif isinstance(obj, np.str_):
-            return str(obj)
         return super().default(obj)
 
 def create_app():
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'your-secret-key-here'
     
+    # Reject oversized request bodies before they are parsed (413)
+    app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_REQUEST_BYTES', 1024 * 1024))
+    
     # Set custom JSON provider for Flask 2.2+
     app.json = NumpyJSONProvider(app)
     
@@ -0,0 +1,142 @@
+"""
+Adaptive Admission Control for the Prediction Endpoints
+Estimates how long a request has waited and will wait from the proxy's
+X-Request-Start header, in-flight requests and recent per-stage latency,
+and decides whether to serve it fully, on the cheaper path, or shed it
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+ACCEPT = 'accept'
+DEGRADE = 'degrade'
+REJECT = 'reject'
+
+def parse_request_start(value, now=None):
+    """Milliseconds since the proxy received the request, from X-Request-Start (t=<epoch>)"""
+    if not value:
+        return None
+    try:
+        started = float(value.strip().lstrip('t='))
+    except ValueError:
+        return None
+
+    # Proxies send seconds (nginx $msec), milliseconds or microseconds since the epoch
+    if started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+
+    now = time.time() if now is None else now
+    return max(0.0, (now - started) * 1000.0)
+
+class AdmissionController:
+    """Per-process admission decisions from queue time, in-flight count and latency EWMAs"""
+
+    def __init__(self, queue_budget_ms=2000.0, degrade_budget_ms=1000.0, capacity=1, alpha=0.2,
+                 state_window_seconds=10.0):
+        self.queue_budget_ms = queue_budget_ms
+        self.degrade_budget_ms = degrade_budget_ms
+        self.capacity = max(1, capacity)
+        self.alpha = alpha
+        self.state_window_seconds = state_window_seconds
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stage_ms = {}
+        self._counts = {ACCEPT: 0, DEGRADE: 0, REJECT: 0}
+        self._last = {DEGRADE: 0.0, REJECT: 0.0}
+        self._last_wait_ms = 0.0
+        self._without_queue_time = 0
+
+    def estimated_wait_ms(self, queue_ms):
+        """Time already queued plus the expected wait behind requests in flight"""
+        with self._lock:
+            in_flight = self._in_flight
+            service_ms = self._stage_ms.get('total', 0.0)
+        return (queue_ms or 0.0) + in_flight * service_ms / self.capacity
+
+    def admit(self, headers):
+        """Decide how to handle a request: ACCEPT, DEGRADE or REJECT"""
+        queue_ms = parse_request_start(headers.get('X-Request-Start'))
+        if queue_ms is None:
+            self._missing_queue_time()
+        wait_ms = self.estimated_wait_ms(queue_ms)
+
+        if self.queue_budget_ms and wait_ms > self.queue_budget_ms:
+            decision = REJECT
+        elif self.degrade_budget_ms and wait_ms > self.degrade_budget_ms:
+            decision = DEGRADE
+        else:
+            decision = ACCEPT
+
+        with self._lock:
+            self._counts[decision] += 1
+            self._last_wait_ms = wait_ms
+            if decision in self._last:
+                self._last[decision] = time.monotonic()
+        return decision
+
+    def _missing_queue_time(self):
+        # With sync workers nothing else is in flight when admit() runs, so without the proxy's
+        # header the estimate is always 0 and nothing is ever shed or degraded
+        with self._lock:
+            self._without_queue_time += 1
+            first = self._without_queue_time == 1
+        if first and (self.queue_budget_ms or self.degrade_budget_ms):
+            logger.warning("Admission control is enabled but requests arrive without X-Request-Start; "
+                           "configure the proxy to set it (.platform/nginx) or requests are never shed")
+
+    def retry_after_seconds(self):
+        """Suggested Retry-After: roughly the time to drain the current backlog"""
+        with self._lock:
+            backlog_ms = self._in_flight * self._stage_ms.get('total', 0.0) / self.capacity
+        return max(1, int(round(backlog_ms / 1000.0)))
+
+    def begin(self):
+        """Count a request as in flight; pass the returned start time to end()"""
+        with self._lock:
+            self._in_flight += 1
+        return time.perf_counter()
+
+    def end(self, started, record=True):
+        """Stop counting a request begun with begin(), recording its total service time when asked"""
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with self._lock:
+            self._in_flight -= 1
+            if record:
+                self._update('total', elapsed_ms)
+
+    def observe(self, timings):
+        """Fold per-stage timings (seconds) from the serving pipeline into the EWMAs"""
+        with self._lock:
+            for stage, seconds in timings.items():
+                self._update(stage, seconds * 1000.0)
+
+    def _update(self, stage, value_ms):
+        previous = self._stage_ms.get(stage)
+        self._stage_ms[stage] = value_ms if previous is None else previous + self.alpha * (value_ms - previous)
+
+    def state(self):
+        """Current shedding state for /health"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last[REJECT] < self.state_window_seconds and self._counts[REJECT]:
+                status = 'shedding'
+            elif now - self._last[DEGRADE] < self.state_window_seconds and self._counts[DEGRADE]:
+                status = 'degraded'
+            else:
+                status = 'normal'
+            return {
+                'state': status,
+                'in_flight': self._in_flight,
+                'last_wait_ms': self._last_wait_ms,
+                'queue_budget_ms': self.queue_budget_ms,
+                'degrade_budget_ms': self.degrade_budget_ms,
+                'stage_latency_ms': dict(self._stage_ms),
+                'decisions': dict(self._counts),
+                'requests_without_queue_time': self._without_queue_time
+            }
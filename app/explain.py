@@ -0,0 +1,158 @@
+"""
+Per-prediction Feature Contributions
+Explains the full model's score for one article with the booster's per-row contribution
+mode (pred_contribs) on the same sparse feature row /predict builds, naming each column
+through a precomputed TF-IDF n-gram / statistical feature name array
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Contributions kept per cached explanation; requests may ask for fewer
+MAX_TOP_K = 50
+
+def article_key(headline, body, url):
+    """Cache key for one article's raw input"""
+    digest = hashlib.sha1()
+    for part in (headline, body, url):
+        digest.update((part or '').encode('utf-8', 'surrogatepass'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+def feature_name_array(tfidf_vectorizer, stat_feature_names):
+    """Name of every feature column, in the order transform_features() stacks them"""
+    terms = tfidf_vectorizer.get_feature_names_out()
+    return np.concatenate([np.asarray(terms, dtype=object), np.asarray(list(stat_feature_names), dtype=object)])
+
+def served_result(served_by, probabilities, label_encoder):
+    """Prediction another stage (first stage, near-duplicate index, degraded path) answered with"""
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    return {
+        'served_by': served_by,
+        'prediction': str(label_encoder.inverse_transform([int(probabilities.argmax())])[0]),
+        'confidence': float(probabilities.max()),
+        'probabilities': {'fake': float(probabilities[0]), 'real': float(probabilities[-1])}
+    }
+
+class _LRU:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+class Explainer:
+    """Top contributing features of the full model for single rows, cached per article
+
+    /predict hands over the row it built and, when another stage answered, what it served, so
+    /explain can say when its full-model prediction is not the one the client received.
+    """
+
+    def __init__(self, model, tfidf_vectorizer, stat_feature_names, cache_size=1000):
+        self.booster = model.get_booster()
+        self.names = feature_name_array(tfidf_vectorizer, stat_feature_names)
+        self.n_terms = len(self.names) - len(stat_feature_names)
+        if self.booster.num_features() != len(self.names):
+            raise ValueError(f"model expects {self.booster.num_features()} features, "
+                             f"vectorizer and stat features give {len(self.names)}")
+
+        # Feature rows handed over by /predict, and finished explanations
+        self._rows = _LRU(cache_size)
+        self._explanations = _LRU(cache_size)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.cache_hits = 0
+        self.row_hits = 0
+
+    @staticmethod
+    def supports(model):
+        """Only XGBoost models expose a booster with per-row contributions"""
+        return hasattr(model, 'get_booster')
+
+    def remember(self, key, X=None, served=None):
+        """Keep what /predict built and served for an article (X is None when the full model did not run)"""
+        self._rows.put(key, (X, served))
+
+    def recall(self, key):
+        """(feature row, served result) remembered from /predict, or (None, None)"""
+        return self._rows.get(key) or (None, None)
+
+    def cached(self, key):
+        """Explanation already computed for an article, or None"""
+        explanation = self._explanations.get(key)
+        with self._lock:
+            self.requests += 1
+            self.cache_hits += explanation is not None
+        return explanation
+
+    def explain(self, key, X, served=None, from_predict=False):
+        """Bias, positive-class probability and the MAX_TOP_K largest contributions for the single row X
+
+        served is what another stage answered for the article (see served_result), kept with the result.
+        """
+        import xgboost as xgb
+
+        # One column per feature plus the bias; together they sum to the positive-class margin
+        contributions = self.booster.predict(xgb.DMatrix(X), pred_contribs=True)[0]
+        bias = float(contributions[-1])
+        contributions = contributions[:-1]
+
+        # Features absent from the row can still contribute (the tree's missing-value branch)
+        k = min(MAX_TOP_K, len(contributions))
+        top = np.argpartition(-np.abs(contributions), k - 1)[:k]
+        top = top[np.argsort(-np.abs(contributions[top]), kind='stable')]
+        values = X[0, top].toarray().ravel() if hasattr(X, 'toarray') else np.asarray(X)[0, top]
+
+        margin = bias + float(contributions.sum())
+        explanation = {
+            'positive_probability': float(1.0 / (1.0 + np.exp(-margin))),
+            'margin': margin,
+            'bias': bias,
+            'contributions': [
+                {
+                    'feature': str(self.names[index]),
+                    'type': 'ngram' if index < self.n_terms else 'stat',
+                    'value': float(value),
+                    'contribution': float(contributions[index])
+                }
+                for index, value in zip(top, values)
+            ],
+            'served': served
+        }
+        self._explanations.put(key, explanation)
+        if from_predict:
+            with self._lock:
+                self.row_hits += 1
+        return explanation
+
+    def stats(self):
+        """Cache sizes and hit counts in this worker"""
+        with self._lock:
+            requests, cache_hits, row_hits = self.requests, self.cache_hits, self.row_hits
+        return {
+            'requests': requests,
+            'cache_hits': cache_hits,
+            'rows_from_predict': row_hits,
+            'cached_rows': len(self._rows),
+            'cached_explanations': len(self._explanations)
+        }
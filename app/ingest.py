@@ -0,0 +1,149 @@
+"""
+Request Ingestion Helpers
+Transparent gzip/zstd request decompression with size bounds, and incremental
+NDJSON parsing so large batches are processed as they arrive
+"""
+
+import io
+import json
+import zlib
+from flask import request, current_app
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge, UnsupportedMediaType
+from werkzeug.wsgi import get_input_stream
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Newline-framed only (application/json-seq separates records with RS, not newlines)
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl')
+READ_SIZE = 64 * 1024
+
+class GzipReader(io.RawIOBase):
+    """Streaming gzip decoder over a file-like object"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self.pending = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending:
+            if self.decoder.unconsumed_tail:
+                data = self.decoder.unconsumed_tail
+            else:
+                data = self.raw.read(READ_SIZE)
+                if not data:
+                    self.pending = self.decoder.flush()
+                    if not self.pending:
+                        return 0
+                    break
+            try:
+                self.pending = self.decoder.decompress(data, len(buffer))
+            except zlib.error as e:
+                raise BadRequest(f'Invalid gzip body: {e}')
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+class LimitedReader(io.RawIOBase):
+    """Raise 413 once more than limit decoded bytes have been read"""
+
+    def __init__(self, raw, limit):
+        self.raw = raw
+        self.limit = limit
+        self.consumed = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = self.raw.readinto(buffer)
+        self.consumed += size
+        if self.limit is not None and self.consumed > self.limit:
+            raise RequestEntityTooLarge()
+        return size
+
+class _RawAdapter(io.RawIOBase):
+    """Expose any object with read() through readinto()"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+def decoded_stream(raw, limit):
+    """Wrap the raw body in a decoder for its Content-Encoding, bounded to limit decoded bytes"""
+    encoding = (request.headers.get('Content-Encoding') or 'identity').strip().lower()
+
+    if encoding == 'identity':
+        decoder = raw if isinstance(raw, io.RawIOBase) else _RawAdapter(raw)
+    elif encoding in ('gzip', 'x-gzip'):
+        decoder = GzipReader(raw)
+    elif encoding == 'zstd':
+        if zstandard is None:
+            raise UnsupportedMediaType('zstd request bodies are not supported on this server')
+        decoder = _RawAdapter(zstandard.ZstdDecompressor().stream_reader(raw))
+    else:
+        raise UnsupportedMediaType(f'Unsupported Content-Encoding: {encoding}')
+
+    return io.BufferedReader(LimitedReader(decoder, limit), buffer_size=READ_SIZE)
+
+def get_json_body():
+    """Parse the JSON request body, decompressing it first when Content-Encoding is set"""
+    if not request.headers.get('Content-Encoding'):
+        return request.get_json()
+
+    # Same Content-Type check request.get_json() applies to plain bodies
+    if not request.is_json:
+        raise UnsupportedMediaType("Did not attempt to load JSON data because the request "
+                                   "Content-Type was not 'application/json'.")
+
+    # Decoded size is bounded by the same limit as plain bodies
+    limit = current_app.config.get('MAX_CONTENT_LENGTH')
+    body = decoded_stream(request.stream, limit).read()
+    try:
+        return json.loads(body)
+    except ValueError as e:
+        raise BadRequest(f'Invalid JSON body: {e}')
+
+def is_ndjson():
+    """Whether the request body is newline-delimited JSON"""
+    return request.mimetype in NDJSON_MIMETYPES
+
+def iter_ndjson(max_stream_bytes, max_line_bytes):
+    """Yield (index, item, error) for each NDJSON line as it arrives"""
+    # Bypass MAX_CONTENT_LENGTH: streamed batches have their own, larger bound
+    raw = get_input_stream(request.environ, safe_fallback=False, max_content_length=max_stream_bytes)
+    stream = decoded_stream(raw, max_stream_bytes)
+
+    index = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        if len(line) > max_line_bytes and not line.endswith(b'\n'):
+            yield index, None, 'Line too long'
+            # Skip the rest of the oversized line
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_line_bytes)
+            index += 1
+            continue
+        if not line.strip():
+            continue
+        try:
+            yield index, json.loads(line), None
+        except ValueError as e:
+            yield index, None, f'Invalid JSON: {e}'
+        index += 1
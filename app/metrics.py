@@ -0,0 +1,90 @@
+"""
+Background CloudWatch Metric Publisher
+Request threads only fold each value into a per-metric statistic set; a
+background thread per worker process sends them with put_metric_data every
+few seconds, so no request waits on CloudWatch
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# put_metric_data accepts up to 1000 datums per call
+MAX_DATUMS_PER_CALL = 1000
+
+class MetricPublisher:
+    """Aggregates metrics per flush interval and publishes them off the request path"""
+
+    def __init__(self, namespace, client_factory, flush_seconds=10.0):
+        self.namespace = namespace
+        self.client_factory = client_factory
+        self.flush_seconds = flush_seconds
+
+        self._lock = threading.Lock()
+        self._worker_pid = None
+        self._pending = {}
+        self._counts = {'published': 0, 'failed_calls': 0}
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so start one per worker process on first use
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid != os.getpid():
+                self._pending = {}
+                threading.Thread(target=self._run, name='metric-publisher', daemon=True).start()
+                atexit.register(self.flush)
+                self._worker_pid = os.getpid()
+
+    def put(self, metric_name, value, unit='Count'):
+        """Record one value; never blocks on CloudWatch"""
+        self._ensure_worker()
+        value = float(value)
+        with self._lock:
+            stats = self._pending.get((metric_name, unit))
+            if stats is None:
+                self._pending[(metric_name, unit)] = {'SampleCount': 1, 'Sum': value, 'Minimum': value, 'Maximum': value}
+            else:
+                stats['SampleCount'] += 1
+                stats['Sum'] += value
+                stats['Minimum'] = min(stats['Minimum'], value)
+                stats['Maximum'] = max(stats['Maximum'], value)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+    def flush(self):
+        """Send everything recorded since the last flush, one statistic set per metric"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        timestamp = datetime.now(timezone.utc)
+        data = [
+            {'MetricName': name, 'Unit': unit, 'Timestamp': timestamp, 'StatisticValues': stats}
+            for (name, unit), stats in pending.items()
+        ]
+        for start in range(0, len(data), MAX_DATUMS_PER_CALL):
+            batch = data[start:start + MAX_DATUMS_PER_CALL]
+            try:
+                self.client_factory().put_metric_data(Namespace=self.namespace, MetricData=batch)
+            except Exception as e:
+                logger.warning(f"Failed to log to CloudWatch: {e}")
+                with self._lock:
+                    self._counts['failed_calls'] += 1
+                continue
+            with self._lock:
+                self._counts['published'] += len(batch)
+
+    def stats(self):
+        """Metrics waiting for the next flush and publish counts in this worker"""
+        with self._lock:
+            return {'pending': len(self._pending), **self._counts}
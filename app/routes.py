@@ -2,13 +2,14 @@
 Routes for the Fake News Detection Application
 """
 
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, Response, stream_with_context, current_app, g
+from werkzeug.exceptions import HTTPException
+import functools
 import logging
 import os
+import time
 import joblib
 import numpy as np
-from scipy.sparse import hstack
-import boto3
 from botocore.exceptions import ClientError
 import re
 from urllib.parse import urlparse
@@ -16,22 +17,35 @@ from urllib.parse import urlparse
 # Import preprocessing functions
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-from scripts.preprocess_data import clean_text, extract_statistical_features
+from scripts.preprocess_data import (
+    transform_features, truncate_frame, truncate_text, clean_combined_text, extract_statistical_features,
+    get_nlp_resources, set_nlp_resources
+)
+from scripts.nlp_resources import load_nlp_resources, DEFAULT_RESOURCE_NAME
+from scripts.near_duplicate import NearDuplicateIndex
+from scripts.drift_monitor import (
+    DriftMonitor, load_baseline, oov_rates, unigram_vocabulary, trailing_columns, BASELINE_FILE
+)
+from scripts.cascade import Cascade, FIRST_STAGE_FILE, first_stage_proba, short_circuit_mask
+from scripts.aws_clients import get_client
+from scripts.shared_bundle import load_shared_bundle, DEFAULT_BUNDLE_NAME
+from scripts.model_bundle import load_bundle
+from app.shadow import ShadowEvaluator, check_compatible
+from app.explain import Explainer, article_key, served_result, MAX_TOP_K
+from app.serialization import render, prediction_records, dumps_json
+from app.ingest import get_json_body, is_ndjson, iter_ndjson
+from app.admission import AdmissionController, DEGRADE, REJECT
+from app.metrics import MetricPublisher
 
 main = Blueprint('main', __name__)
 logger = logging.getLogger(__name__)
 
-# Initialize AWS clients (with error handling for local development)
-# Get AWS region from environment variable, default to us-east-1
-AWS_REGION = os.environ.get('AWS_DEFAULT_REGION', os.environ.get('AWS_REGION', 'us-east-1'))
+# AWS clients come from scripts.aws_clients: created per worker on first use (after the
+# gunicorn fork), with bounded timeouts and retries; AWS_BACKEND=fake serves them from local files
 
-try:
-    s3_client = boto3.client('s3', region_name=AWS_REGION)
-    cloudwatch = boto3.client('cloudwatch', region_name=AWS_REGION)
-except Exception as e:
-    logger.warning(f"AWS clients not initialized (running locally?): {e}")
-    s3_client = None
-    cloudwatch = None
+# CloudWatch metrics are aggregated per worker and sent by a background thread every METRICS_FLUSH_SECONDS
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', 10))
+metrics = MetricPublisher('NewsVerify', lambda: get_client('cloudwatch'), flush_seconds=METRICS_FLUSH_SECONDS)
 
 # S3 Configuration
 S3_BUCKET = os.environ.get('S3_BUCKET', 'newsverify-models')
@@ -39,20 +53,112 @@ MODEL_KEY = os.environ.get('MODEL_KEY', 'models/model.pkl')
 VECTORIZER_KEY = os.environ.get('VECTORIZER_KEY', 'models/tfidf_vectorizer.pkl')
 LABEL_ENCODER_KEY = os.environ.get('LABEL_ENCODER_KEY', 'models/label_encoder.pkl')
 STAT_FEATURES_KEY = os.environ.get('STAT_FEATURES_KEY', 'models/stat_feature_names.pkl')
+SHARED_BUNDLE_KEY = os.environ.get('SHARED_BUNDLE_KEY', f'models/{DEFAULT_BUNDLE_NAME}')
+NLP_RESOURCES_KEY = os.environ.get('NLP_RESOURCES_KEY', f'models/{DEFAULT_RESOURCE_NAME}')
+DRIFT_BASELINE_KEY = os.environ.get('DRIFT_BASELINE_KEY', f'models/{BASELINE_FILE}')
+CASCADE_MODEL_KEY = os.environ.get('CASCADE_MODEL_KEY', f'models/{FIRST_STAGE_FILE}')
+
+# Serving bundle format: 'pickle' (one joblib file per component, unpickled per worker)
+# or 'shared' (single memory-mapped file whose pages are shared by all workers on a host)
+MODEL_FORMAT = os.environ.get('MODEL_FORMAT', 'pickle')
+
+# Maximum number of articles accepted by /predict/batch
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 100))
+
+# NDJSON streaming batches: total decoded size bound and articles scored per micro-batch
+MAX_STREAM_BYTES = int(os.environ.get('MAX_STREAM_BYTES', 1024 * 1024 * 1024))
+STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', 32))
+
+# Admission control: shed requests (429) once the estimated queue time exceeds the budget,
+# and serve a cheaper path (body cut to DEGRADED_MAX_BODY_TOKENS) above the degrade budget.
+# Queue time comes from the proxy's X-Request-Start header; capacity is requests served in parallel.
+ADMISSION_QUEUE_BUDGET_MS = float(os.environ.get('ADMISSION_QUEUE_BUDGET_MS', 5000))
+ADMISSION_DEGRADE_BUDGET_MS = float(os.environ.get('ADMISSION_DEGRADE_BUDGET_MS', 2000))
+ADMISSION_CAPACITY = int(os.environ.get('ADMISSION_CAPACITY', 1))
+DEGRADED_MAX_BODY_TOKENS = int(os.environ.get('DEGRADED_MAX_BODY_TOKENS', 300))
+
+admission = AdmissionController(
+    queue_budget_ms=ADMISSION_QUEUE_BUDGET_MS,
+    degrade_budget_ms=ADMISSION_DEGRADE_BUDGET_MS,
+    capacity=ADMISSION_CAPACITY
+)
+
+# Near-duplicate index: reuse the score of a recently seen article whose cleaned text is at least
+# NEAR_DUPLICATE_THRESHOLD similar (estimated Jaccard over word 3-grams). Per worker, bounded to
+# NEAR_DUPLICATE_MAX_ENTRIES articles kept for NEAR_DUPLICATE_TTL_SECONDS; 0 entries disables it.
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', 0.9))
+NEAR_DUPLICATE_MAX_ENTRIES = int(os.environ.get('NEAR_DUPLICATE_MAX_ENTRIES', 10000))
+NEAR_DUPLICATE_TTL_SECONDS = float(os.environ.get('NEAR_DUPLICATE_TTL_SECONDS', 3600))
+
+near_duplicates = NearDuplicateIndex(
+    threshold=NEAR_DUPLICATE_THRESHOLD,
+    max_entries=NEAR_DUPLICATE_MAX_ENTRIES,
+    ttl_seconds=NEAR_DUPLICATE_TTL_SECONDS
+) if NEAR_DUPLICATE_MAX_ENTRIES > 0 else None
+
+# Drift monitoring: histograms of the stat features and TF-IDF out-of-vocabulary rate of served
+# articles, compared with the training baseline (drift_baseline.json in the bundle). Each worker
+# publishes its counts to DRIFT_STATE_DIR every DRIFT_FLUSH_SECONDS so reports cover all workers.
+DRIFT_MONITORING = os.environ.get('DRIFT_MONITORING', 'true').lower() == 'true'
+DRIFT_STATE_DIR = os.environ.get('DRIFT_STATE_DIR', '/tmp/newsverify-drift')
+DRIFT_FLUSH_SECONDS = float(os.environ.get('DRIFT_FLUSH_SECONDS', 30))
+
+# Cascade serving: a linear first stage on the stat features and headline tokens (first_stage.pkl
+# from train_local.py --cascade-data) answers articles it scores outside its uncertainty band, so
+# only the rest are cleaned, vectorized and scored by the full model. CASCADE_BAND_LOW/HIGH
+# override the band calibrated at training time.
+CASCADE_ENABLED = os.environ.get('CASCADE_ENABLED', 'false').lower() == 'true'
+CASCADE_BAND_LOW = os.environ.get('CASCADE_BAND_LOW')
+CASCADE_BAND_HIGH = os.environ.get('CASCADE_BAND_HIGH')
+
+# /explain: top contributing n-grams and stat features per article, with the feature rows built by
+# /predict and finished explanations kept in per-worker LRU caches of this many articles
+EXPLAIN_TOP_K = int(os.environ.get('EXPLAIN_TOP_K', 10))
+EXPLAIN_CACHE_SIZE = int(os.environ.get('EXPLAIN_CACHE_SIZE', 1000))
+
+# Shadow mode: score a sampled fraction of live requests with a candidate bundle in the background
+SHADOW_MODEL_DIR = os.environ.get('SHADOW_MODEL_DIR')
+SHADOW_SAMPLE_RATE = float(os.environ.get('SHADOW_SAMPLE_RATE', 0.1))
+SHADOW_QUEUE_SIZE = int(os.environ.get('SHADOW_QUEUE_SIZE', 100))
 
 # Load model and preprocessors (lazy loading)
 model = None
 tfidf_vectorizer = None
 label_encoder = None
 stat_feature_names = None
+shadow_evaluator = None
+drift_monitor = None
+unigram_terms = None
+cascade = None
+explainer = None
+loaded_model_dir = None
+
+def load_shared_model(bundle_path):
+    """Map a shared serving bundle and use it for the model and preprocessors"""
+    global model, tfidf_vectorizer, label_encoder, stat_feature_names
+    
+    bundle = load_shared_bundle(bundle_path)
+    model = bundle['model']
+    tfidf_vectorizer = bundle['tfidf_vectorizer']
+    label_encoder = bundle['label_encoder']
+    stat_feature_names = bundle['stat_feature_names']
+    logger.info(f"Shared model bundle mapped from {bundle_path}")
 
 def load_model_local():
     """Load model and preprocessors from local directory"""
-    global model, tfidf_vectorizer, label_encoder, stat_feature_names
+    global model, tfidf_vectorizer, label_encoder, stat_feature_names, loaded_model_dir
     
     try:
         # Try local models directory first
         local_model_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
+        loaded_model_dir = local_model_dir
+        
+        if MODEL_FORMAT == 'shared':
+            bundle_path = os.path.join(local_model_dir, DEFAULT_BUNDLE_NAME)
+            if os.path.exists(bundle_path):
+                load_shared_model(bundle_path)
+                return True
+            return False
         
         model_path = os.path.join(local_model_dir, 'model.pkl')
         vectorizer_path = os.path.join(local_model_dir, 'tfidf_vectorizer.pkl')
@@ -73,14 +179,57 @@ def load_model_local():
         logger.error(f"Error loading model from local: {e}")
         return False
 
+def load_nlp_resources_from_s3(local_model_dir):
+    """Download the baked stopword/lemma file; without it text cleaning needs the installed NLTK data"""
+    resources_path = os.path.join(local_model_dir, DEFAULT_RESOURCE_NAME)
+    try:
+        if not os.path.exists(resources_path):
+            logger.info(f"Downloading NLP resources from s3://{S3_BUCKET}/{NLP_RESOURCES_KEY}")
+            get_client('s3').download_file(S3_BUCKET, NLP_RESOURCES_KEY, resources_path)
+        set_nlp_resources(load_nlp_resources(resources_path))
+    except Exception as e:
+        logger.warning(f"NLP resources not available from S3, falling back to the installed NLTK data: {e}")
+
+def download_drift_baseline_from_s3(local_model_dir):
+    """Download the training feature baseline; without it drift monitoring stays off"""
+    baseline_path = os.path.join(local_model_dir, BASELINE_FILE)
+    try:
+        if not os.path.exists(baseline_path):
+            get_client('s3').download_file(S3_BUCKET, DRIFT_BASELINE_KEY, baseline_path)
+    except Exception as e:
+        logger.warning(f"Drift baseline not available from S3: {e}")
+
+def download_first_stage_from_s3(local_model_dir):
+    """Download the cascade first stage; without it every article takes the full path"""
+    first_stage_path = os.path.join(local_model_dir, FIRST_STAGE_FILE)
+    try:
+        if not os.path.exists(first_stage_path):
+            get_client('s3').download_file(S3_BUCKET, CASCADE_MODEL_KEY, first_stage_path)
+    except Exception as e:
+        logger.warning(f"Cascade first stage not available from S3: {e}")
+
 def load_model_from_s3():
     """Load model and preprocessors from S3"""
-    global model, tfidf_vectorizer, label_encoder, stat_feature_names
+    global model, tfidf_vectorizer, label_encoder, stat_feature_names, loaded_model_dir
     
     try:
         # Create local directory for models
         local_model_dir = '/tmp/models'
         os.makedirs(local_model_dir, exist_ok=True)
+        loaded_model_dir = local_model_dir
+        load_nlp_resources_from_s3(local_model_dir)
+        if DRIFT_MONITORING:
+            download_drift_baseline_from_s3(local_model_dir)
+        if CASCADE_ENABLED:
+            download_first_stage_from_s3(local_model_dir)
+        
+        if MODEL_FORMAT == 'shared':
+            bundle_path = os.path.join(local_model_dir, DEFAULT_BUNDLE_NAME)
+            if not os.path.exists(bundle_path):
+                logger.info(f"Downloading shared bundle from s3://{S3_BUCKET}/{SHARED_BUNDLE_KEY}")
+                get_client('s3').download_file(S3_BUCKET, SHARED_BUNDLE_KEY, bundle_path)
+            load_shared_model(bundle_path)
+            return True
         
         # Download from S3
         model_path = os.path.join(local_model_dir, 'model.pkl')
@@ -90,19 +239,19 @@ def load_model_from_s3():
         
         if not os.path.exists(model_path):
             logger.info(f"Downloading model from s3://{S3_BUCKET}/{MODEL_KEY}")
-            s3_client.download_file(S3_BUCKET, MODEL_KEY, model_path)
+            get_client('s3').download_file(S3_BUCKET, MODEL_KEY, model_path)
         
         if not os.path.exists(vectorizer_path):
             logger.info(f"Downloading vectorizer from s3://{S3_BUCKET}/{VECTORIZER_KEY}")
-            s3_client.download_file(S3_BUCKET, VECTORIZER_KEY, vectorizer_path)
+            get_client('s3').download_file(S3_BUCKET, VECTORIZER_KEY, vectorizer_path)
         
         if not os.path.exists(encoder_path):
             logger.info(f"Downloading label encoder from s3://{S3_BUCKET}/{LABEL_ENCODER_KEY}")
-            s3_client.download_file(S3_BUCKET, LABEL_ENCODER_KEY, encoder_path)
+            get_client('s3').download_file(S3_BUCKET, LABEL_ENCODER_KEY, encoder_path)
         
         if not os.path.exists(features_path):
             logger.info(f"Downloading feature names from s3://{S3_BUCKET}/{STAT_FEATURES_KEY}")
-            s3_client.download_file(S3_BUCKET, STAT_FEATURES_KEY, features_path)
+            get_client('s3').download_file(S3_BUCKET, STAT_FEATURES_KEY, features_path)
         
         # Load models
         model = joblib.load(model_path)
@@ -120,44 +269,346 @@ def load_model_from_s3():
         logger.error(f"Error loading model: {e}")
         return False
 
-def log_to_cloudwatch(metric_name, value, unit='Count'):
-    """Log metrics to CloudWatch"""
+def init_shadow():
+    """Load the candidate bundle for shadow mode, if configured"""
+    global shadow_evaluator
+    
+    if not SHADOW_MODEL_DIR:
+        return
+    
     try:
-        if cloudwatch:
-            cloudwatch.put_metric_data(
-                Namespace='NewsVerify',
-                MetricData=[
-                    {
-                        'MetricName': metric_name,
-                        'Value': value,
-                        'Unit': unit
-                    }
-                ]
-            )
+        candidate = load_bundle(SHADOW_MODEL_DIR)
+        primary = {
+            'model': model,
+            'tfidf_vectorizer': tfidf_vectorizer,
+            'stat_feature_names': stat_feature_names
+        }
+        check_compatible(primary, candidate)
+        
+        # Keep the candidate to one thread so it does not compete with request handling
+        if hasattr(candidate['model'], 'set_params'):
+            candidate['model'].set_params(n_jobs=1)
+        
+        shadow_evaluator = ShadowEvaluator(
+            candidate['model'],
+            sample_rate=SHADOW_SAMPLE_RATE,
+            queue_size=SHADOW_QUEUE_SIZE,
+            metrics_callback=log_to_cloudwatch
+        )
+        logger.info(f"Shadow mode enabled with candidate from {SHADOW_MODEL_DIR} (sample rate {SHADOW_SAMPLE_RATE})")
+    except Exception as e:
+        logger.error(f"Shadow mode disabled, candidate bundle not usable: {e}")
+
+def init_drift():
+    """Start drift monitoring against the baseline shipped with the loaded bundle"""
+    global drift_monitor, unigram_terms
+    
+    baseline_path = os.path.join(loaded_model_dir or '', BASELINE_FILE)
+    if not DRIFT_MONITORING or not os.path.exists(baseline_path):
+        return
+    
+    try:
+        baseline = load_baseline(baseline_path)
+        unigram_terms = unigram_vocabulary(tfidf_vectorizer)
+        drift_monitor = DriftMonitor(
+            baseline,
+            DRIFT_STATE_DIR,
+            flush_seconds=DRIFT_FLUSH_SECONDS,
+            metrics_callback=log_to_cloudwatch
+        )
+        logger.info(f"Drift monitoring enabled against baseline {baseline['id']}")
+    except Exception as e:
+        logger.error(f"Drift monitoring disabled: {e}")
+
+def init_cascade():
+    """Load the cascade first stage shipped with the loaded bundle"""
+    global cascade
+    
+    first_stage_path = os.path.join(loaded_model_dir or '', FIRST_STAGE_FILE)
+    if not CASCADE_ENABLED or not os.path.exists(first_stage_path):
+        return
+    
+    try:
+        first_stage = joblib.load(first_stage_path)
+        if list(first_stage['stat_feature_names']) != list(stat_feature_names):
+            raise ValueError("first stage was trained on different statistical features")
+        
+        band = None
+        if CASCADE_BAND_LOW is not None or CASCADE_BAND_HIGH is not None:
+            low, high = first_stage['band'] or (0.0, 1.0)
+            band = (float(CASCADE_BAND_LOW or low), float(CASCADE_BAND_HIGH or high))
+        cascade = Cascade(first_stage, band)
+        logger.info(f"Cascade enabled, full model scores first-stage probabilities in {cascade.band}")
+    except Exception as e:
+        logger.error(f"Cascade disabled: {e}")
+
+def init_explain():
+    """Precompute feature names for /explain (needs the XGBoost model, not a shared bundle)"""
+    global explainer
+    
+    if not Explainer.supports(model):
+        logger.info("Explanations disabled, the loaded model has no booster")
+        return
+    
+    try:
+        explainer = Explainer(model, tfidf_vectorizer, stat_feature_names, cache_size=EXPLAIN_CACHE_SIZE)
     except Exception as e:
-        logger.warning(f"Failed to log to CloudWatch: {e}")
+        logger.error(f"Explanations disabled: {e}")
+
+def log_to_cloudwatch(metric_name, value, unit='Count'):
+    """Log metrics to CloudWatch (queued for the background publisher, never blocks the request)"""
+    metrics.put(metric_name, value, unit)
 
 @main.route('/')
 def index():
     """Home page"""
     return render_template('index.html')
 
+def unload_model():
+    """Forget a partially loaded model so the next request retries the load"""
+    global model, tfidf_vectorizer, label_encoder, stat_feature_names
+    model = tfidf_vectorizer = label_encoder = stat_feature_names = None
+
+def ensure_model_loaded():
+    """Load model if not loaded (try local first, then S3)"""
+    if model is None:
+        if not load_model_local():
+            if not load_model_from_s3():
+                return False
+        
+        # Load stopwords/lemmas now rather than on the first request; without them nothing can be scored
+        try:
+            # WordNet (when installed) lemmatizes tokens missing from the table, as training did
+            logger.info(f"NLP resources: {get_nlp_resources().use_wordnet(required=False).stats()}")
+        except LookupError as e:
+            logger.error(f"Model not loaded: the bundle has no {DEFAULT_RESOURCE_NAME} and {e}")
+            unload_model()
+            return False
+        init_drift()
+        init_cascade()
+        init_explain()
+        init_shadow()
+    return True
+
+def score_frame(df_input):
+    """Score raw Headline/Body/URLs rows, returning (columnar results, features, probabilities)
+    
+    Features are None when any row was answered by the cascade first stage or the near-duplicate index.
+    """
+    # Bound worst-case latency with the same input limits used at training time
+    df_input, truncated = truncate_frame(df_input)
+    
+    # Under load, admission control asks for the cheaper path: a much shorter body
+    degraded = bool(g.get('degraded', False))
+    if degraded:
+        df_input['Body'] = [truncate_text(body, DEGRADED_MAX_BODY_TOKENS)[0] for body in df_input['Body']]
+    if truncated.any():
+        logger.info(f"{int(truncated.sum())} input(s) truncated to the configured size limits")
+        log_to_cloudwatch('TruncatedRequests', int(truncated.sum()))
+    
+    timings = {}
+    
+    # Cascade: the first stage answers the articles it is confident about before any text cleaning
+    stat_values = None
+    short_circuited = np.zeros(len(df_input), dtype=bool)
+    if cascade is not None:
+        cascade_start = time.perf_counter()
+        stat_values = extract_statistical_features(df_input)[stat_feature_names].to_numpy()
+        first_stage_scores, short_circuited = cascade.score(df_input['Headline'].tolist(), stat_values)
+        timings['first_stage'] = time.perf_counter() - cascade_start
+        if short_circuited.any():
+            log_to_cloudwatch('CascadeShortCircuits', int(short_circuited.sum()))
+    full = ~short_circuited
+    
+    # Cleaned text is shared by the near-duplicate lookup, drift monitoring and TF-IDF
+    combined_text = None
+    if (near_duplicates is not None or drift_monitor is not None) and full.any():
+        clean_start = time.perf_counter()
+        combined_text = clean_combined_text(df_input[full]).reindex(df_input.index, fill_value='')
+        timings['clean_text'] = time.perf_counter() - clean_start
+    
+    # Look up near-duplicates of recently scored articles before any TF-IDF or model work
+    hits = [None] * len(df_input)
+    if near_duplicates is not None and full.any():
+        lookup_start = time.perf_counter()
+        hits = [near_duplicates.query(text) if needed else None for text, needed in zip(combined_text, full)]
+        timings['near_duplicate'] = time.perf_counter() - lookup_start
+    missed = full & np.array([hit is None for hit in hits], dtype=bool)
+    if (full & ~missed).any():
+        log_to_cloudwatch('NearDuplicateHits', int((full & ~missed).sum()))
+    
+    rows = [None if hit is None else hit[0] for hit in hits]
+    for position in np.flatnonzero(short_circuited):
+        rows[position] = first_stage_scores[position]
+    X = None
+    if missed.any():
+        # Clean text, extract statistical features and apply TF-IDF
+        X = transform_features(
+            df_input[missed], tfidf_vectorizer, stat_feature_names, timings=timings,
+            combined_text=None if combined_text is None else combined_text[missed],
+            stat_features=None if stat_values is None else stat_values[missed]
+        )
+        
+        # Predict once; the label is the most probable class
+        predict_start = time.perf_counter()
+        scored = model.predict_proba(X)
+        timings['predict'] = time.perf_counter() - predict_start
+        
+        for position, row in zip(np.flatnonzero(missed), scored):
+            rows[position] = row
+        
+        # Degraded scores come from shortened bodies, so they are not reused
+        if near_duplicates is not None and not degraded:
+            for text, row in zip(combined_text[missed], scored):
+                near_duplicates.insert(text, row)
+        
+        # Stat features are the last columns of the feature rows already built
+        if drift_monitor is not None:
+            drift_start = time.perf_counter()
+            try:
+                drift_monitor.update(
+                    trailing_columns(X, len(stat_feature_names)),
+                    list(stat_feature_names),
+                    oov_rates(combined_text[missed], unigram_terms)
+                )
+            except Exception as e:
+                logger.warning(f"Drift monitor update failed: {e}")
+            timings['drift'] = time.perf_counter() - drift_start
+    
+    # Short-circuited articles were never cleaned, so they only count towards the stat features
+    if drift_monitor is not None and short_circuited.any():
+        try:
+            drift_monitor.update(
+                stat_values[short_circuited],
+                list(stat_feature_names),
+                np.full(int(short_circuited.sum()), np.nan)
+            )
+        except Exception as e:
+            logger.warning(f"Drift monitor update failed: {e}")
+    admission.observe(timings)
+    
+    probabilities = np.vstack(rows)
+    predictions = probabilities.argmax(axis=1)
+    
+    # Convert whole columns to native Python types in one step each
+    columns = {
+        'prediction': label_encoder.inverse_transform(predictions).astype(str).tolist(),
+        'confidence': probabilities.max(axis=1).tolist(),
+        'fake': probabilities[:, 0].tolist(),
+        'real': probabilities[:, 1].tolist() if probabilities.shape[1] > 1 else [0.0] * len(predictions),
+        'truncated': truncated.tolist(),
+        'degraded': [degraded] * len(predictions),
+        'near_duplicate': (full & ~missed).tolist(),
+        'first_stage': short_circuited.tolist()
+    }
+    return columns, (X if missed.all() else None), probabilities
+
+def admission_controlled(view):
+    """Shed or degrade requests based on estimated queue time before doing any work"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        decision = admission.admit(request.headers)
+        if decision == REJECT:
+            log_to_cloudwatch('ShedRequests', 1)
+            response = jsonify({'error': 'Server is overloaded, please retry later'})
+            response.headers['Retry-After'] = str(admission.retry_after_seconds())
+            return response, 429
+        
+        if decision == DEGRADE:
+            log_to_cloudwatch('DegradedRequests', 1)
+        g.degraded = decision == DEGRADE
+        
+        started = admission.begin()
+        try:
+            response = view(*args, **kwargs)
+        except BaseException:
+            admission.end(started)
+            raise
+        
+        # Streamed NDJSON is scored while the client reads it, so it stays in flight until the body
+        # is closed; its duration is not one request's service time, so it is kept out of the EWMA
+        if isinstance(response, Response) and response.is_streamed:
+            response.call_on_close(lambda: admission.end(started, record=False))
+        else:
+            admission.end(started)
+        return response
+    return wrapper
+
+def http_error(e):
+    """JSON error response for request errors (oversize, bad encoding, invalid JSON)"""
+    if e.code == 413:
+        log_to_cloudwatch('RejectedOversizeRequests', 1)
+        return jsonify({'error': 'Request body too large'}), 413
+    return jsonify({'error': e.description}), e.code
+
+def stream_batch_predictions():
+    """Score NDJSON articles in micro-batches as they arrive, streaming NDJSON results back"""
+    import pandas as pd
+    max_line_bytes = current_app.config.get('MAX_CONTENT_LENGTH') or MAX_STREAM_BYTES
+    
+    def score_pending(pending):
+        df_batch = pd.DataFrame({
+            'Headline': [article.get('headline', '') for _, article in pending],
+            'Body': [article.get('body', '') for _, article in pending],
+            'URLs': [article.get('url', '') for _, article in pending]
+        })
+        columns, _, _ = score_frame(df_batch)
+        for (index, _), record in zip(pending, prediction_records(columns)):
+            yield dumps_json({'index': index, **record}) + b'\n'
+    
+    def generate():
+        pending = []
+        scored = 0
+        try:
+            for index, article, error in iter_ndjson(MAX_STREAM_BYTES, max_line_bytes):
+                if error is None and not (isinstance(article, dict) and (article.get('headline') or article.get('body'))):
+                    error = 'Please provide at least headline or body text'
+                if error is not None:
+                    yield dumps_json({'index': index, 'error': error}) + b'\n'
+                    continue
+                
+                pending.append((index, article))
+                if len(pending) >= STREAM_BATCH_SIZE:
+                    yield from score_pending(pending)
+                    scored += len(pending)
+                    pending = []
+            
+            if pending:
+                yield from score_pending(pending)
+                scored += len(pending)
+        except HTTPException as e:
+            yield dumps_json({'error': e.description if e.code != 413 else 'Request body too large'}) + b'\n'
+        except Exception as e:
+            logger.error(f"Streaming prediction error: {e}", exc_info=True)
+            log_to_cloudwatch('PredictionErrors', 1)
+            yield dumps_json({'error': str(e)}) + b'\n'
+        
+        log_to_cloudwatch('Predictions', scored)
+        logger.info(f"Streamed batch prediction: {scored} articles")
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def served_stage(record):
+    """Which stage answered a prediction record: first_stage, near_duplicate, degraded or full_model"""
+    for stage in ('first_stage', 'near_duplicate', 'degraded'):
+        if record[stage]:
+            return stage
+    return 'full_model'
+
 @main.route('/predict', methods=['POST'])
+@admission_controlled
 def predict():
     """Predict endpoint"""
-    global model, tfidf_vectorizer, label_encoder, stat_feature_names
-    
     try:
-        # Load model if not loaded (try local first, then S3)
-        if model is None:
-            if not load_model_local():
-                if not load_model_from_s3():
-                    return jsonify({
-                        'error': 'Model not available. Please ensure model is trained and available locally or in S3.'
-                    }), 500
-        
-        # Get input data
-        data = request.get_json()
+        if not ensure_model_loaded():
+            return jsonify({
+                'error': 'Model not available. Please ensure model is trained and available locally or in S3.'
+            }), 500
+        
+        # Get input data (gzip/zstd bodies are decompressed transparently)
+        data = get_json_body()
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
         headline = data.get('headline', '')
         body = data.get('body', '')
         url = data.get('url', '')
@@ -167,12 +618,7 @@ def predict():
         
         logger.info(f"Received prediction request - Headline: {headline[:50]}...")
         
-        # Preprocess text
-        headline_cleaned = clean_text(headline)
-        body_cleaned = clean_text(body)
-        combined_text = headline_cleaned + ' ' + body_cleaned
-        
-        # Create DataFrame for statistical features
+        # Create DataFrame in the same layout used for training
         import pandas as pd
         df_temp = pd.DataFrame({
             'Headline': [headline],
@@ -180,56 +626,205 @@ def predict():
             'URLs': [url]
         })
         
-        # Extract statistical features
-        stat_features = extract_statistical_features(df_temp)
+        columns, X, probabilities = score_frame(df_temp)
+        result = prediction_records(columns)[0]
         
-        # Ensure feature order matches training
-        stat_features = stat_features[stat_feature_names]
+        # Log to CloudWatch
+        log_to_cloudwatch('Predictions', 1)
+        log_to_cloudwatch('Confidence', result['confidence'], 'None')
+        
+        logger.info(f"Prediction: {result['prediction']} (confidence: {result['confidence']:.2f})")
+        
+        # Hand the already-built feature row to the candidate model (never blocks)
+        if shadow_evaluator is not None and X is not None:
+            shadow_evaluator.submit(X, probabilities[0])
         
-        # TF-IDF transformation
-        tfidf_features = tfidf_vectorizer.transform([combined_text])
+        # Keep the row for /explain, and what was served when the full model did not answer in full
+        if explainer is not None:
+            served_by = served_stage(result)
+            explainer.remember(
+                article_key(headline, body, url),
+                X if served_by == 'full_model' else None,
+                None if served_by == 'full_model' else served_result(served_by, probabilities[0], label_encoder)
+            )
+        
+        return render(result)
+        
+    except HTTPException as e:
+        return http_error(e)
+    except Exception as e:
+        logger.error(f"Prediction error: {e}", exc_info=True)
+        log_to_cloudwatch('PredictionErrors', 1)
+        return jsonify({'error': str(e)}), 500
+
+@main.route('/predict/batch', methods=['POST'])
+@admission_controlled
+def predict_batch():
+    """Batch predict endpoint: {"articles": [{"headline", "body", "url"}, ...]}"""
+    try:
+        if not ensure_model_loaded():
+            return jsonify({
+                'error': 'Model not available. Please ensure model is trained and available locally or in S3.'
+            }), 500
         
-        # Combine features
-        X = hstack([tfidf_features, stat_features.values])
+        if is_ndjson():
+            return stream_batch_predictions()
         
-        # Predict
-        prediction = model.predict(X)[0]
-        probability = model.predict_proba(X)[0]
+        data = get_json_body()
+        articles = data.get('articles') if isinstance(data, dict) else None
+        if not isinstance(articles, list) or not articles:
+            return jsonify({'error': 'Please provide a non-empty "articles" list'}), 400
+        if len(articles) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'Batch too large, at most {MAX_BATCH_SIZE} articles per request'}), 413
         
-        # Decode label - ensure native Python types (convert all numpy types)
-        prediction = int(prediction)  # Convert numpy int64 to Python int
-        label_array = label_encoder.inverse_transform([prediction])
-        label = str(label_array[0])  # Ensure string, handle numpy string types
-        confidence = float(max(probability))
+        for i, article in enumerate(articles):
+            if not isinstance(article, dict) or not (article.get('headline') or article.get('body')):
+                return jsonify({'error': f'Article {i}: please provide at least headline or body text'}), 400
         
-        # Convert probability array to native Python floats
-        prob_fake = float(probability[0]) if len(probability) > 0 else 0.0
-        prob_real = float(probability[1]) if len(probability) > 1 else 0.0
+        import pandas as pd
+        df_batch = pd.DataFrame({
+            'Headline': [article.get('headline', '') for article in articles],
+            'Body': [article.get('body', '') for article in articles],
+            'URLs': [article.get('url', '') for article in articles]
+        })
         
-        # Log to CloudWatch
-        log_to_cloudwatch('Predictions', 1)
-        log_to_cloudwatch('Confidence', confidence, 'None')
-        
-        result = {
-            'prediction': label,
-            'confidence': confidence,
-            'probabilities': {
-                'fake': prob_fake,
-                'real': prob_real
-            }
-        }
+        columns, _, _ = score_frame(df_batch)
         
-        logger.info(f"Prediction: {label} (confidence: {confidence:.2f})")
+        log_to_cloudwatch('Predictions', len(articles))
+        logger.info(f"Batch prediction: {len(articles)} articles")
         
-        return jsonify(result)
+        return render({'count': len(articles), 'results': prediction_records(columns)}, columns=columns)
         
+    except HTTPException as e:
+        return http_error(e)
     except Exception as e:
-        logger.error(f"Prediction error: {e}", exc_info=True)
+        logger.error(f"Batch prediction error: {e}", exc_info=True)
         log_to_cloudwatch('PredictionErrors', 1)
         return jsonify({'error': str(e)}), 500
 
+@main.route('/explain', methods=['POST'])
+@admission_controlled
+def explain():
+    """Top contributing n-grams and statistical features behind the full model's score for one article"""
+    try:
+        if not ensure_model_loaded():
+            return jsonify({
+                'error': 'Model not available. Please ensure model is trained and available locally or in S3.'
+            }), 500
+        if explainer is None:
+            return jsonify({'error': 'Explanations need the XGBoost model (not available with MODEL_FORMAT=shared)'}), 501
+        
+        data = get_json_body()
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        headline = data.get('headline', '')
+        body = data.get('body', '')
+        url = data.get('url', '')
+        
+        if not headline and not body:
+            return jsonify({'error': 'Please provide at least headline or body text'}), 400
+        try:
+            top_k = min(max(int(data.get('top_k', EXPLAIN_TOP_K)), 1), MAX_TOP_K)
+        except (TypeError, ValueError):
+            return jsonify({'error': f'top_k must be an integer between 1 and {MAX_TOP_K}'}), 400
+        
+        key = article_key(headline, body, url)
+        X, served = explainer.recall(key)
+        explanation = explainer.cached(key)
+        cached = explanation is not None
+        if not cached:
+            from_predict = X is not None
+            if X is None:
+                # Build the row as /predict does; without a /predict result, check whether the
+                # cascade first stage would have answered this article instead of the full model
+                import pandas as pd
+                df_temp, _ = truncate_frame(pd.DataFrame({
+                    'Headline': [headline],
+                    'Body': [body],
+                    'URLs': [url]
+                }))
+                stat_values = extract_statistical_features(df_temp)[stat_feature_names].to_numpy()
+                X = transform_features(df_temp, tfidf_vectorizer, stat_feature_names, stat_features=stat_values)
+                if served is None and cascade is not None:
+                    first_stage_scores = first_stage_proba(cascade.first_stage, df_temp['Headline'].tolist(), stat_values)
+                    if short_circuit_mask(first_stage_scores, cascade.band)[0]:
+                        served = served_result('first_stage', first_stage_scores[0], label_encoder)
+            explanation = explainer.explain(key, X, served=served, from_predict=from_predict)
+        served = served or explanation['served']
+        
+        # Contributions push towards the second class, as in the model's own margin
+        positive = explanation['positive_probability']
+        probabilities = np.array([1.0 - positive, positive])
+        log_to_cloudwatch('Explanations', 1)
+        
+        response = {
+            'prediction': str(label_encoder.inverse_transform([int(probabilities.argmax())])[0]),
+            'confidence': float(probabilities.max()),
+            'probabilities': {'fake': float(probabilities[0]), 'real': float(probabilities[1])},
+            'positive_class': str(label_encoder.classes_[1]),
+            'bias': explanation['bias'],
+            'contributions': explanation['contributions'][:top_k],
+            'cached': cached,
+            # The contributions, prediction and confidence above are always the full model's
+            'explained_model': 'full_model',
+            'served_by': 'full_model' if served is None else served['served_by']
+        }
+        if served is not None:
+            response['served'] = {name: served[name] for name in ('prediction', 'confidence', 'probabilities')}
+        return render(response)
+        
+    except HTTPException as e:
+        return http_error(e)
+    except Exception as e:
+        logger.error(f"Explanation error: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+@main.route('/explain', methods=['GET'])
+def explain_stats():
+    """Explanation cache sizes and hit counts for this worker"""
+    if explainer is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify({'enabled': True, **explainer.stats()}), 200
+
 @main.route('/health', methods=['GET'])
 def health():
-    """Health check endpoint"""
-    return jsonify({'status': 'healthy'}), 200
+    """Health check endpoint; always 200 so an overloaded instance is not taken out of service"""
+    admission_state = admission.state()
+    status = {'shedding': 'shedding', 'degraded': 'degraded'}.get(admission_state['state'], 'healthy')
+    return jsonify({'status': status, 'admission': admission_state}), 200
+
+@main.route('/ready', methods=['GET'])
+def ready():
+    """Readiness for routing that opts in: 503 while this worker is shedding"""
+    admission_state = admission.state()
+    if admission_state['state'] == 'shedding':
+        return jsonify({'ready': False, 'admission': admission_state}), 503
+    return jsonify({'ready': True, 'admission': admission_state}), 200
+
+@main.route('/shadow', methods=['GET'])
+def shadow():
+    """Shadow-mode statistics for this worker"""
+    if shadow_evaluator is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify({'enabled': True, 'candidate': SHADOW_MODEL_DIR, **shadow_evaluator.stats()}), 200
+
+@main.route('/near-duplicates', methods=['GET'])
+def near_duplicate_stats():
+    """Near-duplicate index size and hit rate for this worker"""
+    if near_duplicates is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify({'enabled': True, **near_duplicates.stats()}), 200
+
+@main.route('/cascade', methods=['GET'])
+def cascade_stats():
+    """Cascade band, calibration report and short-circuited fraction for this worker"""
+    if cascade is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify({'enabled': True, **cascade.stats()}), 200
 
+@main.route('/drift', methods=['GET'])
+def drift():
+    """Feature drift (PSI) against the training baseline, merged across workers"""
+    if drift_monitor is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify({'enabled': True, **drift_monitor.report()}), 200
\ No newline at end of file
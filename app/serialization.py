@@ -0,0 +1,76 @@
+"""
+Response Serialization for the Prediction Endpoints
+Builds responses from columnar results in a fixed schema and encodes them as
+JSON (orjson when installed), MessagePack or Arrow IPC based on the Accept header
+"""
+
+import json
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+def prediction_records(columns):
+    """Turn columnar results (native Python lists) into per-item response dicts"""
+    return [
+        {
+            'prediction': prediction,
+            'confidence': confidence,
+            'probabilities': {'fake': fake, 'real': real},
+            'truncated': truncated,
+            'degraded': degraded,
+            'near_duplicate': near_duplicate,
+            'first_stage': first_stage
+        }
+        for prediction, confidence, fake, real, truncated, degraded, near_duplicate, first_stage in zip(
+            columns['prediction'], columns['confidence'], columns['fake'], columns['real'],
+            columns['truncated'], columns['degraded'], columns['near_duplicate'], columns['first_stage']
+        )
+    ]
+
+def dumps_json(payload):
+    """Encode a payload of native types as compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+def negotiate(columnar=False):
+    """Pick the response content type from the Accept header (JSON unless asked otherwise)"""
+    offered = [JSON_MIMETYPE]
+    if msgpack is not None:
+        offered += [MSGPACK_MIMETYPE, 'application/x-msgpack']
+    if columnar and pa is not None:
+        offered.append(ARROW_MIMETYPE)
+    return request.accept_mimetypes.best_match(offered, default=JSON_MIMETYPE)
+
+def render(payload, status=200, columns=None):
+    """Encode a response; columns (name -> list) enables the Arrow format for batch results"""
+    mimetype = negotiate(columnar=columns is not None)
+
+    if mimetype == ARROW_MIMETYPE:
+        table = pa.table(columns)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(sink.getvalue().to_pybytes(), status=status, mimetype=ARROW_MIMETYPE)
+
+    if mimetype in (MSGPACK_MIMETYPE, 'application/x-msgpack'):
+        return Response(msgpack.packb(payload, use_bin_type=True), status=status, mimetype=MSGPACK_MIMETYPE)
+
+    return Response(dumps_json(payload), status=status, mimetype=JSON_MIMETYPE)
@@ -0,0 +1,122 @@
+"""
+Shadow-mode Evaluation of a Candidate Model
+Scores a sampled fraction of the feature rows already built for /predict with a
+candidate bundle on a background thread, recording agreement and probability deltas
+"""
+
+import logging
+import os
+import queue
+import random
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DELTA_BINS = np.array([0.01, 0.05, 0.1, 0.2, 0.5])
+
+class ShadowEvaluator:
+    """Bounded, drop-on-full background scorer for a candidate model"""
+
+    def __init__(self, candidate_model, sample_rate=0.1, queue_size=100, metrics_callback=None, report_every=100):
+        self.candidate_model = candidate_model
+        self.sample_rate = sample_rate
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.metrics_callback = metrics_callback
+        self.report_every = report_every
+
+        self._lock = threading.Lock()
+        self._worker_pid = None
+        self._counts = {'sampled': 0, 'dropped': 0, 'scored': 0, 'agreed': 0, 'errors': 0}
+        self._delta_sum = 0.0
+        self._delta_max = 0.0
+        self._delta_histogram = np.zeros(len(DELTA_BINS) + 1, dtype=np.int64)
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so start one per worker process on first use
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid != os.getpid():
+                threading.Thread(target=self._run, name='shadow-evaluator', daemon=True).start()
+                self._worker_pid = os.getpid()
+
+    def submit(self, X, primary_probability):
+        """Hand a feature row to the background scorer; never blocks the caller"""
+        if random.random() >= self.sample_rate:
+            return False
+
+        self._ensure_worker()
+        try:
+            self.queue.put_nowait((X, np.asarray(primary_probability, dtype=np.float64)))
+        except queue.Full:
+            with self._lock:
+                self._counts['dropped'] += 1
+            return False
+
+        with self._lock:
+            self._counts['sampled'] += 1
+        return True
+
+    def _run(self):
+        while True:
+            X, primary_probability = self.queue.get()
+            try:
+                candidate_probability = self.candidate_model.predict_proba(X)[0]
+                self._record(primary_probability, candidate_probability)
+            except Exception as e:
+                logger.warning(f"Shadow scoring failed: {e}")
+                with self._lock:
+                    self._counts['errors'] += 1
+            finally:
+                self.queue.task_done()
+
+    def _record(self, primary_probability, candidate_probability):
+        delta = float(abs(candidate_probability[-1] - primary_probability[-1]))
+        agreed = int(np.argmax(candidate_probability)) == int(np.argmax(primary_probability))
+
+        with self._lock:
+            self._counts['scored'] += 1
+            self._counts['agreed'] += int(agreed)
+            self._delta_sum += delta
+            self._delta_max = max(self._delta_max, delta)
+            self._delta_histogram[np.searchsorted(DELTA_BINS, delta, side='right')] += 1
+            report = self._counts['scored'] % self.report_every == 0
+
+        if report and self.metrics_callback is not None:
+            snapshot = self.stats()
+            self.metrics_callback('ShadowAgreementRate', snapshot['agreement_rate'], 'None')
+            self.metrics_callback('ShadowMeanProbabilityDelta', snapshot['mean_probability_delta'], 'None')
+
+    def stats(self):
+        """Snapshot of shadow-mode counters for this worker process"""
+        with self._lock:
+            scored = self._counts['scored']
+            histogram = self._delta_histogram.tolist()
+            stats = dict(self._counts)
+            stats.update({
+                'sample_rate': self.sample_rate,
+                'queue_depth': self.queue.qsize(),
+                'queue_size': self.queue.maxsize,
+                'agreement_rate': self._counts['agreed'] / scored if scored else None,
+                'mean_probability_delta': self._delta_sum / scored if scored else None,
+                'max_probability_delta': self._delta_max,
+                'probability_delta_histogram': {
+                    'upper_bounds': DELTA_BINS.tolist() + [1.0],
+                    'counts': histogram
+                }
+            })
+        return stats
+
+def check_compatible(primary, candidate):
+    """Raise ValueError unless the candidate model can score the primary's feature rows"""
+    if list(candidate['stat_feature_names']) != list(primary['stat_feature_names']):
+        raise ValueError("candidate uses different statistical features")
+    if candidate['model'].n_features_in_ != primary['model'].n_features_in_:
+        raise ValueError(f"candidate expects {candidate['model'].n_features_in_} features, "
+                         f"primary produces {primary['model'].n_features_in_}")
+
+    primary_vocabulary = getattr(primary['tfidf_vectorizer'], 'vocabulary_', None)
+    candidate_vocabulary = getattr(candidate['tfidf_vectorizer'], 'vocabulary_', None)
+    if primary_vocabulary is not None and candidate_vocabulary is not None and primary_vocabulary != candidate_vocabulary:
+        raise ValueError("candidate was trained with a different TF-IDF vocabulary")
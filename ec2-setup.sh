@@ -55,9 +55,10 @@ else
     pip install flask gunicorn boto3 pandas numpy scikit-learn xgboost nltk textblob joblib
 fi
 
-# Download NLTK data
+# NLTK data: text cleaning prefers models/nlp_resources.nva from the model bundle; stopwords
+# are the fallback for bundles without it and WordNet lemmatizes tokens missing from its table
 echo "📚 Downloading NLTK data..."
-python -c "import nltk; nltk.download('punkt', quiet=True); nltk.download('stopwords', quiet=True); nltk.download('wordnet', quiet=True)" || true
+python -m nltk.downloader -q stopwords wordnet
 
 # Create .env file
 echo "⚙️  Creating environment file..."
@@ -0,0 +1,200 @@
+"""
+Shared AWS Client Factory
+Per-process boto3 clients, created on first use (never inherited across fork), with a
+tuned connection pool, TCP keep-alive, adaptive retries and bounded timeouts, plus a
+local fake backend (AWS_BACKEND=fake) so S3 and CloudWatch paths run offline
+"""
+
+import io
+import json
+import os
+import shutil
+import threading
+import time
+
+AWS_REGION = os.environ.get('AWS_DEFAULT_REGION', os.environ.get('AWS_REGION', 'us-east-1'))
+
+# 'aws' for real clients, 'fake' for the local file-backed S3/CloudWatch below
+AWS_BACKEND = os.environ.get('AWS_BACKEND', 'aws')
+AWS_FAKE_ROOT = os.environ.get('AWS_FAKE_ROOT', '/tmp/newsverify-fake-aws')
+# Added to every fake call, to see how slow AWS affects request latency
+AWS_FAKE_LATENCY_MS = float(os.environ.get('AWS_FAKE_LATENCY_MS', 0))
+
+# Connections kept per client (one per concurrent request thread is enough)
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', 20))
+AWS_CONNECT_TIMEOUT = float(os.environ.get('AWS_CONNECT_TIMEOUT', 2))
+AWS_READ_TIMEOUT = float(os.environ.get('AWS_READ_TIMEOUT', 30))
+# Attempts per call, including the first
+AWS_MAX_ATTEMPTS = int(os.environ.get('AWS_MAX_ATTEMPTS', 4))
+
+# CloudWatch metrics are sent by a background thread per worker; giving up quickly on a slow
+# endpoint keeps one failed flush from delaying the next
+SERVICE_CONFIG = {
+    'cloudwatch': {
+        'connect_timeout': float(os.environ.get('CLOUDWATCH_CONNECT_TIMEOUT', 0.5)),
+        'read_timeout': float(os.environ.get('CLOUDWATCH_READ_TIMEOUT', 1)),
+        'max_attempts': int(os.environ.get('CLOUDWATCH_MAX_ATTEMPTS', 2))
+    }
+}
+
+_lock = threading.Lock()
+_session = None
+_clients = {}
+
+def _reset_after_fork():
+    # Sockets and locks copied from the parent must not be shared with it
+    global _lock, _session, _clients
+    _lock = threading.Lock()
+    _session = None
+    _clients = {}
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def client_config(service=None):
+    """botocore Config with the pool, keep-alive, retry and timeout settings for service"""
+    from botocore.config import Config
+
+    settings = {
+        'connect_timeout': AWS_CONNECT_TIMEOUT,
+        'read_timeout': AWS_READ_TIMEOUT,
+        'max_attempts': AWS_MAX_ATTEMPTS
+    }
+    settings.update(SERVICE_CONFIG.get(service, {}))
+    return Config(
+        region_name=AWS_REGION,
+        max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        connect_timeout=settings['connect_timeout'],
+        read_timeout=settings['read_timeout'],
+        retries={'mode': 'adaptive', 'total_max_attempts': settings['max_attempts']}
+    )
+
+def get_session():
+    """boto3 Session for this process (the default session is not safe to share across threads)"""
+    global _session
+    with _lock:
+        if _session is None:
+            import boto3
+            _session = boto3.session.Session(region_name=AWS_REGION)
+        return _session
+
+def get_client(service):
+    """Client for service in this process, created on first use"""
+    client = _clients.get(service)
+    if client is not None:
+        return client
+
+    if AWS_BACKEND == 'fake':
+        if service not in FAKE_CLIENTS:
+            raise ValueError(f"The fake AWS backend does not provide {service}")
+        created = FAKE_CLIENTS[service](AWS_FAKE_ROOT)
+    else:
+        created = get_session().client(service, config=client_config(service))
+
+    with _lock:
+        # Another thread may have won the race; keep a single client per service
+        return _clients.setdefault(service, created)
+
+def _fake_delay():
+    if AWS_FAKE_LATENCY_MS > 0:
+        time.sleep(AWS_FAKE_LATENCY_MS / 1000)
+
+def _not_found(operation, bucket, key):
+    from botocore.exceptions import ClientError
+    return ClientError({'Error': {'Code': '404', 'Message': f"s3://{bucket}/{key} not found"}}, operation)
+
+class FakeS3Client:
+    """S3 subset used by this project, backed by <root>/s3/<bucket>/<key>"""
+
+    def __init__(self, root):
+        self.root = os.path.join(root, 's3')
+
+    def _path(self, bucket, key):
+        return os.path.join(self.root, bucket, key)
+
+    def download_file(self, Bucket, Key, Filename):
+        _fake_delay()
+        path = self._path(Bucket, Key)
+        if not os.path.isfile(path):
+            raise _not_found('HeadObject', Bucket, Key)
+        shutil.copyfile(path, Filename)
+
+    def upload_file(self, Filename, Bucket, Key):
+        _fake_delay()
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(Filename, path)
+
+    def put_object(self, Bucket, Key, Body):
+        _fake_delay()
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(Body if isinstance(Body, bytes) else Body.encode('utf-8'))
+        return {}
+
+    def get_object(self, Bucket, Key):
+        _fake_delay()
+        path = self._path(Bucket, Key)
+        if not os.path.isfile(path):
+            raise _not_found('GetObject', Bucket, Key)
+        with open(path, 'rb') as f:
+            return {'Body': io.BytesIO(f.read()), 'ContentLength': os.path.getsize(path)}
+
+    def list_objects_v2(self, Bucket, Prefix=''):
+        _fake_delay()
+        bucket_dir = os.path.join(self.root, Bucket)
+        contents = []
+        for directory, _, files in os.walk(bucket_dir):
+            for name in files:
+                path = os.path.join(directory, name)
+                key = os.path.relpath(path, bucket_dir).replace(os.sep, '/')
+                if key.startswith(Prefix):
+                    contents.append({'Key': key, 'Size': os.path.getsize(path)})
+        contents.sort(key=lambda obj: obj['Key'])
+        page = {'KeyCount': len(contents)}
+        if contents:
+            page['Contents'] = contents
+        return page
+
+    def get_paginator(self, operation):
+        if operation != 'list_objects_v2':
+            raise ValueError(f"The fake S3 client cannot paginate {operation}")
+        return _FakePaginator(self.list_objects_v2)
+
+class _FakePaginator:
+    def __init__(self, operation):
+        self.operation = operation
+
+    def paginate(self, **kwargs):
+        # Everything fits on one page
+        return iter([self.operation(**kwargs)])
+
+class FakeCloudWatchClient:
+    """put_metric_data appending one JSON line per datum to <root>/cloudwatch/<namespace>.jsonl"""
+
+    def __init__(self, root):
+        self.root = os.path.join(root, 'cloudwatch')
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def put_metric_data(self, Namespace, MetricData):
+        _fake_delay()
+        lines = ''.join(json.dumps({'timestamp': time.time(), **datum}, default=str) + '\n' for datum in MetricData)
+        with self._lock, open(os.path.join(self.root, f'{Namespace}.jsonl'), 'a') as f:
+            f.write(lines)
+        return {}
+
+    def read_metrics(self, Namespace):
+        """Every datum recorded so far (for tests and benchmarks)"""
+        path = os.path.join(self.root, f'{Namespace}.jsonl')
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [json.loads(line) for line in f]
+
+FAKE_CLIENTS = {
+    's3': FakeS3Client,
+    'cloudwatch': FakeCloudWatchClient
+}
@@ -0,0 +1,235 @@
+"""
+Offline Bulk Scoring for Fake News Detection
+Streams a JSONL or CSV archive through the serving preprocessing and model bundle
+in chunks across a process pool, writing predictions incrementally with resumable progress
+"""
+
+import os
+import sys
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Allow `scripts.*` imports when run directly as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from scripts.preprocess_data import transform_features
+from scripts.model_bundle import load_bundle, use_bundle_nlp_resources
+
+INPUT_COLUMNS = ['Headline', 'Body', 'URLs']
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson', '.json')
+
+# Per-process bundle, loaded once by the pool initializer
+_bundle = None
+
+def _init_worker(model_dir):
+    """Load the model bundle once per worker process, cleaning text with its NLP resources"""
+    global _bundle
+    _bundle = load_bundle(model_dir)
+    use_bundle_nlp_resources(_bundle)
+
+    # The pool already runs one worker per core; a multi-threaded booster in each would oversubscribe them
+    if hasattr(_bundle['model'], 'set_params'):
+        _bundle['model'].set_params(n_jobs=1)
+
+def is_jsonl(path):
+    """Decide the file format from its extension"""
+    return path.lower().endswith(JSONL_EXTENSIONS)
+
+def read_chunks(input_path, chunksize):
+    """Stream the input file as DataFrame chunks without loading it whole"""
+    if is_jsonl(input_path):
+        reader = pd.read_json(input_path, lines=True, chunksize=chunksize, dtype=False)
+    else:
+        reader = pd.read_csv(input_path, chunksize=chunksize, dtype=str, keep_default_na=False)
+
+    for chunk_index, chunk in enumerate(reader):
+        missing = [column for column in INPUT_COLUMNS if column not in chunk.columns]
+        if chunk_index == 0 and missing:
+            # Misnamed headers would otherwise score every row as an empty article
+            if 'Headline' in missing and 'Body' in missing:
+                raise ValueError(f"{input_path} has neither a Headline nor a Body column "
+                                 f"(columns: {', '.join(map(str, chunk.columns))})")
+            print(f"⚠️  {input_path} has no {', '.join(missing)} column; scoring it as empty")
+        for column in missing:
+            chunk[column] = ''
+        chunk[INPUT_COLUMNS] = chunk[INPUT_COLUMNS].fillna('')
+        yield chunk
+
+def score_chunk(task):
+    """Score one chunk with the worker's bundle"""
+    chunk_index, first_row, chunk, id_column = task
+    start = time.perf_counter()
+
+    X = transform_features(chunk, _bundle['tfidf_vectorizer'], _bundle['stat_feature_names'])
+    probabilities = _bundle['model'].predict_proba(X)
+    predictions = probabilities.argmax(axis=1)
+    labels = _bundle['label_encoder'].inverse_transform(predictions)
+
+    result = pd.DataFrame({
+        'row': np.arange(first_row, first_row + len(chunk)),
+        'prediction': labels.astype(str),
+        'confidence': probabilities.max(axis=1),
+        'prob_fake': probabilities[:, 0],
+        'prob_real': probabilities[:, 1] if probabilities.shape[1] > 1 else 0.0
+    })
+    if id_column:
+        result.insert(1, id_column, chunk[id_column].values)
+
+    return chunk_index, result, time.perf_counter() - start
+
+def write_result(handle, result, jsonl, write_header):
+    """Append one scored chunk to the output file"""
+    if jsonl:
+        text = result.to_json(orient='records', lines=True)
+        if text and not text.endswith('\n'):
+            text += '\n'
+        handle.write(text)
+    else:
+        result.to_csv(handle, header=write_header, index=False)
+    handle.flush()
+
+def load_progress(progress_path):
+    """Read the progress checkpoint, if any"""
+    if not os.path.exists(progress_path):
+        return None
+    with open(progress_path) as f:
+        return json.load(f)
+
+def save_progress(progress_path, progress):
+    """Atomically write the progress checkpoint"""
+    tmp_path = progress_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, progress_path)
+
+def bulk_score(input_path, output_path, model_dir='models', chunksize=1000, workers=None,
+               id_column=None, resume=False):
+    """Score an archive in chunks across a process pool and return a throughput report"""
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2
+    jsonl_output = is_jsonl(output_path)
+    progress_path = output_path + '.progress'
+
+    progress = load_progress(progress_path) if resume else None
+    if progress is not None:
+        if progress['chunksize'] != chunksize or progress['input'] != os.path.abspath(input_path):
+            raise ValueError("Progress file was written for a different input or chunk size")
+        print(f"Resuming after {progress['rows_done']} rows ({progress['chunks_done']} chunks)")
+        # Drop anything written after the last checkpoint
+        with open(output_path, 'a') as handle:
+            handle.truncate(progress['output_bytes'])
+    else:
+        progress = {
+            'input': os.path.abspath(input_path),
+            'chunksize': chunksize,
+            'chunks_done': 0,
+            'rows_done': 0,
+            'output_bytes': 0
+        }
+        open(output_path, 'w').close()
+
+    skip_chunks = progress['chunks_done']
+    rows_at_start = progress['rows_done']
+    chunk_seconds = []
+    start = time.perf_counter()
+
+    with open(output_path, 'a') as handle, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_dir,)) as pool:
+        pending = {}
+        next_to_write = skip_chunks
+        first_row = 0
+
+        def drain(block_until):
+            # Write finished chunks in input order so the checkpoint is a simple prefix
+            nonlocal next_to_write
+            while next_to_write in pending and (len(pending) > block_until or pending[next_to_write].done()):
+                chunk_index, result, seconds = pending.pop(next_to_write).result()
+                write_result(handle, result, jsonl_output, write_header=(chunk_index == 0))
+                chunk_seconds.append(seconds)
+
+                progress['chunks_done'] = chunk_index + 1
+                progress['rows_done'] += len(result)
+                progress['output_bytes'] = handle.tell()
+                save_progress(progress_path, progress)
+                next_to_write += 1
+
+                elapsed = time.perf_counter() - start
+                rate = (progress['rows_done'] - rows_at_start) / elapsed if elapsed > 0 else 0.0
+                print(f"Scored {progress['rows_done']} rows ({rate:.0f} rows/s)")
+
+        for chunk_index, chunk in enumerate(read_chunks(input_path, chunksize)):
+            chunk_first_row = first_row
+            first_row += len(chunk)
+            if chunk_index < skip_chunks:
+                continue
+            if id_column and id_column not in chunk.columns:
+                raise ValueError(f"ID column '{id_column}' not found in input")
+
+            pending[chunk_index] = pool.submit(score_chunk, (chunk_index, chunk_first_row, chunk, id_column))
+            # Bound the number of chunks in memory regardless of input size
+            drain(block_until=max_pending - 1)
+
+        drain(block_until=0)
+
+    elapsed = time.perf_counter() - start
+    rows_scored = progress['rows_done'] - rows_at_start
+    report = {
+        'input': input_path,
+        'output': output_path,
+        'rows_scored': int(rows_scored),
+        'rows_total': int(progress['rows_done']),
+        'chunks_scored': len(chunk_seconds),
+        'workers': workers,
+        'elapsed_seconds': elapsed,
+        'rows_per_second': rows_scored / elapsed if elapsed > 0 else 0.0,
+        'mean_chunk_seconds': float(np.mean(chunk_seconds)) if chunk_seconds else 0.0,
+        'p95_chunk_seconds': float(np.percentile(chunk_seconds, 95)) if chunk_seconds else 0.0
+    }
+
+    print("\nThroughput report:")
+    print(f"Rows scored: {report['rows_scored']} in {elapsed:.1f}s ({report['rows_per_second']:.0f} rows/s)")
+    print(f"Workers: {workers}, chunk size: {chunksize}")
+    print(f"Chunk latency: mean {report['mean_chunk_seconds']:.3f}s, p95 {report['p95_chunk_seconds']:.3f}s")
+
+    return report
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input', type=str,
+                       help='JSONL or CSV file with Headline/Body/URLs columns')
+    parser.add_argument('output', type=str,
+                       help='Output file (.jsonl or .csv)')
+    parser.add_argument('--model-dir', type=str, default='models',
+                       help='Directory containing the model bundle')
+    parser.add_argument('--chunksize', type=int, default=1000,
+                       help='Rows per chunk')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes (defaults to CPU count)')
+    parser.add_argument('--id-column', type=str, default=None,
+                       help='Input column copied to the output to identify rows')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue from the last checkpoint in <output>.progress')
+    parser.add_argument('--report', type=str, default=None,
+                       help='Write the throughput report as JSON to this path')
+
+    args = parser.parse_args()
+
+    report = bulk_score(
+        args.input,
+        args.output,
+        model_dir=args.model_dir,
+        chunksize=args.chunksize,
+        workers=args.workers,
+        id_column=args.id_column,
+        resume=args.resume
+    )
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.report}")
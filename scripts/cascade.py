@@ -0,0 +1,180 @@
+"""
+Cascade Serving: Cheap First-Stage Model
+Logistic regression on the statistical features plus hashed headline tokens, with an
+uncertainty band calibrated against the full model on the validation split. Articles
+scored outside the band are answered by the first stage; the rest go to the full model
+"""
+
+import os
+import sys
+import threading
+import numpy as np
+from scipy.sparse import csr_matrix, hstack
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+# Allow `scripts.*` imports when run directly as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from scripts.preprocess_data import truncate_text, MAX_HEADLINE_TOKENS
+from scripts.drift_monitor import trailing_columns
+from scripts.split_store import load_row_index
+
+FIRST_STAGE_FILE = 'first_stage.pkl'
+HEADLINE_HASH_FEATURES = 2 ** 18
+
+# Largest drop in accuracy (against the full model alone) the calibrated band may cost
+DEFAULT_MAX_ACCURACY_COST = 0.005
+
+def _headline_vectorizer():
+    # Stateless, so nothing is fitted or stored beyond these parameters
+    return HashingVectorizer(n_features=HEADLINE_HASH_FEATURES, ngram_range=(1, 2), alternate_sign=False)
+
+def _scaled_stats(first_stage, stat_values):
+    return first_stage['scaler'].transform(np.log1p(np.maximum(np.asarray(stat_values, dtype=np.float64), 0)))
+
+def first_stage_features(first_stage, headlines, stat_values):
+    """Hashed headline unigrams/bigrams next to scaled log1p stat features"""
+    stats = _scaled_stats(first_stage, stat_values)
+    return hstack([first_stage['vectorizer'].transform(headlines), csr_matrix(stats)]).tocsr()
+
+def first_stage_proba(first_stage, headlines, stat_values):
+    """Class probabilities from the first stage (same column order as the full model)
+
+    Same result as model.predict_proba(first_stage_features(...)), without assembling the matrix.
+    """
+    coef = first_stage['model'].coef_[0]
+    scores = (first_stage['vectorizer'].transform(headlines) @ coef[:HEADLINE_HASH_FEATURES]
+              + _scaled_stats(first_stage, stat_values) @ coef[HEADLINE_HASH_FEATURES:]
+              + first_stage['model'].intercept_[0])
+    positive = 1.0 / (1.0 + np.exp(-scores))
+    return np.column_stack([1.0 - positive, positive])
+
+def fit_first_stage(headlines, stat_values, y, stat_feature_names, C=1.0, random_state=42):
+    """Fit the first stage; the band is set afterwards by calibrate_band()"""
+    first_stage = {
+        'vectorizer': _headline_vectorizer(),
+        'scaler': StandardScaler().fit(np.log1p(np.maximum(np.asarray(stat_values, dtype=np.float64), 0))),
+        'stat_feature_names': list(stat_feature_names),
+        'band': None,
+        'metrics': {}
+    }
+    model = LogisticRegression(C=C, solver='liblinear', max_iter=1000, random_state=random_state)
+    first_stage['model'] = model.fit(first_stage_features(first_stage, headlines, stat_values), y)
+    return first_stage
+
+def short_circuit_mask(proba, band):
+    """Rows whose positive-class probability falls outside the (low, high) uncertainty band"""
+    low, high = band
+    return (proba[:, 1] <= low) | (proba[:, 1] >= high)
+
+def cascade_report(first_proba, full_proba, y, band):
+    """Short-circuited fraction and accuracy of the cascade against the full model alone"""
+    y = np.asarray(y)
+    short = short_circuit_mask(first_proba, band)
+    full_correct = full_proba.argmax(axis=1) == y
+    cascade_correct = np.where(short, first_proba.argmax(axis=1) == y, full_correct)
+    return {
+        'band': [float(band[0]), float(band[1])],
+        'rows': int(len(y)),
+        'short_circuit_fraction': float(short.mean()) if len(y) else 0.0,
+        'first_stage_accuracy_short_circuited': float(cascade_correct[short].mean()) if short.any() else None,
+        'full_model_accuracy': float(full_correct.mean()),
+        'cascade_accuracy': float(cascade_correct.mean()),
+        'accuracy_cost': float(full_correct.mean() - cascade_correct.mean())
+    }
+
+def calibrate_band(first_proba, full_proba, y, max_accuracy_cost=DEFAULT_MAX_ACCURACY_COST):
+    """Narrowest symmetric band whose cascade accuracy stays within max_accuracy_cost of the full model"""
+    y = np.asarray(y)
+    confidence = first_proba.max(axis=1)
+    order = np.argsort(-confidence, kind='stable')
+    first_correct = (first_proba.argmax(axis=1) == y)[order]
+    full_correct = (full_proba.argmax(axis=1) == y)[order]
+
+    # Accuracy when the k most confident rows are short-circuited, for every k
+    gained = np.concatenate([[0], np.cumsum(first_correct.astype(np.int64) - full_correct)])
+    accuracy = (full_correct.sum() + gained) / max(len(y), 1)
+    allowed = accuracy >= full_correct.mean() - max_accuracy_cost
+
+    # Only cut between distinct confidences, since a threshold cannot split tied rows
+    sorted_confidence = confidence[order]
+    cuts = np.flatnonzero(np.append(sorted_confidence[1:] < sorted_confidence[:-1], True)) + 1
+    cuts = cuts[allowed[cuts]]
+    if len(cuts) == 0:
+        return (0.0, 1.0)
+    threshold = float(sorted_confidence[cuts.max() - 1])
+    return (1.0 - threshold, threshold)
+
+def read_headlines(csv_path):
+    """Raw headline of every row of the training CSV"""
+    import pandas as pd
+    return pd.read_csv(csv_path, usecols=['Headline'])['Headline'].fillna('').to_numpy()
+
+def train_first_stage(csv_path, data_dir, model, splits, stat_feature_names,
+                      max_accuracy_cost=DEFAULT_MAX_ACCURACY_COST, C=1.0):
+    """Fit the first stage on the train split, calibrate its band on validation and report on test
+
+    splits maps 'train'/'val'/'test' to the (X, y) the full model was trained and evaluated on;
+    stat features are read back from their columns and headlines from the raw CSV rows.
+    """
+    row_index = load_row_index(data_dir)
+    raw_headlines = read_headlines(csv_path)
+    inputs = {}
+    for name, (X, y) in splits.items():
+        # Only rows that came from csv_path (not appended by incremental training)
+        rows = np.asarray(row_index[name])[:X.shape[0]]
+        keep = np.flatnonzero(rows >= 0)
+        X = X[keep]
+        inputs[name] = (
+            # Truncated like serving input
+            [truncate_text(headline, MAX_HEADLINE_TOKENS)[0] for headline in raw_headlines[rows[keep]]],
+            trailing_columns(X, len(stat_feature_names)),
+            np.asarray(y)[keep],
+            model.predict_proba(X)
+        )
+
+    headlines, stat_values, y, _ = inputs['train']
+    first_stage = fit_first_stage(headlines, stat_values, y, stat_feature_names, C=C)
+
+    first_proba = {name: first_stage_proba(first_stage, h, s) for name, (h, s, _, _) in inputs.items()}
+    band = calibrate_band(first_proba['val'], inputs['val'][3], inputs['val'][2], max_accuracy_cost)
+    first_stage['band'] = [float(band[0]), float(band[1])]
+    first_stage['metrics'] = {
+        'max_accuracy_cost': max_accuracy_cost,
+        'validation': cascade_report(first_proba['val'], inputs['val'][3], inputs['val'][2], band),
+        'test': cascade_report(first_proba['test'], inputs['test'][3], inputs['test'][2], band)
+    }
+    return first_stage
+
+class Cascade:
+    """Serving-side first stage with a (possibly overridden) band and per-worker counters"""
+
+    def __init__(self, first_stage, band=None):
+        self.first_stage = first_stage
+        self.band = tuple(band or first_stage['band'] or (0.0, 1.0))
+        self.requests = 0
+        self.short_circuited = 0
+        self._lock = threading.Lock()
+
+    def score(self, headlines, stat_values):
+        """First-stage probabilities and the mask of rows they answer"""
+        proba = first_stage_proba(self.first_stage, headlines, stat_values)
+        short = short_circuit_mask(proba, self.band)
+        with self._lock:
+            self.requests += len(short)
+            self.short_circuited += int(short.sum())
+        return proba, short
+
+    def stats(self):
+        """Band, training-time calibration report and the short-circuited fraction in this worker"""
+        with self._lock:
+            requests, short_circuited = self.requests, self.short_circuited
+        return {
+            'band': list(self.band),
+            'requests': requests,
+            'short_circuited': short_circuited,
+            'short_circuit_fraction': short_circuited / requests if requests else None,
+            'calibration': self.first_stage.get('metrics', {})
+        }
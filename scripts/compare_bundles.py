@@ -0,0 +1,263 @@
+"""
+Latency/Accuracy Regression Gate for Model Bundles
+Replays a held-out request corpus through the full serving pipeline of a
+baseline and a candidate bundle (interleaved per request), reports accuracy,
+per-stage latency, artifact size and load time deltas, and exits non-zero when
+the budgets are exceeded
+"""
+
+import os
+import sys
+import json
+import time
+import numpy as np
+import pandas as pd
+
+# Allow `scripts.*` imports when run directly as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from scripts.preprocess_data import transform_features, get_nlp_resources, set_nlp_resources
+from scripts.model_bundle import load_bundle, bundle_size
+from scripts.nlp_resources import load_nlp_resources, DEFAULT_RESOURCE_NAME
+from scripts.shared_bundle import load_shared_bundle
+from scripts.evaluate import latency_summary
+from scripts.bulk_score import read_chunks
+
+STAGES = ['truncate', 'clean_text', 'stat_features', 'tfidf', 'assemble', 'predict', 'model', 'total']
+
+# Stages whose cost depends on the bundle (vocabulary and trees). Latency budgets apply to their
+# sum ('model'); truncation, cleaning and stat features run the same code for both bundles.
+MODEL_STAGES = ['tfidf', 'assemble', 'predict']
+
+def load_timed(bundle_path):
+    """Load a bundle directory (or shared .nvb file), returning (bundle, load seconds, size bytes)
+
+    The bundle's nlp_resources.nva (next to a .nvb file) is loaded too, so each bundle's text is
+    cleaned with its own lemma table; bundles without one use the process default.
+    """
+    start = time.perf_counter()
+    if bundle_path.endswith('.nvb'):
+        bundle = load_shared_bundle(bundle_path)
+        size = os.path.getsize(bundle_path)
+        resources_path = os.path.join(os.path.dirname(bundle_path), DEFAULT_RESOURCE_NAME)
+        bundle['nlp_resources'] = load_nlp_resources(resources_path) if os.path.exists(resources_path) else None
+        if bundle['nlp_resources'] is not None:
+            size += os.path.getsize(resources_path)
+    else:
+        bundle = load_bundle(bundle_path)
+        size = bundle_size(bundle_path)
+    load_seconds = time.perf_counter() - start
+
+    if bundle['nlp_resources'] is None:
+        bundle['nlp_resources'] = get_nlp_resources()
+    bundle['nlp_resources'].use_wordnet(required=False)
+    return bundle, load_seconds, size
+
+def load_repeatedly(paths, rounds=5):
+    """Load every bundle, then time rounds more loads of each in alternating order
+
+    The first, untimed load brings each bundle into the page cache, so the timed loads do not
+    depend on which bundle happens to be read first. Returns ({name: (bundle, median load
+    seconds, size bytes)}, {name: all timed load seconds}).
+    """
+    names = list(paths)
+    loaded = {name: load_timed(paths[name]) for name in names}
+    samples = {name: [] for name in names}
+    for round_index in range(rounds):
+        for name in (names if round_index % 2 == 0 else names[::-1]):
+            samples[name].append(load_timed(paths[name])[1])
+
+    results = {}
+    for name in names:
+        bundle, first_seconds, size = loaded[name]
+        results[name] = (bundle, float(np.median(samples[name])) if samples[name] else first_seconds, size)
+    return results, samples
+
+def score_request(bundle, row):
+    """Score one request as /predict does, returning (per-stage seconds, probabilities)"""
+    set_nlp_resources(bundle['nlp_resources'])
+    timings = {}
+    start = time.perf_counter()
+    X = transform_features(row, bundle['tfidf_vectorizer'], bundle['stat_feature_names'], timings=timings)
+    predict_start = time.perf_counter()
+    probability = bundle['model'].predict_proba(X)[0]
+    timings['predict'] = time.perf_counter() - predict_start
+    timings['total'] = time.perf_counter() - start
+    timings['model'] = sum(timings.get(stage, 0.0) for stage in MODEL_STAGES)
+    return timings, probability
+
+def replay(bundles, corpus, rounds=1):
+    """Replay every request through all bundles, interleaved per request, for several rounds
+
+    The bundle that goes first alternates per request and round, so changes in machine load hit
+    every bundle alike; each request's stage latency is its median over the rounds. Returns
+    {name: (stage -> per-request seconds, labels, positive-class probabilities)}.
+    """
+    names = list(bundles)
+    rows = [corpus.iloc[i:i + 1] for i in range(len(corpus))]
+    seconds = {name: {stage: np.zeros((rounds, len(rows))) for stage in STAGES} for name in names}
+    probabilities = {name: np.zeros((len(rows), 2)) for name in names}
+
+    for round_index in range(rounds):
+        for i, row in enumerate(rows):
+            order = names if (round_index + i) % 2 == 0 else names[::-1]
+            for name in order:
+                timings, probability = score_request(bundles[name], row)
+                for stage in STAGES:
+                    seconds[name][stage][round_index, i] = timings.get(stage, 0.0)
+                probabilities[name][i] = probability
+
+    results = {}
+    for name in names:
+        samples = {stage: np.median(seconds[name][stage], axis=0) for stage in STAGES}
+        predictions = probabilities[name].argmax(axis=1)
+        labels = bundles[name]['label_encoder'].inverse_transform(predictions).astype(str)
+        results[name] = (samples, labels, probabilities[name][:, -1])
+    return results
+
+def relative_change(baseline, candidate):
+    """Relative change from baseline to candidate (0.2 means 20% larger)"""
+    if baseline == 0:
+        return 0.0 if candidate == 0 else float('inf')
+    return (candidate - baseline) / baseline
+
+def compare_bundles(baseline_path, candidate_path, corpus_path, limit=None, warmup=5, rounds=3,
+                    max_p95_increase=0.2, max_p99_increase=0.5, max_accuracy_drop=0.005,
+                    max_size_increase=1.0, max_load_time_increase=1.0, load_rounds=5):
+    """Compare two bundles on the same corpus and return (report, list of budget violations)"""
+    corpus = pd.concat(read_chunks(corpus_path, chunksize=10000), ignore_index=True)
+    if limit:
+        corpus = corpus.iloc[:limit]
+    print(f"Replaying {len(corpus)} requests x {rounds} rounds")
+
+    report = {'corpus': corpus_path, 'requests': int(len(corpus)), 'rounds': int(rounds), 'bundles': {}}
+    # Load both before replaying, so a bundle without NLP resources gets the process default;
+    # load time is the median of load_rounds alternating loads
+    print(f"Loading {baseline_path} and {candidate_path} ({load_rounds} timed loads each)...")
+    loaded, load_samples = load_repeatedly({'baseline': baseline_path, 'candidate': candidate_path},
+                                           rounds=load_rounds)
+    bundles = {name: bundle for name, (bundle, _, _) in loaded.items()}
+
+    # Warm up caches and lazy initialisation outside the measured replay
+    replay(bundles, corpus.iloc[:warmup])
+    results = replay(bundles, corpus, rounds=rounds)
+
+    for name, path in [('baseline', baseline_path), ('candidate', candidate_path)]:
+        _, load_seconds, size = loaded[name]
+        samples, labels, _ = results[name]
+
+        entry = {
+            'path': path,
+            'load_seconds': load_seconds,
+            'load_seconds_samples': load_samples[name],
+            'size_bytes': int(size),
+            'latency': {stage: latency_summary(samples[stage]) for stage in STAGES}
+        }
+        if 'Label' in corpus.columns:
+            entry['accuracy'] = float(np.mean(labels == corpus['Label'].astype(str).values))
+        report['bundles'][name] = entry
+
+        model, total = entry['latency']['model'], entry['latency']['total']
+        print(f"\n{name}: load {load_seconds:.2f}s (median), size: {size / 1024 / 1024:.1f} MB, "
+              f"model stages p50 {model['p50_ms']:.2f} ms, p99 {model['p99_ms']:.2f} ms, "
+              f"total p50 {total['p50_ms']:.2f} ms")
+
+    baseline = report['bundles']['baseline']
+    candidate = report['bundles']['candidate']
+    deltas = {
+        'latency_p95': {stage: relative_change(baseline['latency'][stage]['p95_ms'], candidate['latency'][stage]['p95_ms'])
+                        for stage in STAGES},
+        'latency_p99': {stage: relative_change(baseline['latency'][stage]['p99_ms'], candidate['latency'][stage]['p99_ms'])
+                        for stage in STAGES},
+        'size': relative_change(baseline['size_bytes'], candidate['size_bytes']),
+        'load_time': relative_change(baseline['load_seconds'], candidate['load_seconds']),
+        'agreement': float(np.mean(results['baseline'][1] == results['candidate'][1])),
+        'mean_abs_probability_delta': float(np.mean(np.abs(results['baseline'][2] - results['candidate'][2])))
+    }
+    if 'accuracy' in baseline:
+        deltas['accuracy'] = candidate['accuracy'] - baseline['accuracy']
+    report['deltas'] = deltas
+
+    violations = []
+    if deltas['latency_p95']['model'] > max_p95_increase:
+        violations.append(f"model-stage p95 latency +{deltas['latency_p95']['model']:.0%} (budget +{max_p95_increase:.0%})")
+    if deltas['latency_p99']['model'] > max_p99_increase:
+        violations.append(f"model-stage p99 latency +{deltas['latency_p99']['model']:.0%} (budget +{max_p99_increase:.0%})")
+    if 'accuracy' in deltas and deltas['accuracy'] < -max_accuracy_drop:
+        violations.append(f"accuracy {deltas['accuracy']:+.4f} (budget -{max_accuracy_drop})")
+    if deltas['size'] > max_size_increase:
+        violations.append(f"artifact size +{deltas['size']:.0%} (budget +{max_size_increase:.0%})")
+    if deltas['load_time'] > max_load_time_increase:
+        violations.append(f"load time +{deltas['load_time']:.0%} (budget +{max_load_time_increase:.0%})")
+    report['violations'] = violations
+
+    print("\nPer-stage p95 latency change (candidate vs baseline):")
+    for stage in STAGES:
+        print(f"  {stage:<14} {baseline['latency'][stage]['p95_ms']:8.2f} ms -> "
+              f"{candidate['latency'][stage]['p95_ms']:8.2f} ms ({deltas['latency_p95'][stage]:+.0%})")
+    if 'accuracy' in deltas:
+        print(f"Accuracy: {baseline['accuracy']:.4f} -> {candidate['accuracy']:.4f} ({deltas['accuracy']:+.4f})")
+    print(f"Prediction agreement: {deltas['agreement']:.2%}")
+
+    return report, violations
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('baseline', type=str,
+                       help='Baseline bundle directory (models/ layout) or shared .nvb file')
+    parser.add_argument('candidate', type=str,
+                       help='Candidate bundle directory (models/ layout) or shared .nvb file')
+    parser.add_argument('--corpus', type=str, required=True,
+                       help='Held-out requests as JSONL or CSV (Headline/Body/URLs, optional Label)')
+    parser.add_argument('--limit', type=int, default=None,
+                       help='Replay only the first N requests')
+    parser.add_argument('--warmup', type=int, default=5,
+                       help='Requests replayed before measuring')
+    parser.add_argument('--rounds', type=int, default=3,
+                       help='Times the corpus is replayed; per-request latency is the median')
+    parser.add_argument('--max-p95-increase', type=float, default=0.2,
+                       help='Allowed relative increase of p95 latency of the model stages (tfidf, assemble, predict)')
+    parser.add_argument('--max-p99-increase', type=float, default=0.5,
+                       help='Allowed relative increase of p99 latency of the model stages (tfidf, assemble, predict)')
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.005,
+                       help='Allowed absolute accuracy drop (needs a Label column)')
+    parser.add_argument('--max-size-increase', type=float, default=1.0,
+                       help='Allowed relative increase of artifact size')
+    parser.add_argument('--max-load-time-increase', type=float, default=1.0,
+                       help='Allowed relative increase of bundle load time (median of --load-rounds loads)')
+    parser.add_argument('--load-rounds', type=int, default=5,
+                       help='Timed loads of each bundle, alternating between them')
+    parser.add_argument('--report', type=str, default=None,
+                       help='Write the comparison report as JSON to this path')
+
+    args = parser.parse_args()
+
+    report, violations = compare_bundles(
+        args.baseline,
+        args.candidate,
+        args.corpus,
+        limit=args.limit,
+        warmup=args.warmup,
+        rounds=args.rounds,
+        max_p95_increase=args.max_p95_increase,
+        max_p99_increase=args.max_p99_increase,
+        max_accuracy_drop=args.max_accuracy_drop,
+        max_size_increase=args.max_size_increase,
+        max_load_time_increase=args.max_load_time_increase,
+        load_rounds=args.load_rounds
+    )
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.report}")
+
+    if violations:
+        print("\n❌ Candidate bundle exceeds budgets:")
+        for violation in violations:
+            print(f"  - {violation}")
+        sys.exit(1)
+
+    print("\n✅ Candidate bundle within budgets")
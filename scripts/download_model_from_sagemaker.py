@@ -2,10 +2,15 @@
 Download trained model from SageMaker to S3 for Elastic Beanstalk
 """
 
-import boto3
 import os
+import sys
 import argparse
 
+# Allow `scripts.*` imports when run directly as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from scripts.aws_clients import get_client
+
 def download_model_from_sagemaker(
     s3_bucket,
     model_artifact_path,
@@ -20,7 +25,7 @@ def download_model_from_sagemaker(
         local_output_dir: Local directory to save models
     """
     
-    s3_client = boto3.client('s3')
+    s3_client = get_client('s3')
     
     # Parse S3 path
     if model_artifact_path.startswith('s3://'):
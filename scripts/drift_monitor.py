@@ -0,0 +1,228 @@
+"""
+Feature Drift Monitoring
+Quantile-binned baseline of the statistical features and TF-IDF out-of-vocabulary
+rate saved at training time, and fixed-size streaming histograms at serving time,
+merged across workers and scored with the population stability index (PSI)
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BASELINE_FILE = 'drift_baseline.json'
+BASELINE_VERSION = 1
+N_BINS = 10
+OOV_FEATURE = 'tfidf_oov_rate'
+BASELINE_OOV_SAMPLE_ROWS = 20000
+
+# Conventional PSI reading: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 significant shift
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+PSI_EPSILON = 1e-4
+
+def unigram_vocabulary(vectorizer):
+    """Set of single-word terms known to a fitted or mapped TF-IDF vectorizer"""
+    if hasattr(vectorizer, 'vocabulary_'):
+        return {term for term in vectorizer.vocabulary_ if ' ' not in term}
+    return {term.decode('utf-8') for term in vectorizer.terms.tolist() if b' ' not in term}
+
+def oov_rates(combined_text, vocabulary):
+    """Fraction of cleaned tokens per document missing from the vocabulary (NaN for empty text)"""
+    rates = np.full(len(combined_text), np.nan)
+    for i, text in enumerate(combined_text):
+        tokens = text.split()
+        if tokens:
+            rates[i] = sum(1 for token in tokens if token not in vocabulary) / len(tokens)
+    return rates
+
+def trailing_columns(X, n_columns):
+    """Dense copy of the last n_columns of a CSR matrix (cheaper than column slicing)"""
+    start = X.shape[1] - n_columns
+    keep = X.indices >= start
+    rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))[keep]
+    dense = np.zeros((X.shape[0], n_columns))
+    dense[rows, X.indices[keep] - start] = X.data[keep]
+    return dense
+
+def _histogram(values, edges):
+    values = values[~np.isnan(values)]
+    return np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+
+def build_baseline(stat_features, oov, n_bins=N_BINS):
+    """Quantile bin edges and training proportions for each stat feature and the OOV rate"""
+    columns = {name: stat_features[name].to_numpy(dtype=np.float64) for name in stat_features.columns}
+    columns[OOV_FEATURE] = np.asarray(oov, dtype=np.float64)
+
+    features = {}
+    for name, values in columns.items():
+        observed = values[~np.isnan(values)]
+        quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+        edges = np.unique(np.quantile(observed, quantiles)) if len(observed) else np.array([])
+        # [edge, next float) bins keep point masses (counts, flags, all-zero OOV) apart from larger values
+        edges = np.unique(np.concatenate([edges, np.nextafter(edges, np.inf)]))
+        counts = _histogram(values, edges)
+        features[name] = {
+            'edges': edges.tolist(),
+            'proportions': (counts / max(counts.sum(), 1)).tolist(),
+            'count': int(counts.sum())
+        }
+
+    baseline = {'version': BASELINE_VERSION, 'features': features}
+    baseline['id'] = hashlib.sha1(json.dumps(baseline, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    return baseline
+
+def save_baseline(baseline, path):
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+    return path
+
+def load_baseline(path):
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get('version') != BASELINE_VERSION:
+        raise ValueError(f"{path} is not a version {BASELINE_VERSION} drift baseline")
+    return baseline
+
+def psi(expected, actual):
+    """Population stability index between two proportion vectors"""
+    expected = np.clip(np.asarray(expected, dtype=np.float64), PSI_EPSILON, None)
+    actual = np.clip(np.asarray(actual, dtype=np.float64), PSI_EPSILON, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+def drift_status(value):
+    if value is None:
+        return 'no_data'
+    if value > PSI_SIGNIFICANT:
+        return 'significant'
+    if value > PSI_MODERATE:
+        return 'moderate'
+    return 'stable'
+
+class DriftMonitor:
+    """Per-worker fixed-size histograms over the baseline bins, shared through state_dir"""
+
+    def __init__(self, baseline, state_dir, flush_seconds=30.0, stale_seconds=86400.0, metrics_callback=None):
+        self.baseline = baseline
+        self.names = list(baseline['features'])
+        self.state_dir = state_dir
+        self.flush_seconds = flush_seconds
+        self.stale_seconds = stale_seconds
+        self.metrics_callback = metrics_callback
+
+        # Edges padded with +inf to one matrix so a whole row is binned with one comparison
+        edges = [baseline['features'][name]['edges'] for name in self.names]
+        width = max([len(e) for e in edges] + [1])
+        self.edges = np.full((len(self.names), width), np.inf)
+        for i, feature_edges in enumerate(edges):
+            self.edges[i, :len(feature_edges)] = feature_edges
+        self.n_bins = np.array([len(e) + 1 for e in edges])
+        self.offsets = np.arange(len(self.names)) * (width + 1)
+        self._positions = {}
+
+        self._lock = threading.Lock()
+        self._counts = np.zeros((len(self.names), width + 1), dtype=np.int64)
+        self._flusher_pid = None
+        os.makedirs(state_dir, exist_ok=True)
+
+    def update(self, stat_values, stat_names, oov):
+        """Add rows of stat feature values (columns in stat_names order) and their OOV rates"""
+        key = tuple(stat_names)
+        positions = self._positions.get(key)
+        if positions is None:
+            positions = self._positions[key] = [stat_names.index(name) for name in self.names[:-1]]
+        values = np.column_stack([np.asarray(stat_values, dtype=np.float64)[:, positions],
+                                  np.asarray(oov, dtype=np.float64)])
+
+        # Bin = number of edges <= value (same as searchsorted side='right'); NaN rows are skipped
+        bins = (values[:, :, None] >= self.edges[None, :, :]).sum(axis=2) + self.offsets
+        increments = np.bincount(bins[~np.isnan(values)], minlength=self._counts.size)
+
+        self._ensure_flusher()
+        with self._lock:
+            self._counts += increments.reshape(self._counts.shape)
+
+    def _ensure_flusher(self):
+        # Flushing writes files, merges every worker's state and calls CloudWatch, so it runs on a
+        # background thread; threads do not survive fork, so start one per worker process on first use
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid != os.getpid():
+                threading.Thread(target=self._run_flusher, name='drift-flusher', daemon=True).start()
+                self._flusher_pid = os.getpid()
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Drift flush failed: {e}")
+
+    def _state_path(self, pid=None):
+        return os.path.join(self.state_dir, f"drift-{self.baseline['id']}-{pid or os.getpid()}.npy")
+
+    def flush(self):
+        """Publish this worker's counts for the other workers' reports"""
+        with self._lock:
+            counts = self._counts.copy()
+        path = self._state_path()
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.save(f, counts)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write drift state: {e}")
+            return
+
+        if self.metrics_callback is not None:
+            report = self.report()
+            if report['max_psi'] is not None:
+                self.metrics_callback('FeatureDriftMaxPSI', report['max_psi'], 'None')
+
+    def merged_counts(self):
+        """This worker's live counts plus the last published counts of every other worker"""
+        with self._lock:
+            counts = self._counts.copy()
+        own = self._state_path()
+        now = time.time()
+        workers = 1
+        for path in glob.glob(os.path.join(self.state_dir, f"drift-{self.baseline['id']}-*.npy")):
+            try:
+                if path == own or now - os.path.getmtime(path) > self.stale_seconds:
+                    continue
+                other = np.load(path)
+            except (OSError, ValueError):
+                continue
+            if other.shape == counts.shape:
+                counts += other
+                workers += 1
+        return counts, workers
+
+    def report(self):
+        """PSI per feature against the training baseline, merged across workers"""
+        counts, workers = self.merged_counts()
+        features = {}
+        for i, name in enumerate(self.names):
+            observed = counts[i, :self.n_bins[i]]
+            total = int(observed.sum())
+            value = psi(self.baseline['features'][name]['proportions'], observed / total) if total else None
+            features[name] = {'psi': value, 'status': drift_status(value), 'count': total}
+
+        scores = [f['psi'] for f in features.values() if f['psi'] is not None]
+        max_psi = max(scores) if scores else None
+        return {
+            'baseline_id': self.baseline['id'],
+            'workers': workers,
+            'max_psi': max_psi,
+            'status': drift_status(max_psi),
+            'features': features
+        }
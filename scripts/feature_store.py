@@ -0,0 +1,108 @@
+"""
+On-disk Feature Store for the Cleaned Corpus
+Caches cleaned text and statistical features per row, keyed by a content hash,
+as Arrow IPC files that are memory-mapped on read and appended incrementally
+"""
+
+import glob
+import hashlib
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+KEY_COLUMN = 'row_key'
+TEXT_COLUMNS = ['Headline_cleaned', 'Body_cleaned']
+# Space-joined tokens each row's cleaned text lemmatized, for baking the lemma table
+TOKEN_COLUMN = 'Corpus_tokens'
+
+
+def feature_version(code_digest, stat_feature_names, nlp_fingerprint):
+    """Version of the cached features, derived from what computes them
+
+    Changing the feature code, the statistical feature set or the NLP resources (stopwords,
+    lemma source) gives a new version, so rows cached under the old one are never reused.
+    """
+    digest = hashlib.sha1()
+    for part in (code_digest, '\x1e'.join(stat_feature_names), nlp_fingerprint):
+        digest.update(part.encode('utf-8') + b'\x1f')
+    return digest.hexdigest()
+
+
+def row_keys(df, version):
+    """Content hash per row over the feature version and the raw Headline/Body/URLs columns"""
+    keys = []
+    for headline, body, url in zip(df['Headline'].astype(str), df['Body'].astype(str), df['URLs'].astype(str)):
+        payload = '\x1f'.join((version, headline, body, url))
+        keys.append(hashlib.sha1(payload.encode('utf-8')).hexdigest())
+    return keys
+
+
+class FeatureStore:
+    """Append-only Arrow IPC store of per-row features keyed by content hash"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _part_paths(self):
+        return sorted(glob.glob(os.path.join(self.path, 'part-*.arrow')))
+
+    def read_table(self, columns=None):
+        """Memory-map every part file and return them as one Arrow table"""
+        tables = []
+        for part_path in self._part_paths():
+            with pa.memory_map(part_path, 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+            tables.append(table.select(columns) if columns else table)
+        if not tables:
+            return None
+        return pa.concat_tables(tables)
+
+    def lookup(self, keys):
+        """Return cached rows for the given keys as a DataFrame indexed by key"""
+        table = self.read_table()
+        if table is None:
+            return pd.DataFrame(index=pd.Index([], name=KEY_COLUMN))
+
+        wanted = pa.array(sorted(set(keys)), type=pa.string())
+        mask = pc.is_in(table[KEY_COLUMN], value_set=wanted)
+        frame = table.filter(mask).to_pandas()
+        return frame.drop_duplicates(KEY_COLUMN, keep='last').set_index(KEY_COLUMN)
+
+    def append(self, frame):
+        """Write new rows as a new part file; frame must contain the key column"""
+        if len(frame) == 0:
+            return None
+
+        table = pa.Table.from_pandas(frame.reset_index(drop=True), preserve_index=False)
+        part_path = os.path.join(self.path, f'part-{len(self._part_paths()):05d}.arrow')
+        tmp_path = part_path + '.tmp'
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, part_path)
+        return part_path
+
+    def compact(self):
+        """Merge all part files into a single file, keeping the newest row per key"""
+        table = self.read_table()
+        if table is None:
+            return
+        old_parts = self._part_paths()
+        frame = table.to_pandas().drop_duplicates(KEY_COLUMN, keep='last')
+        merged = pa.Table.from_pandas(frame.reset_index(drop=True), preserve_index=False)
+
+        tmp_path = os.path.join(self.path, 'compacted.tmp')
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, merged.schema) as writer:
+                writer.write_table(merged)
+        for part_path in old_parts:
+            os.remove(part_path)
+        os.replace(tmp_path, os.path.join(self.path, 'part-00000.arrow'))
+
+    def __len__(self):
+        table = self.read_table(columns=[KEY_COLUMN])
+        return 0 if table is None else table.num_rows
@@ -0,0 +1,269 @@
+"""
+Incremental Training Script for XGBoost Model
+Transforms newly labelled articles with the existing fitted preprocessors,
+appends them to the stored splits and continues boosting from the current model
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import time
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from scipy.sparse import vstack, save_npz
+from sklearn.model_selection import train_test_split
+
+# Allow `scripts.*` imports when run directly as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from scripts.preprocess_data import transform_features
+from scripts.model_bundle import load_bundle, save_bundle, save_metrics, use_bundle_nlp_resources, BUNDLE_FILES
+from scripts.train_local import load_data
+from scripts.split_store import load_splits, write_split_matrices, SPLIT_STORE_FILE, SPLIT_ROWS_FILE
+from scripts.evaluate import evaluate_model, log_loss, measure_latency
+
+def load_new_rows(input_path, bundle):
+    """Read newly labelled rows and build features with the fitted preprocessors"""
+    df = pd.read_csv(input_path)
+
+    df['Headline'] = df['Headline'].fillna('')
+    df['Body'] = df['Body'].fillna('')
+    df['URLs'] = df['URLs'].fillna('')
+
+    label_encoder = bundle['label_encoder']
+    unknown = set(df['Label'].unique()) - set(label_encoder.classes_)
+    if unknown:
+        raise ValueError(f"New data contains labels the model was not trained on: {sorted(unknown)}")
+
+    X = transform_features(df, bundle['tfidf_vectorizer'], bundle['stat_feature_names'])
+    y = label_encoder.transform(df['Label'])
+    return X, y
+
+# Content hashes of every CSV appended to a data dir's splits, so the same file is not appended twice
+APPENDED_INPUTS_FILE = 'appended_inputs.json'
+
+def file_sha256(path):
+    """Content hash of an input file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_appended_inputs(data_dir):
+    """Inputs already appended to the splits in data_dir"""
+    path = os.path.join(data_dir, APPENDED_INPUTS_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+def save_splits(data_dir, source_dir, train, val, test, appended):
+    """Write updated splits to data_dir in the layout source_dir uses, with the appended-inputs record"""
+    os.makedirs(data_dir, exist_ok=True)
+    if os.path.exists(os.path.join(source_dir, 'X_train.npz')):
+        for name, (X, y) in (('train', train), ('val', val), ('test', test)):
+            save_npz(os.path.join(data_dir, f'X_{name}.npz'), X)
+            np.save(os.path.join(data_dir, f'y_{name}.npy'), y)
+    rows_path = os.path.join(source_dir, SPLIT_ROWS_FILE)
+    if os.path.exists(rows_path) and os.path.abspath(data_dir) != os.path.abspath(source_dir):
+        shutil.copy(rows_path, os.path.join(data_dir, SPLIT_ROWS_FILE))
+
+    store_path = os.path.join(source_dir, SPLIT_STORE_FILE)
+    if os.path.exists(store_path):
+        # New rows keep source row index -1; the old mapping stays valid until X_test is released
+        _, row_index = load_splits(store_path)
+        write_split_matrices(os.path.join(data_dir, SPLIT_STORE_FILE), {
+            'train': train,
+            'val': val,
+            'test': test
+        }, row_index=row_index)
+
+    with open(os.path.join(data_dir, APPENDED_INPUTS_FILE), 'w') as f:
+        json.dump(appended, f, indent=2)
+
+def split_new_rows(X, y, val_fraction, random_state):
+    """Split new rows into train/validation, stratifying when every class has enough rows"""
+    if val_fraction <= 0 or X.shape[0] < 2:
+        return X, X[:0], y, y[:0]
+
+    counts = np.bincount(y)
+    stratify = y if counts[counts > 0].min() >= 2 else None
+    return train_test_split(X, y, test_size=val_fraction, random_state=random_state, stratify=stratify)
+
+def incremental_train(new_data, data_dir='processed_data', model_dir='models', output_dir=None,
+                      extra_rounds=20, val_fraction=0.2, train_on='all', max_logloss_increase=0.01,
+                      max_accuracy_drop=0.005, random_state=42, force=False, output_data_dir=None):
+    """Continue boosting the existing model on newly labelled rows and export the updated bundle
+
+    The stored splits in data_dir are only updated when the bundle is exported in place; a trial
+    export to another output_dir leaves them untouched unless output_data_dir is given.
+    """
+    output_dir = output_dir or model_dir
+    in_place = os.path.abspath(output_dir) == os.path.abspath(model_dir)
+    splits_dir = output_data_dir or (data_dir if in_place else None)
+
+    # The stored splits already contain every appended input; training on one again duplicates its rows
+    input_hash = file_sha256(new_data)
+    appended = load_appended_inputs(data_dir)
+    previous = [entry for entry in appended if entry['sha256'] == input_hash]
+    if previous and not force:
+        raise ValueError(f"{new_data} was already appended to {data_dir} (as {previous[0]['input']}); "
+                         "use --force to append it again")
+
+    print("Loading existing model bundle...")
+    bundle = load_bundle(model_dir)
+    model = bundle['model']
+    # New rows are cleaned with the bundle's lemma table, exactly as serving will clean them
+    use_bundle_nlp_resources(bundle)
+
+    print("Loading stored splits...")
+    X_train, X_val, X_test, y_train, y_val, y_test = load_data(data_dir)
+
+    print(f"Transforming new rows from {new_data}...")
+    X_new, y_new = load_new_rows(new_data, bundle)
+    print(f"New rows: {X_new.shape[0]}")
+
+    # Validation checks before touching anything on disk
+    n_features = model.n_features_in_
+    for name, matrix in [('new data', X_new), ('stored train split', X_train), ('stored validation split', X_val)]:
+        if matrix.shape[1] != n_features:
+            raise ValueError(f"Feature mismatch: {name} has {matrix.shape[1]} columns, model expects {n_features}")
+    if X_new.shape[0] == 0:
+        raise ValueError("No new rows to train on")
+
+    X_new_train, X_new_val, y_new_train, y_new_val = split_new_rows(X_new, y_new, val_fraction, random_state)
+
+    X_train_all = vstack([X_train, X_new_train]).tocsr()
+    y_train_all = np.concatenate([y_train, y_new_train])
+    X_val_all = vstack([X_val, X_new_val]).tocsr()
+    y_val_all = np.concatenate([y_val, y_new_val])
+
+    baseline_logloss = log_loss(y_val_all, model.predict_proba(X_val_all)[:, 1])
+    baseline_test = evaluate_model(model, X_test, y_test, "Test (before)")
+
+    # Continue boosting from the existing booster
+    X_fit, y_fit = (X_train_all, y_train_all) if train_on == 'all' else (X_new_train, y_new_train)
+    print(f"\nContinuing boosting for {extra_rounds} rounds on {X_fit.shape[0]} rows...")
+    updated = xgb.XGBClassifier(**model.get_params())
+    updated.set_params(n_estimators=extra_rounds)
+    updated.fit(
+        X_fit, y_fit,
+        eval_set=[(X_val_all, y_val_all)],
+        xgb_model=model.get_booster(),
+        verbose=True
+    )
+
+    updated_logloss = log_loss(y_val_all, updated.predict_proba(X_val_all)[:, 1])
+    print(f"\nValidation log-loss: {baseline_logloss:.4f} -> {updated_logloss:.4f}")
+
+    val_metrics = evaluate_model(updated, X_val_all, y_val_all, "Validation")
+    test_metrics = evaluate_model(updated, X_test, y_test, "Test")
+
+    failures = []
+    if updated_logloss > baseline_logloss + max_logloss_increase:
+        failures.append(f"validation log-loss increased by {updated_logloss - baseline_logloss:.4f}")
+    if test_metrics['accuracy'] < baseline_test['accuracy'] - max_accuracy_drop:
+        failures.append(f"test accuracy dropped by {baseline_test['accuracy'] - test_metrics['accuracy']:.4f}")
+
+    if failures and not force:
+        raise RuntimeError("Incremental update rejected: " + "; ".join(failures))
+    for failure in failures:
+        print(f"⚠️  Exporting despite failed check (--force): {failure}")
+    if previous:
+        print(f"⚠️  Appending {new_data} again (--force)")
+
+    # Append new rows to the stored splits
+    if splits_dir is not None:
+        print(f"\nWriting updated splits to {splits_dir}...")
+        appended.append({
+            'input': os.path.abspath(new_data),
+            'sha256': input_hash,
+            'rows': int(X_new.shape[0]),
+            'appended_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        })
+        save_splits(splits_dir, data_dir, (X_train_all, y_train_all), (X_val_all, y_val_all),
+                    (X_test, y_test), appended)
+    else:
+        print(f"\nStored splits in {data_dir} left unchanged (trial export; use --output-data-dir to keep them)")
+
+    # Export the updated bundle; NLP resources, drift baseline and first stage are carried over
+    # unchanged (the first stage keeps the band calibrated against the previous model)
+    bundle['model'] = updated
+    metrics = {
+        'validation': val_metrics,
+        'test': test_metrics,
+        'incremental': {
+            'new_rows': int(X_new.shape[0]),
+            'extra_rounds': int(extra_rounds),
+            'total_rounds': int(updated.get_booster().num_boosted_rounds()),
+            'train_on': train_on,
+            'validation_logloss_before': float(baseline_logloss),
+            'validation_logloss_after': float(updated_logloss)
+        }
+    }
+    save_bundle(bundle, output_dir)
+
+    # Extra rounds make inference slower, so record latency next to accuracy as train_local.py does
+    metrics['latency'] = measure_latency(updated, X_test)
+    metrics['latency']['model_size_bytes'] = os.path.getsize(os.path.join(output_dir, BUNDLE_FILES['model']))
+    save_metrics(metrics, output_dir)
+    print(f"Updated model bundle saved to {output_dir}")
+
+    return updated, metrics
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('new_data', type=str,
+                       help='CSV of newly labelled articles (Headline, Body, URLs, Label)')
+    parser.add_argument('--data-dir', type=str, default='processed_data',
+                       help='Directory containing the stored splits')
+    parser.add_argument('--model-dir', type=str, default='models',
+                       help='Directory containing the current model bundle')
+    parser.add_argument('--output-dir', type=str, default=None,
+                       help='Directory to export the updated bundle (defaults to --model-dir)')
+    parser.add_argument('--extra-rounds', type=int, default=20,
+                       help='Boosting rounds to add on top of the existing model')
+    parser.add_argument('--val-fraction', type=float, default=0.2,
+                       help='Fraction of new rows appended to the validation split')
+    parser.add_argument('--train-on', type=str, choices=['all', 'new'], default='all',
+                       help='Boost on the full updated train split or only the new rows')
+    parser.add_argument('--max-logloss-increase', type=float, default=0.01,
+                       help='Reject the update if validation log-loss grows by more than this')
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.005,
+                       help='Reject the update if test accuracy drops by more than this')
+    parser.add_argument('--random-state', type=int, default=42,
+                       help='Seed for splitting the new rows')
+    parser.add_argument('--output-data-dir', type=str, default=None,
+                       help='Directory to write the updated splits (defaults to --data-dir when '
+                            'exporting in place; a trial export to another --output-dir writes none)')
+    parser.add_argument('--force', action='store_true',
+                       help='Export even if validation checks fail or the input was already appended')
+
+    args = parser.parse_args()
+
+    try:
+        incremental_train(
+            args.new_data,
+            data_dir=args.data_dir,
+            model_dir=args.model_dir,
+            output_dir=args.output_dir,
+            extra_rounds=args.extra_rounds,
+            val_fraction=args.val_fraction,
+            train_on=args.train_on,
+            max_logloss_increase=args.max_logloss_increase,
+            max_accuracy_drop=args.max_accuracy_drop,
+            random_state=args.random_state,
+            force=args.force,
+            output_data_dir=args.output_data_dir
+        )
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print("\n✅ Incremental training complete! Model ready for deployment.")
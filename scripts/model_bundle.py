@@ -0,0 +1,83 @@
+"""
+Model Bundle Helpers
+Load and export the model + preprocessors in the `models/` layout the app reads
+"""
+
+import os
+import json
+import joblib
+
+from scripts.nlp_resources import load_nlp_resources, DEFAULT_RESOURCE_NAME
+from scripts.drift_monitor import load_baseline, save_baseline, BASELINE_FILE
+from scripts.cascade import FIRST_STAGE_FILE
+
+# Files that make up a servable bundle (same names load_model_local() expects)
+BUNDLE_FILES = {
+    'model': 'model.pkl',
+    'tfidf_vectorizer': 'tfidf_vectorizer.pkl',
+    'label_encoder': 'label_encoder.pkl',
+    'stat_feature_names': 'stat_feature_names.pkl',
+    'nlp_resources': DEFAULT_RESOURCE_NAME,
+    'drift_baseline': BASELINE_FILE,
+    'first_stage': FIRST_STAGE_FILE
+}
+
+# Shipped with the bundle when preprocessing/training produced them; None when absent
+OPTIONAL_FILES = ('nlp_resources', 'drift_baseline', 'first_stage')
+
+def bundle_paths(model_dir):
+    """Map each bundle component to its path inside model_dir"""
+    return {name: os.path.join(model_dir, filename) for name, filename in BUNDLE_FILES.items()}
+
+def bundle_exists(model_dir):
+    """Check that every required bundle file is present"""
+    return all(os.path.exists(p) for name, p in bundle_paths(model_dir).items() if name not in OPTIONAL_FILES)
+
+def _load_component(name, path):
+    if name == 'nlp_resources':
+        return load_nlp_resources(path)
+    if name == 'drift_baseline':
+        return load_baseline(path)
+    return joblib.load(path)
+
+def _save_component(name, value, path):
+    if name == 'nlp_resources':
+        value.save(path)
+    elif name == 'drift_baseline':
+        save_baseline(value, path)
+    else:
+        joblib.dump(value, path)
+
+def load_bundle(model_dir):
+    """Load model and preprocessors from a bundle directory (optional files are None when absent)"""
+    paths = bundle_paths(model_dir)
+    missing = [p for name, p in paths.items() if name not in OPTIONAL_FILES and not os.path.exists(p)]
+    if missing:
+        raise FileNotFoundError(f"Incomplete model bundle, missing: {', '.join(missing)}")
+    return {name: _load_component(name, path) if os.path.exists(path) else None for name, path in paths.items()}
+
+def save_bundle(bundle, model_dir, metrics=None):
+    """Write a bundle (and optional metrics.json) in the layout load_model_local() reads"""
+    os.makedirs(model_dir, exist_ok=True)
+    for name, path in bundle_paths(model_dir).items():
+        if bundle.get(name) is not None:
+            _save_component(name, bundle[name], path)
+
+    if metrics is not None:
+        save_metrics(metrics, model_dir)
+
+def save_metrics(metrics, model_dir):
+    """Write metrics.json next to the bundle files"""
+    with open(os.path.join(model_dir, 'metrics.json'), 'w') as f:
+        json.dump(metrics, f, indent=2)
+
+def bundle_size(model_dir):
+    """Bytes on disk of every bundle file present in model_dir"""
+    return sum(os.path.getsize(p) for p in bundle_paths(model_dir).values() if os.path.exists(p))
+
+def use_bundle_nlp_resources(bundle):
+    """Clean text in this process with the bundle's baked NLP resources, when it ships them"""
+    from scripts.preprocess_data import set_nlp_resources
+
+    if bundle.get('nlp_resources') is not None:
+        set_nlp_resources(bundle['nlp_resources'].use_wordnet(required=False))
@@ -0,0 +1,182 @@
+"""
+Near-duplicate Article Detection
+MinHash signatures over word shingles of the cleaned text with an LSH band index,
+used to reuse recent scores for syndicated stories and to dedupe the training data
+"""
+
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+import numpy as np
+
+# Largest prime below 2**32: (a * h + b) for 32-bit a, b and h stays inside uint64
+HASH_PRIME = 4294967291
+
+class MinHasher:
+    """MinHash signatures of word shingles with a fixed, seeded permutation family"""
+
+    def __init__(self, num_perm=64, shingle_size=3, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.randint(1, HASH_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, HASH_PRIME, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text):
+        """Hash each run of shingle_size words to 32 bits (crc32, stable across processes)"""
+        tokens = text.split()
+        if len(tokens) < self.shingle_size:
+            grams = [' '.join(tokens)] if tokens else []
+        else:
+            grams = {' '.join(tokens[i:i + self.shingle_size]) for i in range(len(tokens) - self.shingle_size + 1)}
+        return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64)
+
+    def signature(self, text):
+        """MinHash signature of cleaned text, None for text without any words"""
+        hashes = self.shingles(text)
+        if len(hashes) == 0:
+            return None
+        permuted = (np.outer(hashes, self.a) + self.b) % np.uint64(HASH_PRIME)
+        return permuted.min(axis=0)
+
+def estimated_similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity from two MinHash signatures"""
+    return float(np.mean(signature_a == signature_b))
+
+class NearDuplicateIndex:
+    """Bounded LSH index of recent signatures with time-based eviction"""
+
+    def __init__(self, num_perm=64, bands=16, threshold=0.8, max_entries=10000, ttl_seconds=3600, shingle_size=3):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (signature, value, inserted_at, band_keys)
+        self._buckets = {}  # band key -> set of entry keys
+        self._next_key = 0
+        self._stats = {'lookups': 0, 'hits': 0, 'inserts': 0, 'evictions': 0}
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def _remove(self, key):
+        signature, value, inserted_at, band_keys = self._entries.pop(key)
+        for band_key in band_keys:
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+        self._stats['evictions'] += 1
+
+    def _evict(self, now):
+        # Entries are kept in insertion order, so expired ones are at the front
+        while self._entries:
+            oldest_key, (_, _, inserted_at, _) = next(iter(self._entries.items()))
+            if len(self._entries) > self.max_entries or now - inserted_at > self.ttl_seconds:
+                self._remove(oldest_key)
+            else:
+                break
+
+    def query_signature(self, signature, now=None):
+        """Return (value, similarity) of the most similar live entry above threshold, else None"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._evict(now)
+            self._stats['lookups'] += 1
+            if signature is None:
+                return None
+            candidates = set()
+            for band_key in self._band_keys(signature):
+                candidates |= self._buckets.get(band_key, set())
+
+            best = None
+            for key in candidates:
+                entry_signature, value, _, _ = self._entries[key]
+                similarity = estimated_similarity(signature, entry_signature)
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (value, similarity)
+
+            if best is not None:
+                self._stats['hits'] += 1
+            return best
+
+    def insert_signature(self, signature, value, now=None):
+        """Add a signature with its associated value (e.g. a cached prediction)"""
+        if signature is None:
+            return
+        now = time.time() if now is None else now
+        with self._lock:
+            key = self._next_key
+            self._next_key += 1
+            band_keys = self._band_keys(signature)
+            self._entries[key] = (signature, value, now, band_keys)
+            for band_key in band_keys:
+                self._buckets.setdefault(band_key, set()).add(key)
+            self._stats['inserts'] += 1
+            self._evict(now)
+
+    def query(self, text, now=None):
+        """Look up cleaned text; returns (value, similarity) or None"""
+        return self.query_signature(self.hasher.signature(text), now)
+
+    def insert(self, text, value, now=None):
+        """Index cleaned text with its value"""
+        self.insert_signature(self.hasher.signature(text), value, now)
+
+    def stats(self):
+        """Hit-rate and size counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['hit_rate'] = stats['hits'] / stats['lookups'] if stats['lookups'] else None
+            stats['threshold'] = self.threshold
+            stats['max_entries'] = self.max_entries
+            stats['ttl_seconds'] = self.ttl_seconds
+            return stats
+
+def find_near_duplicates(texts, threshold=0.8, num_perm=64, bands=16, shingle_size=3):
+    """Mark each text that nearly duplicates an earlier one; returns a boolean array (empty texts are kept)"""
+    index = NearDuplicateIndex(num_perm=num_perm, bands=bands, threshold=threshold,
+                               max_entries=len(texts) + 1, ttl_seconds=float('inf'), shingle_size=shingle_size)
+    duplicate = np.zeros(len(texts), dtype=bool)
+    for i, text in enumerate(texts):
+        signature = index.hasher.signature(text)
+        if index.query_signature(signature, now=0.0) is not None:
+            duplicate[i] = True
+        else:
+            index.insert_signature(signature, i, now=0.0)
+    return duplicate
+
+if __name__ == '__main__':
+    import argparse
+    import pandas as pd
+
+    # Allow `scripts.*` imports when run directly as a script
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+    from scripts.preprocess_data import clean_text
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input_file', type=str,
+                       help='Raw dataset CSV (Headline, Body, ...)')
+    parser.add_argument('output_file', type=str,
+                       help='Where to write the deduplicated CSV')
+    parser.add_argument('--threshold', type=float, default=0.8,
+                       help='Estimated Jaccard similarity above which rows are duplicates')
+
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input_file)
+    cleaned = (df['Headline'].fillna('').apply(clean_text) + ' ' + df['Body'].fillna('').apply(clean_text)).tolist()
+    duplicate = find_near_duplicates(cleaned, threshold=args.threshold)
+    df[~duplicate].to_csv(args.output_file, index=False)
+    print(f"Removed {int(duplicate.sum())} near-duplicate rows, kept {int((~duplicate).sum())}")
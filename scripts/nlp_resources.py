@@ -0,0 +1,211 @@
+"""
+Offline NLP Resources for Text Cleaning
+Stopword list and a precomputed lemma table baked into one versioned array store
+file, so workers start offline; tokens missing from the table go to the installed
+WordNet (memoised) and are kept as-is only when it is not installed
+"""
+
+import hashlib
+import logging
+import os
+import sys
+import numpy as np
+
+# Allow `scripts.*` imports when run directly as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from scripts.array_store import write_arrays, map_arrays
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_FORMAT = 'newsverify-nlp-resources'
+RESOURCE_VERSION = 1
+DEFAULT_RESOURCE_NAME = 'nlp_resources.nva'
+
+# Words nltk.word_tokenize splits even in letters-only text (the Treebank CONTRACTIONS2 rules)
+CONTRACTIONS = {
+    'cannot': ['can', 'not'],
+    'gimme': ['gim', 'me'],
+    'gonna': ['gon', 'na'],
+    'gotta': ['got', 'ta'],
+    'lemme': ['lem', 'me'],
+    'wanna': ['wan', 'na']
+}
+
+# Lemmas memoised from WordNet for tokens missing from the table, beyond the baked entries
+MAX_RUNTIME_LEMMAS = 100000
+
+def tokenize(text):
+    """nltk.word_tokenize for the lowercase letters-and-whitespace text clean_text produces"""
+    tokens = []
+    for token in text.split():
+        split = CONTRACTIONS.get(token)
+        if split is None:
+            tokens.append(token)
+        else:
+            tokens.extend(split)
+    return tokens
+
+def _join(words):
+    return np.frombuffer('\n'.join(words).encode('utf-8'), dtype=np.uint8)
+
+def _split(array):
+    text = array.tobytes().decode('utf-8')
+    return text.split('\n') if text else []
+
+# Shown when NLTK data is needed but not installed (it is never downloaded implicitly)
+NLTK_DATA_HINT = "install them with `python -m nltk.downloader stopwords wordnet`"
+
+def _wordnet_lemmatizer():
+    from nltk.stem import WordNetLemmatizer
+    lemmatizer = WordNetLemmatizer()
+    try:
+        lemmatizer.lemmatize('tests')
+    except LookupError as e:
+        raise LookupError(f"WordNet is not installed; {NLTK_DATA_HINT}") from e
+    return lemmatizer
+
+class NLPResources:
+    """Stopwords plus a token -> lemma table; unknown tokens go to WordNet only when it is attached"""
+
+    def __init__(self, stop_words, lemmas=None, meta=None, lemmatizer=None):
+        self.stop_words = set(stop_words)
+        self.lemmas = dict(lemmas or {})
+        self.meta = meta or {}
+        self.baked_entries = len(self.lemmas)
+        self.misses = 0
+        self._fingerprint = None
+        # Without WordNet attached a miss is an identity lookup, which training would not produce
+        self._lemmatizer = lemmatizer
+
+    @classmethod
+    def from_nltk(cls):
+        """Stopwords and WordNet from the installed NLTK data (training machines); raises when missing"""
+        from nltk.corpus import stopwords
+        try:
+            stop_words = stopwords.words('english')
+        except LookupError as e:
+            raise LookupError(f"NLTK stopwords are not installed; {NLTK_DATA_HINT}") from e
+        return cls(stop_words, lemmatizer=_wordnet_lemmatizer())
+
+    def use_wordnet(self, required=True):
+        """Lemmatize tokens missing from the table with WordNet, as training did
+
+        Loads WordNet now, so call it at startup, not per request. Unless required, a missing
+        WordNet is logged and misses stay identity lookups.
+        """
+        if self._lemmatizer is None:
+            try:
+                self._lemmatizer = _wordnet_lemmatizer()
+            except (ImportError, LookupError) as e:
+                if required:
+                    raise
+                logger.warning(f"Tokens missing from the lemma table will not be lemmatized: {e}")
+                return self
+            self._fingerprint = None
+        return self
+
+    def fingerprint(self):
+        """Digest of everything that decides clean_text output: stopwords and the lemma source
+
+        With WordNet attached the baked entries are WordNet lemmas too, so extending the table
+        does not change the digest; without it, the table itself decides the output.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha1(_join(sorted(self.stop_words)).tobytes())
+            if self._lemmatizer is None:
+                tokens = sorted(self.lemmas)
+                digest.update(b'\0identity\0' + _join(tokens).tobytes())
+                digest.update(b'\0' + _join(self.lemmas[token] for token in tokens).tobytes())
+            else:
+                import nltk
+                digest.update(f'\0wordnet-{nltk.__version__}'.encode('utf-8'))
+                # Entries baked by another NLTK release may lemmatize differently
+                baked_with = self.meta.get('nltk_version', nltk.__version__) if self.baked_entries else nltk.__version__
+                if baked_with != nltk.__version__:
+                    digest.update(f'\0baked-{baked_with}'.encode('utf-8'))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def lemmatize(self, word):
+        """Noun lemma of a token, from the table when present"""
+        lemma = self.lemmas.get(word)
+        if lemma is not None:
+            return lemma
+
+        self.misses += 1
+        if self._lemmatizer is None:
+            if self.misses == 1:
+                logger.warning(f"Token {word!r} is not in the baked lemma table and WordNet is not "
+                               "attached; tokens missing from the table are kept as-is")
+            return word
+
+        lemma = self._lemmatizer.lemmatize(word)
+        if len(self.lemmas) < self.baked_entries + MAX_RUNTIME_LEMMAS:
+            self.lemmas[word] = lemma
+        return lemma
+
+    def save(self, path, vocabulary=None, tokens=None):
+        """Write stopwords and every known lemma, plus corpus tokens and vocabulary unigrams, to path
+
+        Returns the number of lemma entries written.
+        """
+        table = dict(self.lemmas)
+        new_tokens = set(tokens or ()) | {term for term in vocabulary or () if ' ' not in term}
+        new_tokens.difference_update(table)
+        if new_tokens:
+            # Baked lemmas must come from WordNet, never from the identity fallback
+            self.use_wordnet()
+            for token in new_tokens:
+                table[token] = self.lemmatize(token)
+
+        tokens = sorted(table)
+        import nltk
+        meta = {
+            'format': RESOURCE_FORMAT,
+            'version': RESOURCE_VERSION,
+            'nltk_version': nltk.__version__,
+            'entries': len(tokens)
+        }
+        write_arrays(path, {
+            'stop_words': _join(sorted(self.stop_words)),
+            'tokens': _join(tokens),
+            'lemmas': _join(table[token] for token in tokens)
+        }, meta)
+        return len(tokens)
+
+    def stats(self):
+        """Table size and lookups that missed the baked table in this process"""
+        return {
+            'entries': len(self.lemmas),
+            'baked_entries': self.baked_entries,
+            'misses': self.misses,
+            'wordnet': self._lemmatizer is not None
+        }
+
+def load_nlp_resources(path):
+    """Load a resource file written by NLPResources.save()"""
+    arrays, meta = map_arrays(path)
+    if meta.get('format') != RESOURCE_FORMAT or meta.get('version') != RESOURCE_VERSION:
+        raise ValueError(f"{path} is not a version {RESOURCE_VERSION} NLP resource file")
+    lemmas = dict(zip(_split(arrays['tokens']), _split(arrays['lemmas'])))
+    return NLPResources(_split(arrays['stop_words']), lemmas, meta)
+
+if __name__ == '__main__':
+    import argparse
+    import joblib
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--vectorizer', type=str, default='models/tfidf_vectorizer.pkl',
+                       help='Fitted TF-IDF vectorizer whose unigrams are added to the table')
+    parser.add_argument('--base', type=str, default=None,
+                       help='Existing resource file to extend')
+    parser.add_argument('--output', type=str, default=os.path.join('models', DEFAULT_RESOURCE_NAME),
+                       help='Where to write the resource file')
+
+    args = parser.parse_args()
+
+    resources = load_nlp_resources(args.base) if args.base else NLPResources.from_nltk()
+    vectorizer = joblib.load(args.vectorizer)
+    entries = resources.save(args.output, vocabulary=vectorizer.vocabulary_)
+    print(f"✅ NLP resources written to {args.output} ({entries} lemmas)")
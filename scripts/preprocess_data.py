@@ -6,34 +6,147 @@ This script performs EDA, cleaning, and feature engineering
 import pandas as pd
 import numpy as np
 import re
-import nltk
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
+import hashlib
 import joblib
 import os
+import sys
+import time
 from urllib.parse import urlparse
 
-# Download NLTK data
-try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    nltk.download('wordnet', quiet=True)
-except:
-    pass
+# Allow `scripts.*` imports when run directly as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
+from scripts.profiling import Profiler
+from scripts.nlp_resources import NLPResources, load_nlp_resources, tokenize, DEFAULT_RESOURCE_NAME
+from scripts.split_store import write_splits, SPLIT_STORE_FILE, SPLIT_ROWS_FILE
 
-# Initialize
-stop_words = set(stopwords.words('english'))
-lemmatizer = WordNetLemmatizer()
+# Stopwords and lemma table baked by a previous preprocessing run (shipped with the model bundle);
+# without it, the installed NLTK corpora are used (never downloaded)
+NLP_RESOURCES_PATH = os.environ.get(
+    'NLP_RESOURCES_PATH',
+    os.path.join(os.path.dirname(__file__), '..', 'models', DEFAULT_RESOURCE_NAME)
+)
+nlp_resources = None
 
-def clean_text(text):
-    """Clean and preprocess text"""
+# Input size limits, applied identically at training and serving time so features stay consistent
+MAX_HEADLINE_TOKENS = int(os.environ.get('MAX_HEADLINE_TOKENS', 64))
+MAX_BODY_TOKENS = int(os.environ.get('MAX_BODY_TOKENS', 5000))
+TRUNCATION_POLICY = os.environ.get('TRUNCATION_POLICY', 'head_tail')  # 'head' or 'head_tail'
+# Safety cap on the characters kept per token, for text whose tokens are pathologically long
+MAX_CHARS_PER_TOKEN = 50
+
+# Rows per parallel chunk when extracting statistical features with n_jobs > 1
+STAT_FEATURE_CHUNK_ROWS = 100000
+
+def _head_chars(text, max_chars):
+    """Leading whole tokens of text within max_chars characters (a hard cut inside a longer first token)"""
+    window = text[:max_chars + 1]
+    if len(window) > max_chars and not window[-1].isspace():
+        parts = window.rsplit(None, 1)
+        if len(parts) == 2:
+            window = parts[0]
+    return window[:max_chars].rstrip()
+
+def _tail_chars(text, max_chars):
+    """Trailing whole tokens of text within max_chars characters (a hard cut inside a longer last token)"""
+    window = text[-(max_chars + 1):]
+    if len(window) > max_chars and not window[0].isspace():
+        parts = window.split(None, 1)
+        if len(parts) == 2:
+            window = parts[1]
+    return window[-max_chars:].lstrip()
+
+def _cap_chars(text, max_chars, policy):
+    """Cut text to at most max_chars characters at whitespace (head, or head and tail)"""
+    if policy == 'head':
+        return _head_chars(text, max_chars)
+    half = (max_chars - 1) // 2
+    return _head_chars(text, half) + ' ' + _tail_chars(text, half)
+
+def _keep_tokens(text, head_count, tail_count):
+    """First head_count and last tail_count tokens joined, or None when text has no more than that"""
+    head = text.split(None, head_count)
+    if len(head) <= head_count:
+        return None
+    tail = head[-1].rsplit(None, tail_count)
+    if len(tail) <= tail_count:
+        return None
+    return ' '.join(head[:head_count] + tail[1:])
+
+def truncate_text(text, max_tokens, policy=None):
+    """Cap text at max_tokens whitespace tokens, returns (text, was_truncated)
+    
+    Keeps the same tokens as text.split() would, never cutting one unless a single token is longer
+    than the character cap. Idempotent, so training and serving (which truncates again in
+    transform_features) agree.
+    """
+    policy = policy or TRUNCATION_POLICY
+    text = str(text)
+    
+    # Fewer than 2 * max_tokens characters cannot hold more than max_tokens tokens
+    if len(text) < 2 * max_tokens:
+        return text, False
+    
+    head_count = max_tokens if policy == 'head' else (max_tokens + 1) // 2
+    tail_count = max_tokens - head_count
+    max_chars = max_tokens * MAX_CHARS_PER_TOKEN
+    
+    kept = None
+    window = max_chars + 1
+    if len(text) > 2 * window:
+        # Look for the kept tokens in a window at each end only, so a multi-megabyte string is never
+        # split or copied whole. Complete tokens in both windows, with one more token after the head,
+        # mean the text is over the limit.
+        head = text[:window].split(None, head_count)
+        tail = text[-window:].rsplit(None, tail_count)
+        if len(head) > head_count and len(tail) > tail_count:
+            kept = ' '.join(head[:head_count] + tail[1:])
+    if kept is None:
+        kept = _keep_tokens(text, head_count, tail_count)
+    
+    truncated = kept is not None
+    if truncated:
+        text = kept
+    
+    # Only tokens averaging over MAX_CHARS_PER_TOKEN characters are cut further, at whitespace
+    if len(text) > max_chars:
+        text = _cap_chars(text, max_chars, policy)
+        truncated = True
+    
+    return text, truncated
+
+def truncate_frame(df):
+    """Apply the input size limits to Headline/Body, returns (df, per-row truncated flags)"""
+    df = df.copy()
+    flags = pd.Series(False, index=df.index)
+    for column, max_tokens in [('Headline', MAX_HEADLINE_TOKENS), ('Body', MAX_BODY_TOKENS)]:
+        results = [truncate_text(text, max_tokens) for text in df[column].astype(str)]
+        df[column] = [text for text, _ in results]
+        flags |= pd.Series([was_truncated for _, was_truncated in results], index=df.index)
+    return df, flags
+
+def get_nlp_resources():
+    """NLP resources used by clean_text, loaded on first use"""
+    global nlp_resources
+    if nlp_resources is None:
+        if os.path.exists(NLP_RESOURCES_PATH):
+            nlp_resources = load_nlp_resources(NLP_RESOURCES_PATH)
+        else:
+            nlp_resources = NLPResources.from_nltk()
+    return nlp_resources
+
+def set_nlp_resources(resources):
+    """Use the given NLP resources (e.g. the file downloaded with a model bundle)"""
+    global nlp_resources
+    nlp_resources = resources
+
+def text_tokens(text):
+    """Lowercase letters-only tokens of raw text, before stopword removal and lemmatization"""
     if pd.isna(text):
-        return ""
+        return []
     
     # Convert to string and lowercase
     text = str(text).lower()
@@ -44,51 +157,255 @@ def clean_text(text):
     # Remove special characters and digits
     text = re.sub(r'[^a-zA-Z\s]', '', text)
     
-    # Tokenize
-    tokens = word_tokenize(text)
+    # Tokenize (same tokens as nltk.word_tokenize on letters-only text)
+    return tokenize(text)
+
+def kept_tokens(text):
+    """Tokens of raw text that clean_text lemmatizes (stopwords and short words removed)"""
+    stop_words = get_nlp_resources().stop_words
+    return [word for word in text_tokens(text) if word not in stop_words and len(word) > 2]
+
+def lemmatize_tokens(tokens):
+    """Cleaned text for the output of kept_tokens()"""
+    resources = get_nlp_resources()
+    return ' '.join(resources.lemmatize(word) for word in tokens)
+
+def clean_text(text):
+    """Clean and preprocess text"""
+    if pd.isna(text):
+        return ""
     
     # Remove stopwords and lemmatize
-    tokens = [lemmatizer.lemmatize(word) for word in tokens if word not in stop_words and len(word) > 2]
-    
-    return ' '.join(tokens)
+    return lemmatize_tokens(kept_tokens(text))
+
+def clean_columns(df):
+    """Cleaned Headline/Body of raw rows, plus each row's lemmatized tokens (space-joined) for the lemma bake"""
+    headline_tokens = [kept_tokens(text) for text in df['Headline']]
+    body_tokens = [kept_tokens(text) for text in df['Body']]
+    return pd.DataFrame({
+        'Headline_cleaned': [lemmatize_tokens(tokens) for tokens in headline_tokens],
+        'Body_cleaned': [lemmatize_tokens(tokens) for tokens in body_tokens],
+        'Corpus_tokens': [' '.join(sorted(set(h) | set(b))) for h, b in zip(headline_tokens, body_tokens)]
+    }, index=df.index)
+
+# Deletion tables for str.translate: ASCII characters matched by [^\w\s] and [A-Z]
+_ASCII_PUNCTUATION = {c: None for c in range(128) if re.match(r'[^\w\s]', chr(c))}
+_ASCII_UPPERCASE = {c: None for c in range(ord('A'), ord('Z') + 1)}
+_PUNCTUATION = re.compile(r'[^\w\s]')
+_SENTENCE_END = re.compile(r'[.!?]+')
 
-def extract_statistical_features(df):
-    """Extract statistical features from text"""
-    features = pd.DataFrame()
+def _text_column(df, column):
+    """Column converted to Python strings once (same values as .astype(str))"""
+    return [str(x) for x in df[column]]
+
+def _punctuation_count(text):
+    r"""Number of [^\w\s] matches; ASCII text takes the str.translate fast path"""
+    if text.isascii():
+        return len(text) - len(text.translate(_ASCII_PUNCTUATION))
+    return len(_PUNCTUATION.findall(text))
+
+def _uppercase_count(text):
+    """Number of characters for which str.isupper() is true"""
+    if text.isascii():
+        return len(text) - len(text.translate(_ASCII_UPPERCASE))
+    return sum(1 for c in text if c.isupper())
+
+def _ratio(numerator, denominator):
+    """numerator / denominator, 0 where the denominator is 0"""
+    numerator = np.asarray(numerator, dtype=np.int64)
+    denominator = np.asarray(denominator, dtype=np.int64)
+    return np.where(denominator > 0, numerator / np.maximum(denominator, 1), 0.0)
+
+def _statistical_features_chunk(df):
+    """All statistical features for a frame, one pass over each text column"""
+    headline = _text_column(df, 'Headline')
+    body = _text_column(df, 'Body')
+    urls = _text_column(df, 'URLs')
     
     # Headline features
-    features['headline_length'] = df['Headline'].astype(str).str.len()
-    features['headline_word_count'] = df['Headline'].astype(str).str.split().str.len()
-    features['headline_uppercase_ratio'] = df['Headline'].astype(str).apply(
-        lambda x: sum(1 for c in x if c.isupper()) / len(x) if len(x) > 0 else 0
-    )
-    features['headline_punctuation_count'] = df['Headline'].astype(str).str.count(r'[^\w\s]')
-    
-    # Body features
-    features['body_length'] = df['Body'].astype(str).str.len()
-    features['body_word_count'] = df['Body'].astype(str).str.split().str.len()
-    features['body_sentence_count'] = df['Body'].astype(str).str.count(r'[.!?]+')
-    features['body_avg_word_length'] = df['Body'].astype(str).apply(
-        lambda x: np.mean([len(word) for word in x.split()]) if len(x.split()) > 0 else 0
-    )
-    features['body_punctuation_count'] = df['Body'].astype(str).str.count(r'[^\w\s]')
-    features['body_exclamation_count'] = df['Body'].astype(str).str.count('!')
-    features['body_question_count'] = df['Body'].astype(str).str.count(r'\?')
+    headline_length = np.array([len(text) for text in headline], dtype=np.int64)
+    features = {
+        'headline_length': headline_length,
+        'headline_word_count': np.array([len(text.split()) for text in headline], dtype=np.int64),
+        'headline_uppercase_ratio': _ratio([_uppercase_count(text) for text in headline], headline_length),
+        'headline_punctuation_count': np.array([_punctuation_count(text) for text in headline], dtype=np.int64)
+    }
+    
+    # Body features: split once per row; the mean word length is non-whitespace characters over words
+    body_stats = []
+    for text in body:
+        words = text.split()
+        body_stats.append((
+            len(text),
+            len(words),
+            len(_SENTENCE_END.findall(text)),
+            sum(map(len, words)),
+            _punctuation_count(text),
+            text.count('!'),
+            text.count('?')
+        ))
+    body_stats = np.array(body_stats, dtype=np.int64).reshape(len(body), 7)
+    features['body_length'] = body_stats[:, 0]
+    features['body_word_count'] = body_stats[:, 1]
+    features['body_sentence_count'] = body_stats[:, 2]
+    features['body_avg_word_length'] = _ratio(body_stats[:, 3], body_stats[:, 1])
+    features['body_punctuation_count'] = body_stats[:, 4]
+    features['body_exclamation_count'] = body_stats[:, 5]
+    features['body_question_count'] = body_stats[:, 6]
     
     # URL features
-    features['url_length'] = df['URLs'].astype(str).str.len()
-    features['has_url'] = df['URLs'].astype(str).apply(lambda x: 1 if 'http' in str(x).lower() else 0)
+    features['url_length'] = np.array([len(text) for text in urls], dtype=np.int64)
+    features['has_url'] = np.array([1 if 'http' in text.lower() else 0 for text in urls], dtype=np.int64)
     
     # Combined features
     features['total_length'] = features['headline_length'] + features['body_length']
     features['headline_body_ratio'] = features['headline_length'] / (features['body_length'] + 1)
     
-    return features
+    # One frame construction; inserting columns one by one costs more than the features on small batches
+    return pd.DataFrame(features, index=df.index)
 
-def preprocess_data(input_path, output_dir='processed_data'):
+def extract_statistical_features(df, n_jobs=1, chunk_rows=STAT_FEATURE_CHUNK_ROWS):
+    """Extract statistical features from text
+    
+    Each text column is converted once and all of its features are computed in a single
+    pass with C-level string methods. With n_jobs > 1, chunks of chunk_rows rows are
+    processed in parallel.
+    """
+    if n_jobs == 1 or len(df) <= chunk_rows:
+        return _statistical_features_chunk(df)
+    
+    from concurrent.futures import ProcessPoolExecutor
+    
+    columns = df[['Headline', 'Body', 'URLs']]
+    chunks = [columns.iloc[i:i + chunk_rows] for i in range(0, len(columns), chunk_rows)]
+    with ProcessPoolExecutor(max_workers=None if n_jobs < 0 else n_jobs) as executor:
+        return pd.concat(executor.map(_statistical_features_chunk, chunks))
+
+# Everything the feature cache stores is computed by these; their source versions the cached rows
+FEATURE_CODE = (tokenize, text_tokens, kept_tokens, lemmatize_tokens, clean_columns, _text_column, _punctuation_count, _uppercase_count,
+                _ratio, _statistical_features_chunk)
+
+def cached_feature_version():
+    """Feature cache version for the current feature code, statistical features and NLP resources"""
+    import inspect
+    from scripts.feature_store import feature_version
+    
+    digest = hashlib.sha1()
+    for function in FEATURE_CODE:
+        digest.update(inspect.getsource(function).encode('utf-8'))
+    for pattern in (_PUNCTUATION, _SENTENCE_END):
+        digest.update(pattern.pattern.encode('utf-8'))
+    
+    probe = pd.DataFrame({'Headline': [''], 'Body': [''], 'URLs': ['']})
+    stat_feature_names = list(_statistical_features_chunk(probe).columns)
+    return feature_version(digest.hexdigest(), stat_feature_names, get_nlp_resources().fingerprint())
+
+def split_tokens(joined):
+    """Union of space-joined token strings"""
+    return set(' '.join(joined).split())
+
+def build_text_features(df, feature_cache_dir=None, n_jobs=1, profiler=None):
+    """Clean text and extract statistical features, reusing cached rows when a cache is given
+    
+    Returns (cleaned text, stat features, corpus tokens): the set of every token the cleaned text
+    lemmatized, kept in the cache with each row so cached rows are never tokenized again.
+    """
+    profiler = profiler or Profiler(enabled=False)
+    
+    if feature_cache_dir is None:
+        with profiler.stage('clean_text'):
+            cleaned = clean_columns(df)
+        with profiler.stage('stat_features'):
+            stat_features = extract_statistical_features(df, n_jobs=n_jobs)
+        return cleaned[['Headline_cleaned', 'Body_cleaned']], stat_features, split_tokens(cleaned['Corpus_tokens'])
+    
+    from scripts.feature_store import FeatureStore, row_keys, KEY_COLUMN, TEXT_COLUMNS, TOKEN_COLUMN
+    
+    with profiler.stage('feature_cache_lookup'):
+        store = FeatureStore(feature_cache_dir)
+        keys = pd.Index(row_keys(df, cached_feature_version()))
+        cached = store.lookup(keys)
+    
+    missing = ~keys.isin(cached.index)
+    print(f"Feature cache: {int((~missing).sum())} cached rows, {int(missing.sum())} to compute")
+    
+    if missing.any():
+        new_rows = df[missing].copy()
+        new_rows[KEY_COLUMN] = keys[missing]
+        new_rows = new_rows.drop_duplicates(KEY_COLUMN)
+        
+        with profiler.stage('stat_features'):
+            computed = extract_statistical_features(new_rows, n_jobs=n_jobs)
+        with profiler.stage('clean_text'):
+            computed = pd.concat([clean_columns(new_rows), computed], axis=1)
+        computed.insert(0, KEY_COLUMN, new_rows[KEY_COLUMN])
+        
+        with profiler.stage('feature_cache_append'):
+            store.append(computed)
+        cached = pd.concat([cached, computed.set_index(KEY_COLUMN)])
+    
+    features = cached.reindex(keys)
+    features.index = df.index
+    stat_columns = [c for c in features.columns if c not in TEXT_COLUMNS and c != TOKEN_COLUMN]
+    return features[TEXT_COLUMNS], features[stat_columns], split_tokens(features[TOKEN_COLUMN])
+
+def clean_combined_text(df):
+    """Cleaned headline and body joined into the text the TF-IDF vectorizer sees"""
+    return df['Headline'].apply(clean_text) + ' ' + df['Body'].apply(clean_text)
+
+def transform_features(df, tfidf_vectorizer, stat_feature_names, timings=None, combined_text=None,
+                       stat_features=None):
+    """Build the model input matrix for raw rows using already-fitted preprocessors
+    
+    If a timings dict is given, per-stage wall time in seconds is added to it.
+    combined_text may pass the output of clean_combined_text, and stat_features an
+    array of the stat features in stat_feature_names order, when the caller already has them.
+    """
+    from scipy.sparse import hstack
+    
+    start = time.perf_counter()
+    
+    # Same input size limits as training (no-op for rows already truncated)
+    df, _ = truncate_frame(df)
+    truncated_at = time.perf_counter()
+    
+    if combined_text is None:
+        combined_text = clean_combined_text(df)
+    cleaned_at = time.perf_counter()
+    
+    # Ensure feature order matches training
+    if stat_features is None:
+        stat_features = extract_statistical_features(df)[stat_feature_names].values
+    stats_at = time.perf_counter()
+    
+    tfidf_features = tfidf_vectorizer.transform(combined_text)
+    tfidf_at = time.perf_counter()
+    
+    X = hstack([tfidf_features, stat_features]).tocsr()
+    
+    if timings is not None:
+        stages = [
+            ('truncate', truncated_at - start),
+            ('clean_text', cleaned_at - truncated_at),
+            ('stat_features', stats_at - cleaned_at),
+            ('tfidf', tfidf_at - stats_at),
+            ('assemble', time.perf_counter() - tfidf_at)
+        ]
+        for stage, seconds in stages:
+            timings[stage] = timings.get(stage, 0.0) + seconds
+    
+    return X
+
+def preprocess_data(input_path, output_dir='processed_data', max_features=5000, ngram_range=(1, 2),
+                    random_state=42, feature_cache_dir=None, dedupe=False, dedupe_threshold=0.8, n_jobs=1,
+                    profile=False, profile_sampling=False, storage='npz'):
     """Main preprocessing function"""
+    # Per-stage wall/CPU time and peak memory, written to profile.json when enabled
+    profiler = Profiler(enabled=profile or profile_sampling, sampling=profile_sampling)
+    
     print("Loading data...")
-    df = pd.read_csv(input_path)
+    with profiler.stage('load_csv'):
+        df = pd.read_csv(input_path)
     
     print(f"Dataset shape: {df.shape}")
     print(f"Label distribution:\n{df['Label'].value_counts()}")
@@ -98,78 +415,164 @@ def preprocess_data(input_path, output_dir='processed_data'):
     df['Body'] = df['Body'].fillna('')
     df['URLs'] = df['URLs'].fillna('')
     
-    # Clean text
-    print("Cleaning text...")
-    df['Headline_cleaned'] = df['Headline'].apply(clean_text)
-    df['Body_cleaned'] = df['Body'].apply(clean_text)
+    # Apply the same input size limits used at serving time
+    with profiler.stage('truncate'):
+        df, truncated = truncate_frame(df)
+    print(f"Truncated {int(truncated.sum())} rows to {MAX_HEADLINE_TOKENS}/{MAX_BODY_TOKENS} "
+          f"headline/body tokens ({TRUNCATION_POLICY})")
+    
+    # Training lemmatizes tokens missing from any existing table with WordNet (fails here if not installed)
+    get_nlp_resources().use_wordnet()
+    
+    # Clean text and extract statistical features
+    print("Cleaning text and extracting statistical features...")
+    cleaned, stat_features, corpus_tokens = build_text_features(df, feature_cache_dir, n_jobs=n_jobs,
+                                                                profiler=profiler)
+    df['Headline_cleaned'] = cleaned['Headline_cleaned']
+    df['Body_cleaned'] = cleaned['Body_cleaned']
     
     # Combine headline and body for TF-IDF
     df['Combined_text'] = df['Headline_cleaned'] + ' ' + df['Body_cleaned']
     
-    # Extract statistical features
-    print("Extracting statistical features...")
-    stat_features = extract_statistical_features(df)
+    # Drop near-duplicate articles (syndicated copies) so they cannot land on both sides of the split
+    if dedupe:
+        from scripts.near_duplicate import find_near_duplicates
+        with profiler.stage('dedupe'):
+            duplicate = find_near_duplicates(df['Combined_text'].tolist(), threshold=dedupe_threshold)
+        df = df[~duplicate]
+        stat_features = stat_features[~duplicate]
+        print(f"Removed {int(duplicate.sum())} near-duplicate rows (threshold {dedupe_threshold}), "
+              f"{len(df)} remain")
     
     # TF-IDF Vectorization
     print("Creating TF-IDF features...")
     tfidf_vectorizer = TfidfVectorizer(
-        max_features=5000,
-        ngram_range=(1, 2),
+        max_features=max_features,
+        ngram_range=tuple(ngram_range),
         min_df=2,
         max_df=0.95
     )
     
-    tfidf_features = tfidf_vectorizer.fit_transform(df['Combined_text'])
+    with profiler.stage('tfidf_fit'):
+        tfidf_features = tfidf_vectorizer.fit_transform(df['Combined_text'])
+    
+    # Baseline distributions for serving-time drift monitoring (OOV rate on a sample of rows)
+    from scripts.drift_monitor import (
+        build_baseline, save_baseline, oov_rates, unigram_vocabulary, BASELINE_FILE, BASELINE_OOV_SAMPLE_ROWS
+    )
+    with profiler.stage('drift_baseline'):
+        sample = df['Combined_text'].sample(min(len(df), BASELINE_OOV_SAMPLE_ROWS), random_state=random_state)
+        drift_baseline = build_baseline(stat_features, oov_rates(sample, unigram_vocabulary(tfidf_vectorizer)))
     
-    # Combine TF-IDF and statistical features
+    # Combine TF-IDF and statistical features (CSR once; splits below select rows by index)
     from scipy.sparse import hstack
-    X = hstack([tfidf_features, stat_features.values])
+    with profiler.stage('hstack'):
+        X = hstack([tfidf_features, stat_features.values]).tocsr()
     
     # Encode labels
     label_encoder = LabelEncoder()
     y = label_encoder.fit_transform(df['Label'])
     
-    # Train/Val/Test split
+    # Train/Val/Test split over row positions (same rows as splitting X itself)
     print("Splitting data...")
-    X_temp, X_test, y_temp, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
-    X_train, X_val, y_train, y_val = train_test_split(
-        X_temp, y_temp, test_size=0.2, random_state=42, stratify=y_temp
-    )
+    with profiler.stage('split'):
+        temp_rows, test_rows = train_test_split(
+            np.arange(X.shape[0]), test_size=0.2, random_state=random_state, stratify=y
+        )
+        train_rows, val_rows = train_test_split(
+            temp_rows, test_size=0.2, random_state=random_state, stratify=y[temp_rows]
+        )
+    splits = {'train': train_rows, 'val': val_rows, 'test': test_rows}
     
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
     
     # Save processed data
     print("Saving processed data...")
-    from scipy.sparse import save_npz
-    save_npz(f'{output_dir}/X_train.npz', X_train)
-    save_npz(f'{output_dir}/X_val.npz', X_val)
-    save_npz(f'{output_dir}/X_test.npz', X_test)
+    if storage in ('npz', 'both'):
+        from scipy.sparse import save_npz
+        with profiler.stage('save_npz'):
+            for name, rows in splits.items():
+                save_npz(f'{output_dir}/X_{name}.npz', X[rows])
+                np.save(f'{output_dir}/y_{name}.npy', y[rows])
+            # Source row positions, e.g. for models trained on the raw text of the same split
+            source_rows = df.index.to_numpy()
+            np.savez(f'{output_dir}/{SPLIT_ROWS_FILE}', **{name: source_rows[rows] for name, rows in splits.items()})
     
-    np.save(f'{output_dir}/y_train.npy', y_train)
-    np.save(f'{output_dir}/y_val.npy', y_val)
-    np.save(f'{output_dir}/y_test.npy', y_test)
+    if storage in ('store', 'both'):
+        # One uncompressed file that training memory-maps instead of decompressing
+        with profiler.stage('save_store'):
+            write_splits(os.path.join(output_dir, SPLIT_STORE_FILE), X, y, splits, row_index=df.index.to_numpy())
+        print(f"Split store saved to {output_dir}/{SPLIT_STORE_FILE}")
     
-    # Save vectorizer and encoders
-    joblib.dump(tfidf_vectorizer, f'{output_dir}/tfidf_vectorizer.pkl')
-    joblib.dump(label_encoder, f'{output_dir}/label_encoder.pkl')
-    joblib.dump(stat_features.columns.tolist(), f'{output_dir}/stat_feature_names.pkl')
+    with profiler.stage('save_preprocessors'):
+        # Save vectorizer and encoders
+        joblib.dump(tfidf_vectorizer, f'{output_dir}/tfidf_vectorizer.pkl')
+        joblib.dump(label_encoder, f'{output_dir}/label_encoder.pkl')
+        joblib.dump(stat_features.columns.tolist(), f'{output_dir}/stat_feature_names.pkl')
+        save_baseline(drift_baseline, os.path.join(output_dir, BASELINE_FILE))
+    
+    # Bake stopwords and the lemma of every training token (rows served from the feature cache bring
+    # their tokens with them, as they were never cleaned in this process) so serving needs no NLTK data
+    with profiler.stage('nlp_resources'):
+        resources = get_nlp_resources()
+        resources_path = os.path.join(output_dir, DEFAULT_RESOURCE_NAME)
+        entries = resources.save(resources_path, vocabulary=tfidf_vectorizer.vocabulary_, tokens=corpus_tokens)
+    print(f"NLP resources: {entries} lemmas saved to {resources_path}")
     
     print(f"\nPreprocessing complete!")
-    print(f"Train set: {X_train.shape[0]} samples")
-    print(f"Validation set: {X_val.shape[0]} samples")
-    print(f"Test set: {X_test.shape[0]} samples")
-    print(f"Total features: {X_train.shape[1]}")
+    print(f"Train set: {len(train_rows)} samples")
+    print(f"Validation set: {len(val_rows)} samples")
+    print(f"Test set: {len(test_rows)} samples")
+    print(f"Total features: {X.shape[1]}")
+    
+    profiler.write(os.path.join(output_dir, 'profile.json'))
     
     return output_dir
 
 if __name__ == "__main__":
-    import sys
+    import argparse
     
-    input_file = sys.argv[1] if len(sys.argv) > 1 else 'data.csv'
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else 'processed_data'
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input_file', nargs='?', default='data.csv',
+                       help='Raw dataset CSV')
+    parser.add_argument('output_dir', nargs='?', default='processed_data',
+                       help='Directory to save processed data')
+    parser.add_argument('--max-features', type=int, default=5000,
+                       help='TF-IDF vocabulary size')
+    parser.add_argument('--ngram-range', type=int, nargs=2, default=[1, 2],
+                       help='TF-IDF n-gram range, e.g. --ngram-range 1 2')
+    parser.add_argument('--random-state', type=int, default=42,
+                       help='Seed for the train/validation/test split')
+    parser.add_argument('--feature-cache', type=str, default=None,
+                       help='Directory of the cleaned-text feature cache (reused across runs)')
+    parser.add_argument('--dedupe', action='store_true',
+                       help='Drop near-duplicate articles before splitting')
+    parser.add_argument('--dedupe-threshold', type=float, default=0.8,
+                       help='Estimated Jaccard similarity above which articles are near-duplicates')
+    parser.add_argument('--n-jobs', type=int, default=1,
+                       help='Processes for statistical feature extraction (-1 for all cores)')
+    parser.add_argument('--profile', action='store_true',
+                       help='Record per-stage time and memory to <output_dir>/profile.json')
+    parser.add_argument('--profile-sampling', action='store_true',
+                       help='Also sample stacks (implies --profile, writes profile.folded)')
+    parser.add_argument('--storage', choices=['npz', 'store', 'both'], default='npz',
+                       help='Write the compressed .npz files, the memory-mappable split store, or both')
     
-    preprocess_data(input_file, output_dir)
+    args = parser.parse_args()
+    
+    preprocess_data(
+        args.input_file,
+        args.output_dir,
+        max_features=args.max_features,
+        ngram_range=args.ngram_range,
+        random_state=args.random_state,
+        feature_cache_dir=args.feature_cache,
+        dedupe=args.dedupe,
+        dedupe_threshold=args.dedupe_threshold,
+        n_jobs=args.n_jobs,
+        profile=args.profile,
+        profile_sampling=args.profile_sampling,
+        storage=args.storage
+    )
 
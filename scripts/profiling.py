@@ -0,0 +1,215 @@
+"""
+Pipeline Profiling
+Per-stage wall time, CPU time and peak memory for the preprocessing and training
+entry points, with an optional sampling profiler, written as a JSON report
+"""
+
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+SAMPLING_INTERVAL = 0.005
+TOP_FUNCTIONS = 25
+
+def _rss_bytes(field):
+    """VmRSS / VmHWM from /proc (Linux), None elsewhere"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def _reset_peak_rss():
+    """Reset VmHWM so the next reading is the peak of this stage only (Linux 4.0+)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def _max_rss_bytes():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+def _children_cpu():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+class _Sampler:
+    """Samples the profiled thread's stack on a background thread"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stage = None
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(self.stage or 'untracked')
+            self.stacks[';'.join(reversed(stack))] += 1
+
+class Profiler:
+    """Collects per-stage resource usage; stage() is a no-op when disabled"""
+
+    def __init__(self, enabled=True, sampling=False, interval=SAMPLING_INTERVAL):
+        self.enabled = enabled
+        self.stages = []
+        self.started = time.time()
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self._sampler = None
+        if enabled and sampling:
+            self._sampler = _Sampler(threading.get_ident(), interval)
+            self._sampler.start()
+
+    @contextmanager
+    def stage(self, name):
+        """Record wall time, CPU time (this process and child processes) and peak RSS of a block"""
+        if not self.enabled:
+            yield
+            return
+
+        if self._sampler is not None:
+            previous_stage, self._sampler.stage = self._sampler.stage, name
+        peak_reset = _reset_peak_rss()
+        rss_before = _rss_bytes('VmRSS')
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        children_cpu = _children_cpu()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            children_cpu = _children_cpu() - children_cpu
+            self.stages.append({
+                'stage': name,
+                'wall_seconds': wall,
+                'cpu_seconds': cpu,
+                'child_cpu_seconds': children_cpu,
+                # CPU/wall above 1 means the stage used several cores
+                'cpu_utilization': (cpu + children_cpu) / wall if wall > 0 else None,
+                'rss_before_bytes': rss_before,
+                'rss_after_bytes': _rss_bytes('VmRSS'),
+                # Stage peak when VmHWM could be reset, otherwise the process peak so far
+                'peak_rss_bytes': (_rss_bytes('VmHWM') if peak_reset else None) or _max_rss_bytes(),
+                'peak_is_stage_local': peak_reset
+            })
+            if self._sampler is not None:
+                self._sampler.stage = previous_stage
+
+    def report(self):
+        """Structured report of all recorded stages"""
+        total_wall = time.perf_counter() - self._start_wall
+        report = {
+            'started': self.started,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'argv': sys.argv,
+            'total_wall_seconds': total_wall,
+            'total_cpu_seconds': time.process_time() - self._start_cpu,
+            'max_rss_bytes': _max_rss_bytes(),
+            'stages': self.stages
+        }
+        for stage in self.stages:
+            stage['wall_fraction'] = stage['wall_seconds'] / total_wall if total_wall > 0 else None
+
+        if self._sampler is not None:
+            functions = Counter()
+            for stack, count in self._sampler.stacks.items():
+                functions[stack.rsplit(';', 1)[-1]] += count
+            report['sampling'] = {
+                'interval_seconds': self._sampler.interval,
+                'samples': sum(self._sampler.stacks.values()),
+                'top_functions': [{'function': name, 'samples': count}
+                                  for name, count in functions.most_common(TOP_FUNCTIONS)]
+            }
+        return report
+
+    def write(self, path):
+        """Write the JSON report, plus collapsed stacks (flamegraph.pl / speedscope) when sampling"""
+        if not self.enabled:
+            return None
+        if self._sampler is not None:
+            self._sampler.stop()
+            with open(os.path.splitext(path)[0] + '.folded', 'w') as f:
+                for stack, count in self._sampler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        print(f"Profile saved to {path}")
+        return path
+
+def compare_reports(before, after):
+    """Per-stage wall time, CPU time and peak memory of two reports side by side"""
+    rows = []
+    before_stages = {s['stage']: s for s in before['stages']}
+    for stage in after['stages']:
+        previous = before_stages.get(stage['stage'], {})
+        rows.append({
+            'stage': stage['stage'],
+            'wall_before': previous.get('wall_seconds'),
+            'wall_after': stage['wall_seconds'],
+            'cpu_before': previous.get('cpu_seconds'),
+            'cpu_after': stage['cpu_seconds'],
+            'peak_rss_mb_before': previous['peak_rss_bytes'] / 2**20 if previous.get('peak_rss_bytes') else None,
+            'peak_rss_mb_after': stage['peak_rss_bytes'] / 2**20 if stage.get('peak_rss_bytes') else None
+        })
+    return rows
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('before', type=str,
+                       help='Profile report of the baseline run')
+    parser.add_argument('after', type=str,
+                       help='Profile report to compare against it')
+
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else '-'
+
+    print(f"{'stage':<24}{'wall before':>12}{'wall after':>12}{'cpu before':>12}{'cpu after':>12}"
+          f"{'peak MB before':>16}{'peak MB after':>15}")
+    for row in compare_reports(before, after):
+        print(f"{row['stage']:<24}{fmt(row['wall_before'], '.2f'):>12}{fmt(row['wall_after'], '.2f'):>12}"
+              f"{fmt(row['cpu_before'], '.2f'):>12}{fmt(row['cpu_after'], '.2f'):>12}"
+              f"{fmt(row['peak_rss_mb_before'], '.0f'):>16}{fmt(row['peak_rss_mb_after'], '.0f'):>15}")
@@ -3,20 +3,26 @@ Script to train model using SageMaker
 This script uploads data to S3 and creates a SageMaker training job
 """
 
-import boto3
 import sagemaker
 from sagemaker.xgboost.estimator import XGBoost
 from sagemaker import get_execution_role
 import os
+import sys
 import json
 from datetime import datetime
 
+# Allow `scripts.*` imports when run directly as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from scripts.aws_clients import get_session, get_client
+
 def train_on_sagemaker(
     s3_bucket='newsverify-models',
     training_data_path='processed_data',
     role=None,
     instance_type='ml.m5.xlarge',
-    instance_count=1
+    instance_count=1,
+    profile=0
 ):
     """
     Train XGBoost model on SageMaker
@@ -27,10 +33,15 @@ def train_on_sagemaker(
         role: IAM role for SageMaker (if None, will try to get default)
         instance_type: EC2 instance type for training
         instance_count: Number of instances
+        profile: 1 to write per-stage timings to the job output, 2 to also sample stacks
     """
     
-    # Initialize SageMaker session
-    sess = sagemaker.Session()
+    # Initialize SageMaker session on the shared, retry/timeout-configured clients
+    sess = sagemaker.Session(
+        boto_session=get_session(),
+        sagemaker_client=get_client('sagemaker'),
+        sagemaker_runtime_client=get_client('sagemaker-runtime')
+    )
     
     # Get IAM role
     if role is None:
@@ -68,12 +79,13 @@ def train_on_sagemaker(
             'colsample-bytree': 0.8,
             'num-round': 100,
             'objective': 'binary:logistic',
-            'eval-metric': 'logloss'
+            'eval-metric': 'logloss',
+            'profile': profile
         }
     )
     
     # Define input data channels
-    # Note: content_type doesn't matter here because train_sagemaker.py loads .npz files directly
+    # Note: content_type doesn't matter here because train_sagemaker.py loads .npz files (or splits.nva) directly
     train_input = sagemaker.inputs.TrainingInput(
         s3_data=f'{s3_data_path}',
         content_type='application/x-npz'  # Changed to match actual data format
@@ -101,6 +113,8 @@ if __name__ == '__main__':
                        help='EC2 instance type for training')
     parser.add_argument('--role', type=str, default=None,
                        help='SageMaker execution role ARN')
+    parser.add_argument('--profile', type=int, default=0, choices=[0, 1, 2],
+                       help='1: per-stage timings in the job output, 2: also sample stacks')
     
     args = parser.parse_args()
     
@@ -108,6 +122,7 @@ if __name__ == '__main__':
         s3_bucket=args.bucket,
         training_data_path=args.data_path,
         instance_type=args.instance_type,
-        role=args.role
+        role=args.role,
+        profile=args.profile
     )
 
@@ -0,0 +1,324 @@
+"""
+Shared-memory Serving Bundle
+Exports the TF-IDF vocabulary (sorted terms + IDF), feature names and flattened
+XGBoost trees into a single memory-mapped file that every worker on a host maps
+read-only, instead of each worker unpickling its own copy of the model
+"""
+
+import os
+import re
+import sys
+import json
+import numpy as np
+from scipy.sparse import csr_matrix
+
+# Allow `scripts.*` imports when run directly as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from scripts.array_store import write_arrays, map_arrays
+
+BUNDLE_FORMAT = 'newsverify-shared-bundle'
+BUNDLE_VERSION = 1
+DEFAULT_BUNDLE_NAME = 'bundle.nvb'
+
+# Working memory per predict_proba chunk (dense feature values and per-tree node state)
+PREDICT_CHUNK_BYTES = 16 * 1024 * 1024
+
+def _flatten_trees(booster):
+    """Flatten every tree of a binary:logistic gbtree booster into shared node arrays"""
+    model = json.loads(booster.save_raw(raw_format='json'))
+    learner = model['learner']
+
+    objective = learner['objective']['name']
+    booster_name = learner['gradient_booster']['name']
+    if objective != 'binary:logistic' or booster_name != 'gbtree':
+        raise ValueError(f"Unsupported model for shared bundle: {booster_name}/{objective}")
+
+    trees = learner['gradient_booster']['model']['trees']
+    left, right, split_index, split_condition, default_left, roots = [], [], [], [], [], []
+    max_depth = 0
+    offset = 0
+    for tree in trees:
+        tree_left = np.asarray(tree['left_children'], dtype=np.int32)
+        tree_right = np.asarray(tree['right_children'], dtype=np.int32)
+        roots.append(offset)
+        left.append(np.where(tree_left == -1, -1, tree_left + offset))
+        right.append(np.where(tree_right == -1, -1, tree_right + offset))
+        split_index.append(np.asarray(tree['split_indices'], dtype=np.int32))
+        split_condition.append(np.asarray(tree['split_conditions'], dtype=np.float32))
+        default_left.append(np.asarray(tree['default_left'], dtype=bool))
+
+        # Depth bounds the number of vectorised traversal steps at predict time
+        depths = np.zeros(len(tree_left), dtype=np.int32)
+        for node in range(len(tree_left)):
+            if tree_left[node] != -1:
+                depths[tree_left[node]] = depths[node] + 1
+                depths[tree_right[node]] = depths[node] + 1
+        max_depth = max(max_depth, int(depths.max()))
+        offset += len(tree_left)
+
+    base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+    arrays = {
+        'tree_roots': np.asarray(roots, dtype=np.int32),
+        'left_children': np.concatenate(left).astype(np.int32),
+        'right_children': np.concatenate(right).astype(np.int32),
+        'split_indices': np.concatenate(split_index),
+        'split_conditions': np.concatenate(split_condition),
+        'default_left': np.concatenate(default_left)
+    }
+    meta = {
+        'base_margin': float(np.log(base_score / (1.0 - base_score))),
+        'max_depth': max_depth,
+        'num_features': int(learner['learner_model_param']['num_feature'])
+    }
+    return arrays, meta
+
+def _vocabulary_arrays(tfidf_vectorizer):
+    """Sorted, UTF-8 encoded term array with the matching column index and IDF weights"""
+    vocabulary = tfidf_vectorizer.vocabulary_
+    terms = np.array([term.encode('utf-8') for term in vocabulary.keys()])
+    columns = np.fromiter(vocabulary.values(), dtype=np.int32, count=len(vocabulary))
+    order = np.argsort(terms, kind='stable')
+
+    return {
+        'terms': terms[order],
+        'term_columns': columns[order],
+        'idf': np.asarray(tfidf_vectorizer.idf_, dtype=np.float64)
+    }
+
+def export_shared_bundle(bundle, output_path):
+    """Write a loaded pickle bundle (see model_bundle.load_bundle) as a shared bundle file"""
+    vectorizer = bundle['tfidf_vectorizer']
+    unsupported = []
+    if vectorizer.analyzer != 'word' or vectorizer.tokenizer is not None or vectorizer.preprocessor is not None:
+        unsupported.append('custom analyzer')
+    if vectorizer.stop_words is not None or vectorizer.strip_accents is not None:
+        unsupported.append('stop words / accent stripping')
+    if vectorizer.binary or vectorizer.sublinear_tf or not vectorizer.use_idf or vectorizer.norm != 'l2':
+        unsupported.append('non-default TF-IDF weighting')
+    if unsupported:
+        raise ValueError(f"Vectorizer options not supported by the shared bundle: {', '.join(unsupported)}")
+
+    arrays = _vocabulary_arrays(vectorizer)
+    tree_arrays, tree_meta = _flatten_trees(bundle['model'].get_booster())
+    arrays.update(tree_arrays)
+
+    meta = {
+        'format': BUNDLE_FORMAT,
+        'version': BUNDLE_VERSION,
+        'lowercase': bool(vectorizer.lowercase),
+        'token_pattern': vectorizer.token_pattern,
+        'ngram_range': list(vectorizer.ngram_range),
+        'stat_feature_names': list(bundle['stat_feature_names']),
+        'classes': [str(c) for c in bundle['label_encoder'].classes_],
+        **tree_meta
+    }
+
+    n_columns = len(arrays['idf']) + len(meta['stat_feature_names'])
+    if n_columns != meta['num_features']:
+        raise ValueError(f"Bundle mismatch: preprocessors produce {n_columns} features, model expects {meta['num_features']}")
+
+    return write_arrays(output_path, arrays, meta)
+
+class MappedVectorizer:
+    """TF-IDF transform backed by the mapped sorted term and IDF arrays"""
+
+    def __init__(self, arrays, meta):
+        self.terms = arrays['terms']
+        self.term_columns = arrays['term_columns']
+        self.idf = arrays['idf']
+        self.lowercase = meta['lowercase']
+        self.token_pattern = re.compile(meta['token_pattern'])
+        self.ngram_range = tuple(meta['ngram_range'])
+        self.max_term_bytes = self.terms.dtype.itemsize
+
+    def _analyze(self, document):
+        # Mirrors sklearn's word analyzer: lowercase, token_pattern, word n-grams
+        if self.lowercase:
+            document = document.lower()
+        tokens = self.token_pattern.findall(document)
+        min_n, max_n = self.ngram_range
+        ngrams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+            ngrams.extend(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return ngrams
+
+    def _lookup(self, ngrams):
+        # Terms longer than the stored width cannot be in the vocabulary
+        encoded = [g.encode('utf-8') for g in ngrams]
+        encoded = [g for g in encoded if len(g) <= self.max_term_bytes]
+        if not encoded:
+            return np.empty(0, dtype=np.int32)
+        query = np.array(encoded, dtype=self.terms.dtype)
+        positions = np.searchsorted(self.terms, query)
+        positions[positions == len(self.terms)] = 0
+        found = self.terms[positions] == query
+        return self.term_columns[positions[found]]
+
+    def transform(self, raw_documents):
+        """Return an L2-normalised TF-IDF CSR matrix, one row per document"""
+        indptr = [0]
+        indices = []
+        data = []
+        for document in raw_documents:
+            columns, counts = np.unique(self._lookup(self._analyze(document)), return_counts=True)
+            weights = counts * self.idf[columns]
+            norm = np.sqrt(np.dot(weights, weights))
+            if norm > 0:
+                weights = weights / norm
+            indices.append(columns)
+            data.append(weights)
+            indptr.append(indptr[-1] + len(columns))
+
+        return csr_matrix(
+            (np.concatenate(data) if data else np.empty(0), np.concatenate(indices) if indices else np.empty(0, dtype=np.int32), indptr),
+            shape=(len(indptr) - 1, len(self.idf))
+        )
+
+class MappedBooster:
+    """Binary XGBoost predictor over the mapped flat tree arrays"""
+
+    def __init__(self, arrays, meta):
+        self.tree_roots = arrays['tree_roots']
+        self.left_children = arrays['left_children']
+        self.right_children = arrays['right_children']
+        self.split_indices = arrays['split_indices']
+        self.split_conditions = arrays['split_conditions']
+        self.default_left = arrays['default_left']
+        self.base_margin = np.float32(meta['base_margin'])
+        self.max_depth = meta['max_depth']
+        self.n_features_in_ = meta['num_features']
+
+    def _margin(self, X):
+        # Walk every row through every tree at once, one depth level per step; absent entries are missing
+        values = np.full((X.shape[0], self.n_features_in_), np.nan, dtype=np.float32)
+        values[np.repeat(np.arange(X.shape[0]), np.diff(X.indptr)), X.indices] = X.data
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.tree_roots, (X.shape[0], len(self.tree_roots)))
+        for _ in range(self.max_depth):
+            left = self.left_children[node]
+            is_leaf = left == -1
+            if is_leaf.all():
+                break
+            feature_values = values[rows, self.split_indices[node]]
+            go_left = np.where(np.isnan(feature_values), self.default_left[node],
+                               feature_values < self.split_conditions[node])
+            node = np.where(is_leaf, node, np.where(go_left, left, self.right_children[node]))
+        return self.split_conditions[node].sum(axis=1, dtype=np.float32) + self.base_margin
+
+    def predict_proba(self, X):
+        X = csr_matrix(X)
+        # Rows are densified in chunks of about PREDICT_CHUNK_BYTES to bound memory
+        chunk_rows = max(1, PREDICT_CHUNK_BYTES // (4 * max(self.n_features_in_, len(self.tree_roots) * 3)))
+        margins = np.concatenate([
+            self._margin(X[start:start + chunk_rows]) for start in range(0, X.shape[0], chunk_rows)
+        ] or [np.empty(0, dtype=np.float32)]).astype(np.float64)
+        positive = 1.0 / (1.0 + np.exp(-margins))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        return self.predict_proba(X).argmax(axis=1)
+
+class MappedLabelEncoder:
+    """inverse_transform over the class names stored in the bundle header"""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+
+    def inverse_transform(self, y):
+        return self.classes_[np.asarray(y, dtype=np.intp)]
+
+def load_shared_bundle(path):
+    """Map a shared bundle file and return components in the model_bundle.load_bundle layout"""
+    arrays, meta = map_arrays(path)
+    if meta.get('format') != BUNDLE_FORMAT or meta.get('version') != BUNDLE_VERSION:
+        raise ValueError(f"{path} is not a version {BUNDLE_VERSION} shared bundle")
+
+    return {
+        'model': MappedBooster(arrays, meta),
+        'tfidf_vectorizer': MappedVectorizer(arrays, meta),
+        'label_encoder': MappedLabelEncoder(meta['classes']),
+        'stat_feature_names': meta['stat_feature_names']
+    }
+
+def verify_shared_bundle(bundle, shared, X, atol=1e-5):
+    """Compare shared-bundle probabilities against the pickled model on sample rows"""
+    expected = bundle['model'].predict_proba(X)[:, 1]
+    actual = shared['model'].predict_proba(X)[:, 1]
+    max_diff = float(np.abs(expected - actual).max()) if len(expected) else 0.0
+    print(f"Max probability difference on {X.shape[0]} rows: {max_diff:.2e}")
+    return max_diff <= atol
+
+def _memory_usage():
+    """Resident and proportional set size of this process in MB (Linux)"""
+    usage = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('Rss', 'Pss', 'Shared_Clean', 'Private_Clean', 'Private_Dirty'):
+                usage[key.lower()] = int(value.split()[0]) / 1024
+    return usage
+
+def _measure_worker(load, X, queue):
+    # Score a few rows so lazily touched pages are counted
+    bundle = load()
+    bundle['model'].predict_proba(X)
+    queue.put(_memory_usage())
+
+def measure_worker_memory(model_dir, bundle_path, X, workers=4):
+    """Fork workers that each load the bundle and report per-worker RSS/PSS for both formats"""
+    import multiprocessing
+    from functools import partial
+    from scripts.model_bundle import load_bundle
+
+    context = multiprocessing.get_context('fork')
+    results = {}
+    for name, load in [('pickle', partial(load_bundle, model_dir)), ('shared', partial(load_shared_bundle, bundle_path))]:
+        queue = context.Queue()
+        processes = [context.Process(target=_measure_worker, args=(load, X, queue)) for _ in range(workers)]
+        for process in processes:
+            process.start()
+        usages = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+        results[name] = {key: float(np.mean([u[key] for u in usages])) for key in usages[0]}
+        print(f"{name:>7}: " + ', '.join(f"{key} {value:.1f} MB" for key, value in results[name].items()))
+
+    return results
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model-dir', type=str, default='models',
+                       help='Directory containing the pickled model bundle')
+    parser.add_argument('--output', type=str, default=None,
+                       help=f'Shared bundle path (defaults to <model-dir>/{DEFAULT_BUNDLE_NAME})')
+    parser.add_argument('--verify-data', type=str, default=None,
+                       help='Processed data directory; compare predictions on X_test before finishing')
+    parser.add_argument('--verify-rows', type=int, default=500,
+                       help='Number of test rows used for verification and memory measurement')
+    parser.add_argument('--measure-workers', type=int, default=0,
+                       help='Fork this many workers per format and report RSS/PSS per worker')
+
+    args = parser.parse_args()
+    output_path = args.output or os.path.join(args.model_dir, DEFAULT_BUNDLE_NAME)
+
+    from scripts.model_bundle import load_bundle
+
+    bundle = load_bundle(args.model_dir)
+    export_shared_bundle(bundle, output_path)
+    print(f"Shared bundle saved to {output_path} ({os.path.getsize(output_path) / 1024 / 1024:.1f} MB)")
+
+    if args.verify_data or args.measure_workers:
+        from scipy.sparse import load_npz
+        X_sample = load_npz(os.path.join(args.verify_data or 'processed_data', 'X_test.npz')).tocsr()[:args.verify_rows]
+
+        if args.verify_data and not verify_shared_bundle(bundle, load_shared_bundle(output_path), X_sample):
+            print("❌ Shared bundle predictions differ from the pickled model")
+            sys.exit(1)
+
+        if args.measure_workers:
+            print(f"\nPer-worker memory with {args.measure_workers} workers:")
+            measure_worker_memory(args.model_dir, output_path, X_sample, workers=args.measure_workers)
@@ -0,0 +1,147 @@
+"""
+Train/Validation/Test Split Store
+Keeps the CSR feature matrix, labels and split indices in one uncompressed array store
+file with each split's rows stored contiguously, so splits are memory-mapped views
+"""
+
+import os
+import sys
+import time
+import numpy as np
+from scipy.sparse import csr_matrix
+
+try:
+    from scripts.array_store import write_arrays, map_arrays
+except ImportError:
+    # SageMaker copies the source directory flat into the container
+    from array_store import write_arrays, map_arrays
+
+SPLIT_STORE_FILE = 'splits.nva'
+SPLIT_STORE_FORMAT = 'newsverify-splits'
+SPLIT_STORE_VERSION = 1
+SPLIT_ROWS_FILE = 'split_rows.npz'
+SPLIT_NAMES = ('train', 'val', 'test')
+NPZ_FILES = [f'X_{name}.npz' for name in SPLIT_NAMES] + [f'y_{name}.npy' for name in SPLIT_NAMES]
+
+def write_splits(path, X, y, splits, row_index=None):
+    """Write CSR X and labels y with rows grouped by split (name -> row positions in X)"""
+    order = np.concatenate([splits[name] for name in SPLIT_NAMES])
+    X = X.tocsr()[order]
+    X.sort_indices()
+
+    bounds = {}
+    start = 0
+    for name in SPLIT_NAMES:
+        bounds[name] = [start, start + len(splits[name])]
+        start += len(splits[name])
+
+    # indptr and indices share one dtype so mapped splits are never upcast (copied) by scipy
+    index_dtype = np.int32 if X.nnz < np.iinfo(np.int32).max else np.int64
+    row_index = np.arange(X.shape[0]) if row_index is None else np.asarray(row_index)
+    meta = {
+        'format': SPLIT_STORE_FORMAT,
+        'version': SPLIT_STORE_VERSION,
+        'n_features': int(X.shape[1]),
+        'splits': bounds
+    }
+    return write_arrays(path, {
+        'indptr': X.indptr.astype(index_dtype),
+        'indices': X.indices.astype(index_dtype),
+        'data': X.data,
+        'labels': np.asarray(y)[order],
+        'row_index': row_index[order]
+    }, meta)
+
+def write_split_matrices(path, matrices, row_index=None):
+    """Write already split data (name -> (X, y)); rows without a source row get index -1"""
+    from scipy.sparse import vstack
+
+    sizes = [matrices[name][0].shape[0] for name in SPLIT_NAMES]
+    bounds = np.cumsum([0] + sizes)
+    splits = {name: np.arange(bounds[i], bounds[i + 1]) for i, name in enumerate(SPLIT_NAMES)}
+    X = vstack([matrices[name][0] for name in SPLIT_NAMES]).tocsr()
+    y = np.concatenate([matrices[name][1] for name in SPLIT_NAMES])
+
+    index = []
+    for name, size in zip(SPLIT_NAMES, sizes):
+        known = np.asarray((row_index or {}).get(name, []), dtype=np.int64)[:size]
+        index.append(np.concatenate([known, np.full(size - len(known), -1, dtype=np.int64)]))
+    return write_splits(path, X, y, splits, row_index=np.concatenate(index))
+
+def load_splits(path):
+    """Map the store and return ({name: (X, y)}, {name: source row index}) without reading the data"""
+    arrays, meta = map_arrays(path)
+    if meta.get('format') != SPLIT_STORE_FORMAT or meta.get('version') != SPLIT_STORE_VERSION:
+        raise ValueError(f"{path} is not a version {SPLIT_STORE_VERSION} split store")
+
+    indptr = arrays['indptr']
+    splits = {}
+    row_index = {}
+    for name, (start, end) in meta['splits'].items():
+        low, high = indptr[start], indptr[end]
+        X = csr_matrix(
+            (arrays['data'][low:high], arrays['indices'][low:high], indptr[start:end + 1] - low),
+            shape=(end - start, meta['n_features']),
+            copy=False
+        )
+        X.has_sorted_indices = True
+        splits[name] = (X, arrays['labels'][start:end])
+        row_index[name] = arrays['row_index'][start:end]
+    return splits, row_index
+
+def load_row_index(data_dir):
+    """Source row position of every stored split row, from the store or split_rows.npz
+
+    Rows appended by incremental training have no source row: they are -1 in the store
+    and missing from the end of split_rows.npz.
+    """
+    store_path = os.path.join(data_dir, SPLIT_STORE_FILE)
+    if os.path.exists(store_path):
+        return load_splits(store_path)[1]
+    with np.load(os.path.join(data_dir, SPLIT_ROWS_FILE)) as rows:
+        return {name: rows[name] for name in SPLIT_NAMES}
+
+def compare_layouts(data_dir):
+    """Disk size and load time of the .npz files versus the split store in data_dir"""
+    from scipy.sparse import load_npz
+
+    report = {}
+    npz_paths = [os.path.join(data_dir, name) for name in NPZ_FILES]
+    if all(os.path.exists(p) for p in npz_paths):
+        start = time.perf_counter()
+        for name in SPLIT_NAMES:
+            load_npz(os.path.join(data_dir, f'X_{name}.npz'))
+            np.load(os.path.join(data_dir, f'y_{name}.npy'))
+        report['npz'] = {'bytes': sum(os.path.getsize(p) for p in npz_paths), 'load_seconds': time.perf_counter() - start}
+
+    store_path = os.path.join(data_dir, SPLIT_STORE_FILE)
+    if os.path.exists(store_path):
+        start = time.perf_counter()
+        splits, _ = load_splits(store_path)
+        mapped = time.perf_counter() - start
+        # Touch every page, as training does, so the cost of faulting the data in is included
+        for X, y in splits.values():
+            X.data.sum(), X.indices.sum(), y.sum()
+        report['store'] = {
+            'bytes': os.path.getsize(store_path),
+            'map_seconds': mapped,
+            'load_seconds': time.perf_counter() - start
+        }
+    return report
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('data_dir', nargs='?', default='processed_data',
+                       help='Directory written by preprocess_data.py --storage both')
+
+    args = parser.parse_args()
+
+    report = compare_layouts(args.data_dir)
+    if not report:
+        sys.exit(f"No processed data found in {args.data_dir}")
+    for layout, values in report.items():
+        mapped = f", mapped in {values['map_seconds'] * 1000:.1f} ms" if 'map_seconds' in values else ''
+        print(f"{layout:>6}: {values['bytes'] / 2**20:8.1f} MB on disk, "
+              f"loaded in {values['load_seconds'] * 1000:.1f} ms{mapped}")
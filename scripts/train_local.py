@@ -9,11 +9,24 @@ import joblib
 import numpy as np
 import xgboost as xgb
 from scipy.sparse import load_npz
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, classification_report, confusion_matrix
 import json
 
+# Allow `scripts.*` imports when run directly as a script
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from scripts.evaluate import evaluate_model, measure_latency
+from scripts.profiling import Profiler
+from scripts.split_store import load_splits, SPLIT_NAMES, SPLIT_STORE_FILE
+from scripts.cascade import train_first_stage, FIRST_STAGE_FILE, DEFAULT_MAX_ACCURACY_COST
+
 def load_data(base_dir):
-    """Load preprocessed data"""
+    """Load preprocessed data, memory-mapping the split store when present"""
+    store_path = os.path.join(base_dir, SPLIT_STORE_FILE)
+    if os.path.exists(store_path):
+        splits, _ = load_splits(store_path)
+        (X_train, y_train), (X_val, y_val), (X_test, y_test) = (splits[name] for name in SPLIT_NAMES)
+        return X_train, X_val, X_test, y_train, y_val, y_test
+    
     X_train = load_npz(os.path.join(base_dir, 'X_train.npz'))
     X_val = load_npz(os.path.join(base_dir, 'X_val.npz'))
     X_test = load_npz(os.path.join(base_dir, 'X_test.npz'))
@@ -24,28 +37,6 @@ def load_data(base_dir):
     
     return X_train, X_val, X_test, y_train, y_val, y_test
 
-def evaluate_model(model, X, y, set_name):
-    """Evaluate model and return metrics"""
-    y_pred = model.predict(X)
-    
-    accuracy = accuracy_score(y, y_pred)
-    precision = precision_score(y, y_pred, average='weighted', zero_division=0)
-    recall = recall_score(y, y_pred, average='weighted', zero_division=0)
-    f1 = f1_score(y, y_pred, average='weighted', zero_division=0)
-    
-    print(f"\n{set_name} Set Metrics:")
-    print(f"Accuracy: {accuracy:.4f}")
-    print(f"Precision: {precision:.4f}")
-    print(f"Recall: {recall:.4f}")
-    print(f"F1-Score: {f1:.4f}")
-    
-    return {
-        'accuracy': float(accuracy),
-        'precision': float(precision),
-        'recall': float(recall),
-        'f1_score': float(f1)
-    }
-
 if __name__ == '__main__':
     import argparse
     
@@ -60,12 +51,22 @@ if __name__ == '__main__':
                        help='Learning rate')
     parser.add_argument('--n-estimators', type=int, default=100,
                        help='Number of estimators')
+    parser.add_argument('--profile', action='store_true',
+                       help='Record per-stage time and memory to <model_dir>/profile.json')
+    parser.add_argument('--profile-sampling', action='store_true',
+                       help='Also sample stacks (implies --profile, writes profile.folded)')
+    parser.add_argument('--cascade-data', type=str, default=None,
+                       help='Raw CSV the data dir was built from; trains the cascade first stage')
+    parser.add_argument('--cascade-max-accuracy-cost', type=float, default=DEFAULT_MAX_ACCURACY_COST,
+                       help='Accuracy the calibrated first-stage band may give up against the full model')
     
     args = parser.parse_args()
+    profiler = Profiler(enabled=args.profile or args.profile_sampling, sampling=args.profile_sampling)
     
     # Load data
     print("Loading data...")
-    X_train, X_val, X_test, y_train, y_val, y_test = load_data(args.data_dir)
+    with profiler.stage('load_data'):
+        X_train, X_val, X_test, y_train, y_val, y_test = load_data(args.data_dir)
     
     print(f"Training set shape: {X_train.shape}")
     print(f"Validation set shape: {X_val.shape}")
@@ -86,24 +87,27 @@ if __name__ == '__main__':
         n_jobs=-1
     )
     
-    model.fit(
-        X_train, y_train,
-        eval_set=[(X_train, y_train), (X_val, y_val)],
-        verbose=True
-    )
+    with profiler.stage('boosting'):
+        model.fit(
+            X_train, y_train,
+            eval_set=[(X_train, y_train), (X_val, y_val)],
+            verbose=True
+        )
     
     # Evaluate
     print("\nEvaluating model...")
-    train_metrics = evaluate_model(model, X_train, y_train, "Train")
-    val_metrics = evaluate_model(model, X_val, y_val, "Validation")
-    test_metrics = evaluate_model(model, X_test, y_test, "Test")
+    with profiler.stage('evaluate'):
+        train_metrics = evaluate_model(model, X_train, y_train, "Train")
+        val_metrics = evaluate_model(model, X_val, y_val, "Validation")
+        test_metrics = evaluate_model(model, X_test, y_test, "Test")
     
     # Create model directory
     os.makedirs(args.model_dir, exist_ok=True)
     
     # Save model
     model_path = os.path.join(args.model_dir, 'model.pkl')
-    joblib.dump(model, model_path)
+    with profiler.stage('save_model'):
+        joblib.dump(model, model_path)
     print(f"\nModel saved to {model_path}")
     
     # Copy preprocessors to model directory
@@ -111,6 +115,8 @@ if __name__ == '__main__':
     vectorizer_path = os.path.join(args.data_dir, 'tfidf_vectorizer.pkl')
     encoder_path = os.path.join(args.data_dir, 'label_encoder.pkl')
     features_path = os.path.join(args.data_dir, 'stat_feature_names.pkl')
+    resources_path = os.path.join(args.data_dir, 'nlp_resources.nva')
+    baseline_path = os.path.join(args.data_dir, 'drift_baseline.json')
     
     if os.path.exists(vectorizer_path):
         shutil.copy(vectorizer_path, os.path.join(args.model_dir, 'tfidf_vectorizer.pkl'))
@@ -118,18 +124,49 @@ if __name__ == '__main__':
         shutil.copy(encoder_path, os.path.join(args.model_dir, 'label_encoder.pkl'))
     if os.path.exists(features_path):
         shutil.copy(features_path, os.path.join(args.model_dir, 'stat_feature_names.pkl'))
+    if os.path.exists(resources_path):
+        shutil.copy(resources_path, os.path.join(args.model_dir, 'nlp_resources.nva'))
+    if os.path.exists(baseline_path):
+        shutil.copy(baseline_path, os.path.join(args.model_dir, 'drift_baseline.json'))
+    
+    # Cheap first stage for cascade serving, with its band calibrated against this model
+    cascade_metrics = None
+    if args.cascade_data:
+        print("\nTraining cascade first stage...")
+        with profiler.stage('first_stage'):
+            first_stage = train_first_stage(
+                args.cascade_data, args.data_dir, model,
+                {'train': (X_train, y_train), 'val': (X_val, y_val), 'test': (X_test, y_test)},
+                joblib.load(features_path),
+                max_accuracy_cost=args.cascade_max_accuracy_cost
+            )
+        joblib.dump(first_stage, os.path.join(args.model_dir, FIRST_STAGE_FILE))
+        cascade_metrics = first_stage['metrics']
+        test_report = cascade_metrics['test']
+        print(f"First-stage band {first_stage['band'][0]:.3f}-{first_stage['band'][1]:.3f}: "
+              f"{test_report['short_circuit_fraction']:.1%} of test rows short-circuited, "
+              f"accuracy {test_report['full_model_accuracy']:.4f} -> {test_report['cascade_accuracy']:.4f}")
+    
+    # Measure inference latency so slower bundles show up next to accuracy
+    with profiler.stage('measure_latency'):
+        latency = measure_latency(model, X_test)
+    latency['model_size_bytes'] = os.path.getsize(model_path)
     
     # Save metrics
     metrics = {
         'train': train_metrics,
         'validation': val_metrics,
-        'test': test_metrics
+        'test': test_metrics,
+        'latency': latency
     }
+    if cascade_metrics is not None:
+        metrics['cascade'] = cascade_metrics
     
     metrics_path = os.path.join(args.model_dir, 'metrics.json')
     with open(metrics_path, 'w') as f:
         json.dump(metrics, f, indent=2)
     
     print(f"Metrics saved to {metrics_path}")
+    profiler.write(os.path.join(args.model_dir, 'profile.json'))
     print("\n✅ Training complete! Model ready for deployment.")
 
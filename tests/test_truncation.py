@@ -0,0 +1,87 @@
+"""
+Input truncation: training (preprocess_data) and serving (routes, then transform_features)
+must produce the same text for inputs just over the token limits
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import scripts.preprocess_data as preprocess_data
+from scripts.preprocess_data import truncate_frame, truncate_text, MAX_CHARS_PER_TOKEN
+
+URL = 'https://example.com/' + 'a' * 120
+
+def reference(text, max_tokens, policy):
+    """Truncation by splitting the whole text"""
+    tokens = text.split()
+    if len(tokens) <= max_tokens:
+        return text
+    if policy == 'head':
+        return ' '.join(tokens[:max_tokens])
+    head = (max_tokens + 1) // 2
+    return ' '.join(tokens[:head] + tokens[len(tokens) - (max_tokens - head):])
+
+def texts_around(max_tokens):
+    words = [f'word{i}' for i in range(max_tokens + 3)]
+    for extra in (-1, 0, 1, 2):
+        count = max_tokens + extra
+        yield ' '.join(words[:count])
+        # Long tokens and URLs inside the limit, and odd whitespace
+        yield ' '.join([URL] + words[:count - 1])
+        yield '\n'.join(words[:count - 1] + [URL]) + '  \t'
+
+@pytest.mark.parametrize('policy', ['head', 'head_tail'])
+@pytest.mark.parametrize('max_tokens', [4, 5, 64])
+def test_matches_whole_text_split(policy, max_tokens):
+    for text in texts_around(max_tokens):
+        truncated, was_truncated = truncate_text(text, max_tokens, policy)
+        assert truncated == reference(text, max_tokens, policy)
+        assert was_truncated == (len(text.split()) > max_tokens)
+
+@pytest.mark.parametrize('policy', ['head', 'head_tail'])
+def test_long_texts_match_whole_text_split(policy):
+    # Far over the character cap: the kept tokens are found in a window at each end
+    words = [f'word{i}' for i in range(2000)]
+    for text in (' '.join(words), '\n'.join(words[:50] + [URL] * 30 + words[50:]), '  ' + ' '.join(words) + ' \t'):
+        assert truncate_text(text, 4, policy) == (reference(text, 4, policy), True)
+        assert truncate_text(text, 64, policy) == (reference(text, 64, policy), True)
+
+@pytest.mark.parametrize('policy', ['head', 'head_tail'])
+def test_training_and_serving_agree(policy, monkeypatch):
+    monkeypatch.setattr(preprocess_data, 'MAX_HEADLINE_TOKENS', 4)
+    monkeypatch.setattr(preprocess_data, 'MAX_BODY_TOKENS', 5)
+    monkeypatch.setattr(preprocess_data, 'TRUNCATION_POLICY', policy)
+    headlines = list(texts_around(4))
+    bodies = list(texts_around(5))
+    df = pd.DataFrame({'Headline': headlines, 'Body': bodies[:len(headlines)], 'URLs': ''})
+
+    # Training truncates once; serving truncates in score_frame and again in transform_features
+    trained, trained_flags = truncate_frame(df)
+    served, served_flags = truncate_frame(df)
+    served_again, again_flags = truncate_frame(served)
+
+    pd.testing.assert_frame_equal(trained, served_again)
+    assert trained_flags.equals(served_flags)
+    assert not again_flags.any()
+
+@pytest.mark.parametrize('policy', ['head', 'head_tail'])
+def test_long_tokens_are_capped_at_whitespace(policy):
+    max_tokens = 4
+    max_chars = max_tokens * MAX_CHARS_PER_TOKEN
+    text = ' '.join(['x' * 90, 'y' * 90, 'z' * 90])
+    truncated, was_truncated = truncate_text(text, max_tokens, policy)
+
+    assert was_truncated
+    assert len(truncated) <= max_chars
+    assert all(token in text.split() for token in truncated.split())
+    assert truncate_text(truncated, max_tokens, policy) == (truncated, False)
+
+    # A single token longer than the cap is the only thing ever cut inside a word
+    giant, _ = truncate_text('w' * 10000, max_tokens, policy)
+    assert len(giant) <= max_chars
+    assert truncate_text(giant, max_tokens, policy) == (giant, False)
@@ -0,0 +1,68 @@
+"""
+Single-file Array Store
+Packs named NumPy arrays plus a JSON header into one file that can be
+memory-mapped read-only, so several processes share the same physical pages
+"""
+
+import json
+import os
+import struct
+import numpy as np
+
+MAGIC = b'NVARR001'
+ALIGNMENT = 64
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def write_arrays(path, arrays, meta=None):
+    """Write arrays (name -> ndarray) and a JSON-serialisable meta dict to path"""
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+
+    # Lay out the data section first so the header can record final offsets
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _aligned(offset)
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset += array.nbytes
+
+    header = json.dumps({'meta': meta or {}, 'arrays': layout}).encode('utf-8')
+    data_start = _aligned(len(MAGIC) + 8 + len(header))
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.write(b'\0' * (data_start + layout[name]['offset'] - f.tell()))
+            # A byte view of the (contiguous) array, so large arrays are not copied to write them
+            f.write(array.reshape(-1).view(np.uint8))
+
+    os.replace(tmp_path, path)
+    return path
+
+def read_header(path):
+    """Read the JSON header and the start of the data section"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an array store file")
+        (header_length,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_length).decode('utf-8'))
+    return header, _aligned(len(MAGIC) + 8 + header_length)
+
+def map_arrays(path):
+    """Memory-map every array read-only, returns (arrays, meta)"""
+    header, data_start = read_header(path)
+    buffer = np.memmap(path, dtype=np.uint8, mode='r')
+
+    arrays = {}
+    for name, info in header['arrays'].items():
+        dtype = np.dtype(info['dtype'])
+        count = int(np.prod(info['shape'])) if info['shape'] else 1
+        start = data_start + info['offset']
+        view = buffer[start:start + count * dtype.itemsize].view(dtype)
+        arrays[name] = view.reshape(info['shape'])
+
+    return arrays, header['meta']
@@ -0,0 +1,211 @@
+"""
+Evaluation Helpers for the Binary XGBoost Model
+Scores each split once with predict_proba and derives every metric from that
+single pass with NumPy (confusion matrix, precision/recall/F1, ROC-AUC,
+log-loss, calibration bins and threshold sweeps), plus inference latency
+"""
+
+import time
+import numpy as np
+
+DEFAULT_THRESHOLDS = np.round(np.linspace(0.05, 0.95, 19), 2)
+
+def confusion_counts(y_true, positive):
+    """Return (tn, fp, fn, tp) for boolean predictions"""
+    y_true = np.asarray(y_true).astype(bool)
+    tp = int(np.count_nonzero(positive & y_true))
+    fp = int(np.count_nonzero(positive & ~y_true))
+    fn = int(np.count_nonzero(~positive & y_true))
+    tn = len(y_true) - tp - fp - fn
+    return tn, fp, fn, tp
+
+def _safe_divide(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator, dtype=np.float64),
+                     where=denominator > 0)
+
+def scores_from_counts(tn, fp, fn, tp):
+    """Accuracy plus per-class and support-weighted precision/recall/F1 (vectorised over thresholds)"""
+    tn, fp, fn, tp = (np.asarray(v, dtype=np.float64) for v in (tn, fp, fn, tp))
+    total = tn + fp + fn + tp
+
+    # Class 1 treats tp as hits, class 0 treats tn as hits
+    precision_pos = _safe_divide(tp, tp + fp)
+    recall_pos = _safe_divide(tp, tp + fn)
+    precision_neg = _safe_divide(tn, tn + fn)
+    recall_neg = _safe_divide(tn, tn + fp)
+    f1_pos = _safe_divide(2 * precision_pos * recall_pos, precision_pos + recall_pos)
+    f1_neg = _safe_divide(2 * precision_neg * recall_neg, precision_neg + recall_neg)
+
+    support_pos = tp + fn
+    support_neg = tn + fp
+    weight_pos = _safe_divide(support_pos, total)
+    weight_neg = _safe_divide(support_neg, total)
+
+    return {
+        'accuracy': _safe_divide(tp + tn, total),
+        'precision': weight_neg * precision_neg + weight_pos * precision_pos,
+        'recall': weight_neg * recall_neg + weight_pos * recall_pos,
+        'f1_score': weight_neg * f1_neg + weight_pos * f1_pos,
+        'per_class': {
+            '0': {'precision': precision_neg, 'recall': recall_neg, 'f1_score': f1_neg, 'support': support_neg},
+            '1': {'precision': precision_pos, 'recall': recall_pos, 'f1_score': f1_pos, 'support': support_pos}
+        }
+    }
+
+def roc_auc(y_true, proba):
+    """ROC-AUC from the rank-sum statistic, with average ranks for ties"""
+    y_true = np.asarray(y_true).astype(bool)
+    n_pos = int(y_true.sum())
+    n_neg = len(y_true) - n_pos
+    if n_pos == 0 or n_neg == 0:
+        return None
+
+    order = np.argsort(proba, kind='mergesort')
+    sorted_proba = proba[order]
+    ranks = np.empty(len(proba), dtype=np.float64)
+    ranks[order] = np.arange(1, len(proba) + 1)
+
+    # Replace ranks inside each run of tied scores by the run average
+    _, first, counts = np.unique(sorted_proba, return_index=True, return_counts=True)
+    tied = counts > 1
+    for start, count in zip(first[tied], counts[tied]):
+        ranks[order[start:start + count]] = start + (count + 1) / 2.0
+
+    return float((ranks[y_true].sum() - n_pos * (n_pos + 1) / 2.0) / (n_pos * n_neg))
+
+def log_loss(y_true, proba, eps=1e-15):
+    """Binary cross-entropy of the positive-class probabilities"""
+    y_true = np.asarray(y_true, dtype=np.float64)
+    proba = np.clip(proba, eps, 1 - eps)
+    return float(-np.mean(y_true * np.log(proba) + (1 - y_true) * np.log(1 - proba)))
+
+def calibration_bins(y_true, proba, n_bins=10):
+    """Equal-width reliability bins: count, mean predicted and observed positive rate"""
+    y_true = np.asarray(y_true, dtype=np.float64)
+    bin_ids = np.minimum((proba * n_bins).astype(np.int64), n_bins - 1)
+    counts = np.bincount(bin_ids, minlength=n_bins)
+    predicted = np.bincount(bin_ids, weights=proba, minlength=n_bins)
+    observed = np.bincount(bin_ids, weights=y_true, minlength=n_bins)
+
+    bins = []
+    for i in range(n_bins):
+        if counts[i] == 0:
+            continue
+        bins.append({
+            'lower': i / n_bins,
+            'upper': (i + 1) / n_bins,
+            'count': int(counts[i]),
+            'mean_predicted': float(predicted[i] / counts[i]),
+            'observed_rate': float(observed[i] / counts[i])
+        })
+    return bins
+
+def threshold_sweep(y_true, proba, thresholds=DEFAULT_THRESHOLDS):
+    """Metrics at every threshold from one sort (positive when proba > threshold)"""
+    y_true = np.asarray(y_true).astype(bool)
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+
+    order = np.argsort(proba, kind='mergesort')
+    sorted_proba = proba[order]
+    positives_below = np.concatenate([[0], np.cumsum(y_true[order])])
+
+    n = len(proba)
+    n_pos = int(y_true.sum())
+    cut = np.searchsorted(sorted_proba, thresholds, side='right')
+    predicted_pos = n - cut
+    tp = n_pos - positives_below[cut]
+    fp = predicted_pos - tp
+    fn = n_pos - tp
+    tn = n - tp - fp - fn
+
+    scores = scores_from_counts(tn, fp, fn, tp)
+    return [
+        {
+            'threshold': float(t),
+            'accuracy': float(scores['accuracy'][i]),
+            'precision': float(scores['precision'][i]),
+            'recall': float(scores['recall'][i]),
+            'f1_score': float(scores['f1_score'][i]),
+            'positive_rate': float(predicted_pos[i] / n) if n else 0.0
+        }
+        for i, t in enumerate(thresholds)
+    ]
+
+def evaluation_report(y_true, proba, threshold=0.5, thresholds=DEFAULT_THRESHOLDS, n_bins=10):
+    """Full metrics report from positive-class probabilities"""
+    proba = np.asarray(proba, dtype=np.float64)
+    tn, fp, fn, tp = confusion_counts(y_true, proba > threshold)
+    scores = scores_from_counts(tn, fp, fn, tp)
+
+    return {
+        'accuracy': float(scores['accuracy']),
+        'precision': float(scores['precision']),
+        'recall': float(scores['recall']),
+        'f1_score': float(scores['f1_score']),
+        'roc_auc': roc_auc(y_true, proba),
+        'log_loss': log_loss(y_true, proba),
+        'threshold': float(threshold),
+        'confusion_matrix': [[tn, fp], [fn, tp]],
+        'per_class': {
+            label: {name: float(value) for name, value in values.items()}
+            for label, values in scores['per_class'].items()
+        },
+        'calibration': calibration_bins(y_true, proba, n_bins),
+        'threshold_sweep': threshold_sweep(y_true, proba, thresholds)
+    }
+
+def evaluate_model(model, X, y, set_name):
+    """Evaluate model with a single predict_proba pass and return metrics"""
+    proba = model.predict_proba(X)[:, 1]
+    metrics = evaluation_report(y, proba)
+
+    print(f"\n{set_name} Set Metrics:")
+    print(f"Accuracy: {metrics['accuracy']:.4f}")
+    print(f"Precision: {metrics['precision']:.4f}")
+    print(f"Recall: {metrics['recall']:.4f}")
+    print(f"F1-Score: {metrics['f1_score']:.4f}")
+    if metrics['roc_auc'] is not None:
+        print(f"ROC-AUC: {metrics['roc_auc']:.4f}")
+    print(f"Log-loss: {metrics['log_loss']:.4f}")
+
+    return metrics
+
+def latency_summary(seconds):
+    """Mean and tail percentiles in milliseconds for a list of durations in seconds"""
+    if len(seconds) == 0:
+        return {'count': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0}
+    ms = np.asarray(seconds, dtype=np.float64) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {'count': int(len(ms)), 'mean_ms': float(ms.mean()), 'p50_ms': float(p50),
+            'p95_ms': float(p95), 'p99_ms': float(p99)}
+
+def measure_latency(model, X, n_rows=200, batch_size=1000):
+    """Single-row and batch predict_proba latency on sample rows"""
+    X = X.tocsr()
+    single_rows = min(n_rows, X.shape[0])
+
+    # Warm up once so lazy initialisation is not counted
+    model.predict_proba(X[:1])
+
+    single = []
+    for i in range(single_rows):
+        start = time.perf_counter()
+        model.predict_proba(X[i:i + 1])
+        single.append(time.perf_counter() - start)
+
+    batch = X[:batch_size]
+    start = time.perf_counter()
+    model.predict_proba(batch)
+    batch_seconds = time.perf_counter() - start
+
+    latency = {
+        'single_row': latency_summary(single),
+        'batch_rows': int(batch.shape[0]),
+        'batch_rows_per_second': float(batch.shape[0] / batch_seconds) if batch_seconds > 0 else 0.0
+    }
+
+    print("\nInference Latency:")
+    print(f"Single row: p50 {latency['single_row']['p50_ms']:.2f} ms, p99 {latency['single_row']['p99_ms']:.2f} ms")
+    print(f"Batch of {latency['batch_rows']}: {latency['batch_rows_per_second']:.0f} rows/s")
+
+    return latency
@@ -9,11 +9,21 @@ import joblib
 import numpy as np
 import xgboost as xgb
 from scipy.sparse import load_npz
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, classification_report, confusion_matrix
 import json
 
+# SageMaker copies the source directory flat into the container
+from evaluate import evaluate_model, measure_latency
+from profiling import Profiler
+from split_store import load_splits, SPLIT_NAMES, SPLIT_STORE_FILE
+
 def load_data(base_dir):
-    """Load preprocessed data"""
+    """Load preprocessed data, memory-mapping the split store when present"""
+    store_path = os.path.join(base_dir, SPLIT_STORE_FILE)
+    if os.path.exists(store_path):
+        splits, _ = load_splits(store_path)
+        (X_train, y_train), (X_val, y_val), (X_test, y_test) = (splits[name] for name in SPLIT_NAMES)
+        return X_train, X_val, X_test, y_train, y_val, y_test
+    
     X_train = load_npz(os.path.join(base_dir, 'X_train.npz'))
     X_val = load_npz(os.path.join(base_dir, 'X_val.npz'))
     X_test = load_npz(os.path.join(base_dir, 'X_test.npz'))
@@ -24,28 +34,6 @@ def load_data(base_dir):
     
     return X_train, X_val, X_test, y_train, y_val, y_test
 
-def evaluate_model(model, X, y, set_name):
-    """Evaluate model and return metrics"""
-    y_pred = model.predict(X)
-    
-    accuracy = accuracy_score(y, y_pred)
-    precision = precision_score(y, y_pred, average='weighted', zero_division=0)
-    recall = recall_score(y, y_pred, average='weighted', zero_division=0)
-    f1 = f1_score(y, y_pred, average='weighted', zero_division=0)
-    
-    print(f"\n{set_name} Set Metrics:")
-    print(f"Accuracy: {accuracy:.4f}")
-    print(f"Precision: {precision:.4f}")
-    print(f"Recall: {recall:.4f}")
-    print(f"F1-Score: {f1:.4f}")
-    
-    return {
-        'accuracy': float(accuracy),
-        'precision': float(precision),
-        'recall': float(recall),
-        'f1_score': float(f1)
-    }
-
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     
@@ -54,6 +42,7 @@ if __name__ == '__main__':
     parser.add_argument('--train', type=str, default=os.environ.get('SM_CHANNEL_TRAINING'))
     parser.add_argument('--validation', type=str, default=os.environ.get('SM_CHANNEL_VALIDATION'))
     parser.add_argument('--test', type=str, default=os.environ.get('SM_CHANNEL_TEST'))
+    parser.add_argument('--output-data-dir', type=str, default=os.environ.get('SM_OUTPUT_DATA_DIR'))
     
     # Hyperparameters
     parser.add_argument('--max-depth', type=int, default=6)
@@ -65,11 +54,16 @@ if __name__ == '__main__':
     parser.add_argument('--objective', type=str, default='binary:logistic')
     parser.add_argument('--eval-metric', type=str, default='logloss')
     
+    # Profiling (hyperparameters arrive as "--profile 1"): 1 = stage timings, 2 = also sample stacks
+    parser.add_argument('--profile', type=int, default=0)
+    
     args = parser.parse_args()
+    profiler = Profiler(enabled=args.profile > 0, sampling=args.profile > 1)
     
     # Load data
     print("Loading data...")
-    X_train, X_val, X_test, y_train, y_val, y_test = load_data(args.train)
+    with profiler.stage('load_data'):
+        X_train, X_val, X_test, y_train, y_val, y_test = load_data(args.train)
     
     print(f"Training set shape: {X_train.shape}")
     print(f"Validation set shape: {X_val.shape}")
@@ -90,28 +84,37 @@ if __name__ == '__main__':
         n_jobs=-1
     )
     
-    model.fit(
-        X_train, y_train,
-        eval_set=[(X_train, y_train), (X_val, y_val)],
-        verbose=True
-    )
+    with profiler.stage('boosting'):
+        model.fit(
+            X_train, y_train,
+            eval_set=[(X_train, y_train), (X_val, y_val)],
+            verbose=True
+        )
     
     # Evaluate
     print("\nEvaluating model...")
-    train_metrics = evaluate_model(model, X_train, y_train, "Train")
-    val_metrics = evaluate_model(model, X_val, y_val, "Validation")
-    test_metrics = evaluate_model(model, X_test, y_test, "Test")
+    with profiler.stage('evaluate'):
+        train_metrics = evaluate_model(model, X_train, y_train, "Train")
+        val_metrics = evaluate_model(model, X_val, y_val, "Validation")
+        test_metrics = evaluate_model(model, X_test, y_test, "Test")
     
     # Save model
     model_path = os.path.join(args.model_dir, 'model.pkl')
-    joblib.dump(model, model_path)
+    with profiler.stage('save_model'):
+        joblib.dump(model, model_path)
     print(f"\nModel saved to {model_path}")
     
+    # Measure inference latency so slower bundles show up next to accuracy
+    with profiler.stage('measure_latency'):
+        latency = measure_latency(model, X_test)
+    latency['model_size_bytes'] = os.path.getsize(model_path)
+    
     # Save metrics
     metrics = {
         'train': train_metrics,
         'validation': val_metrics,
-        'test': test_metrics
+        'test': test_metrics,
+        'latency': latency
     }
     
     metrics_path = os.path.join(args.model_dir, 'metrics.json')
@@ -125,4 +128,7 @@ if __name__ == '__main__':
     importance_path = os.path.join(args.model_dir, 'feature_importance.npy')
     np.save(importance_path, feature_importance)
     print(f"Feature importance saved to {importance_path}")
+    
+    # Non-model outputs go to output/output.tar.gz next to the model artifact
+    profiler.write(os.path.join(args.output_data_dir or args.model_dir, 'profile.json'))
 